@@ -0,0 +1,95 @@
+"""
+Fill student_letter_scores for survey answers submitted before the side table
+existed (or recompute everything with --all).
+
+    python -m backend.admin.backfill_letter_scores [--all] [--batch-size 500]
+"""
+import argparse
+
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+load_dotenv()
+
+from ..db import get_db_connection
+from ..utils.letter_scores import (
+    PAIR_COLUMNS,
+    compute_letter_scores,
+    ensure_letter_scores_table,
+    scores_row_params,
+)
+
+BATCH_UPSERT_SQL = """
+    INSERT INTO student_letter_scores
+        (student_id, exam_id, letter_counts, ranked_letters, top_letters, answered_count)
+    VALUES %s
+    ON CONFLICT (student_id) DO UPDATE SET
+        exam_id = EXCLUDED.exam_id,
+        letter_counts = EXCLUDED.letter_counts,
+        ranked_letters = EXCLUDED.ranked_letters,
+        top_letters = EXCLUDED.top_letters,
+        answered_count = EXCLUDED.answered_count,
+        updated_at = NOW()
+"""
+
+
+def backfill(recompute_all=False, batch_size=500):
+    ensure_letter_scores_table()
+
+    read_conn = get_db_connection()
+    write_conn = get_db_connection()
+
+    where = "" if recompute_all else """
+        AND NOT EXISTS (
+            SELECT 1 FROM student_letter_scores ls WHERE ls.student_id = sa.student_id
+        )
+    """
+
+    # Named cursor streams rows from the server instead of loading them all.
+    read_cur = read_conn.cursor(name="letter_scores_backfill")
+    read_cur.itersize = batch_size
+    read_cur.execute(f"""
+        SELECT DISTINCT ON (sa.student_id)
+               sa.student_id, sa.exam_id, {", ".join("sa." + c for c in PAIR_COLUMNS)}
+        FROM student_survey_answer sa
+        WHERE sa.student_id IS NOT NULL
+        {where}
+        ORDER BY sa.student_id, sa.id DESC
+    """)
+
+    write_cur = write_conn.cursor()
+    total = 0
+    batch = []
+
+    for row in read_cur:
+        student_id, exam_id, *answers = row
+        batch.append(scores_row_params(student_id, exam_id, compute_letter_scores(answers)))
+
+        if len(batch) >= batch_size:
+            execute_values(write_cur, BATCH_UPSERT_SQL, batch)
+            write_conn.commit()
+            total += len(batch)
+            print(f"Backfilled {total} student(s)...")
+            batch = []
+
+    if batch:
+        execute_values(write_cur, BATCH_UPSERT_SQL, batch)
+        write_conn.commit()
+        total += len(batch)
+
+    read_cur.close()
+    write_cur.close()
+    read_conn.close()
+    write_conn.close()
+
+    print(f"Done. {total} student score vector(s) written.")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--all", action="store_true", help="recompute rows that already have scores")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    backfill(recompute_all=args.all, batch_size=args.batch_size)
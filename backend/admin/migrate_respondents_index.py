@@ -0,0 +1,35 @@
+"""
+Add the student (school_year, fullname, id) index the respondents page sorts
+and pages on. Run once per deploy, outside request handling.
+
+    python -m backend.admin.migrate_respondents_index
+
+Built CONCURRENTLY so writes to student keep going while it builds; that
+needs its own autocommit connection rather than a pooled one.
+"""
+import os
+
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESPONDENTS_INDEX_DDL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_student_school_year_fullname
+    ON student (school_year, fullname, id);
+"""
+
+
+def migrate():
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute(RESPONDENTS_INDEX_DDL)
+    cur.close()
+    conn.close()
+
+    print("idx_student_school_year_fullname is present")
+
+
+if __name__ == "__main__":
+    migrate()
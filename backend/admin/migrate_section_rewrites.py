@@ -0,0 +1,27 @@
+"""
+Add the student_survey_answer.section_rewrites column used by the chatbot
+section rewrite cache. Run once per deploy, outside request handling.
+
+    python -m backend.admin.migrate_section_rewrites
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from ..db import get_db_connection
+from ..utils.section_rewrites import SECTION_REWRITES_DDL
+
+
+def migrate():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(SECTION_REWRITES_DDL)
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    print("student_survey_answer.section_rewrites is present")
+
+
+if __name__ == "__main__":
+    migrate()
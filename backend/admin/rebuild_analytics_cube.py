@@ -0,0 +1,33 @@
+"""
+Rebuild survey_analytics_cube from scratch. Missing letter score rows are
+backfilled first so every survey is counted.
+
+    python -m backend.admin.rebuild_analytics_cube
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from ..db import get_db_connection
+from ..utils.analytics_cube import rebuild_cube
+from .backfill_letter_scores import backfill
+
+
+def rebuild():
+    backfill()
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cells = rebuild_cube(cur)
+    conn.commit()
+
+    cur.close()
+    conn.close()
+
+    print(f"Done. {cells} analytics cube cell(s) written.")
+    return cells
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -1,31 +1,49 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, send_file, current_app
-from ..db import get_db_connection
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, send_file, current_app, g
+from ..db import get_db_connection, get_pool_stats
+from ..ai_service import get_ai_provider_stats
+from ..utils.letter_scores import LETTERS, get_letter_scores, ensure_letter_scores_table
+from ..utils.catalog import (
+    bump_catalog_version,
+    campus_addresses,
+    campus_header,
+    campus_names,
+    get_campuses,
+    get_catalog,
+    get_program_mask,
+    invalidate_catalog,
+)
+from ..utils.matching import cohort_match_statuses, match_status as program_match_status
+from ..utils.admin_identity import get_admin, invalidate_admin
+from ..utils.analytics_cube import apply_cube_delta, ensure_analytics_cube_table
+from ..utils.pdf_assets import pdf_logos, render_pdf
+from ..utils.pdf_cache import get_pdf_cache_stats, pdf_cache_key, send_cached_pdf
+from ..utils.pdf_export import export_progress, get_export, start_export
+from ..utils.import_jobs import create_import_job, get_import_job, resume_stale_imports, start_import_job
+from ..utils.ai_explanation_cache import get_ai_explanation_cache_stats
+from ..utils.email_outbox import enqueue_email, get_email_outbox_stats
+from ..utils.interview_ai import (
+    generate_interview_questions,
+    get_interview_batch,
+    interview_batch_progress,
+    load_interview_inputs,
+    save_interview_questions,
+    start_interview_batch,
+)
 import os
-import pandas as pd
 import psycopg2
 import base64
 import json
 import re
 from werkzeug.utils import secure_filename
-from PIL import Image
-from weasyprint import HTML
-from io import BytesIO
 from psycopg2.extras import RealDictCursor
 from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta, timezone
 from flask import request
 from collections import Counter
-from ..description import letter_descriptions, preferred_program_map, short_letter_descriptions
+from ..description import letter_descriptions
 from math import ceil
-from groq import Groq
-import smtplib
-from email.message import EmailMessage
 import random
 import time
-import requests
-import bcrypt
-
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
 admin_bp = Blueprint('admin', __name__, template_folder='../../frontend/templates/admin')
 
@@ -38,7 +56,7 @@ DEFAULT_ADMIN = {
 
 }
 
-ALLOWED_EXTENSIONS = {"xlsx", "xls"}
+ALLOWED_EXTENSIONS = {"xlsx", "xls", "csv"}
 
 UPLOAD_FOLDER = os.path.join(
     os.path.dirname(__file__),
@@ -52,8 +70,15 @@ def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def hash_password(password):
+    import bcrypt
+
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
+def check_password(password, hashed):
+    import bcrypt
+
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
 def is_password_strong(pw):
     return (
         len(pw) >= 8 and
@@ -63,15 +88,6 @@ def is_password_strong(pw):
         re.search(r"[^A-Za-z0-9]", pw)
     )
 
-def image_to_base64(filename):
-    path = os.path.join(
-        current_app.static_folder,
-        "images",
-        filename
-    )
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
-    
 def student_photo_to_base64(filename):
     if not filename:
         return None
@@ -133,28 +149,12 @@ def get_client_ip():
     return request.headers.get("X-Forwarded-For", request.remote_addr)
 
 def send_email(subject, to_email, body):
-    EMAIL_USER = os.getenv("EMAIL_USER")
-    EMAIL_PASS = os.getenv("EMAIL_PASS")
-
-    if not EMAIL_USER or not EMAIL_PASS:
+    if not os.getenv("EMAIL_USER") or not os.getenv("EMAIL_PASS"):
         current_app.logger.error("Email credentials not configured")
         return False
 
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = EMAIL_USER
-    msg["To"] = to_email
-    msg.set_content(body)
-
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=10) as server:
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.send_message(msg)
-        return True
-
-    except Exception as e:
-        current_app.logger.error(f"Email send failed: {e}")
-        return False
+    # Queued; the outbox worker sends it over its kept-alive SMTP session.
+    return enqueue_email(to_email, subject, body, transport="smtp")
 
 def send_security_alert(ip, username):
     body = f"""
@@ -174,58 +174,48 @@ def generate_otp():
     return str(random.randint(100000, 999999))
 
 def send_otp_email(email, otp):
-    SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
-
-    if not SENDGRID_API_KEY:
+    # Queued; the outbox worker delivers it through SendGrid in the background.
+    if not os.getenv("SENDGRID_API_KEY"):
         current_app.logger.error("❌ SENDGRID_API_KEY not set.")
         return False
 
-    data = {
-        "personalizations": [
-            {"to": [{"email": email}], "subject": "Your AspireMatch Login OTP"}
-        ],
-        "from": {"email": "aspirematch2@gmail.com"},
-        "content": [
-            {
-                "type": "text/plain",
-                "value": f"""Your One-Time Password (OTP) is:
+    return enqueue_email(
+        email,
+        "Your AspireMatch Login OTP",
+        f"""Your One-Time Password (OTP) is:
 
 {otp}
 
 This code will expire in 5 minutes.
 
-If you did not request this, please ignore this email."""
-            }
-        ]
-    }
-
-    try:
-        response = requests.post(
-            "https://api.sendgrid.com/v3/mail/send",
-            headers={
-                "Authorization": f"Bearer {SENDGRID_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json=data,
-            timeout=15
-        )
-
-        if response.status_code == 202:
-            current_app.logger.info("✅ OTP email sent via SendGrid.")
-            return True
-        else:
-            current_app.logger.error(f"❌ SendGrid error: {response.text}")
-            return False
+If you did not request this, please ignore this email.""",
+        transport="sendgrid"
+    )
 
-    except Exception as e:
-        current_app.logger.error(f"❌ SendGrid exception: {e}")
-        return False
+@admin_bp.before_request
+def load_admin_identity():
+    # One cached lookup per request instead of super_admin + admin queries
+    # in every handler. None when logged out or the account is gone.
+    g.admin = get_admin(session.get("admin_username"))
 
 @admin_bp.route("/test-db")
 def test_db():
     conn = get_db_connection()
     return "DB CONNECTED"
 
+@admin_bp.route("/metrics")
+def metrics():
+    if "admin_username" not in session:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify({
+        "db_pool": get_pool_stats(),
+        "pdf_cache": get_pdf_cache_stats(),
+        "ai_explanation_cache": get_ai_explanation_cache_stats(),
+        "ai_providers": get_ai_provider_stats(),
+        "email_outbox": get_email_outbox_stats()
+    })
+
 @admin_bp.route("/")
 def home():
     return redirect(url_for("admin.login"))
@@ -283,20 +273,14 @@ def login():
             valid = False
 
             try:
-                valid = bcrypt.checkpw(
-                    password.encode('utf-8'),
-                    user["password"].encode('utf-8')
-                )
+                valid = check_password(password, user["password"])
             except Exception:
                 valid = False
 
             if valid:
                 # 🔄 OPTIONAL AUTO-UPGRADE (only if old hashes exist)
                 if user["password"].startswith("scrypt"):
-                    new_hash = bcrypt.hashpw(
-                        password.encode('utf-8'),
-                        bcrypt.gensalt()
-                    ).decode('utf-8')
+                    new_hash = hash_password(password)
 
                     conn = get_db_connection()
                     cur = conn.cursor()
@@ -311,6 +295,7 @@ def login():
                     conn.close()
 
                 # ✅ LOGIN SUCCESS (MUST ALWAYS RUN)
+                invalidate_admin(username)
                 session.clear()
                 session["admin_username"] = username
                 session["admin_role"] = user_type
@@ -478,7 +463,7 @@ def reset_password():
         if password != confirm:
             error = "Passwords do not match."
         else:
-            hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            hashed = hash_password(password)
             conn = get_db_connection()
             cur = conn.cursor()
             table = "super_admin" if role == "super_admin" else "admin"
@@ -501,42 +486,17 @@ def dashboard():
     success = request.args.get("success")
     message = request.args.get("message")
 
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    role = session.get("admin_role")
-    table = "super_admin" if role == "super_admin" else "admin"
-
-    cur.execute(
-        f"SELECT fullname, campus FROM {table} WHERE username = %s;",
-        (session["admin_username"],)
-    )
-    admin_row = cur.fetchone()
-
-    if not admin_row:
-        cur.close()
-        conn.close()
+    if not g.admin:
         return redirect(url_for("admin.login"))
 
-    fullname, admin_campus = admin_row
-        
-    cur.execute("""
-        SELECT campus_name, campus_address 
-        FROM campus 
-        WHERE campus_name = %s
-    """, (admin_campus,))
+    fullname, admin_campus = g.admin.fullname, g.admin.campus
 
-    campus_data = cur.fetchone()
+    conn = get_db_connection()
+    cur = conn.cursor()
 
-    if campus_data:
-        campus_name = campus_data[0]
-        campus_address = campus_data[1]
-    else:
-        campus_name = admin_campus
-        campus_address = ""
+    campus_name, campus_address = campus_header(admin_campus)
 
-    role = session.get("admin_role")
-    is_super_admin = role == "super_admin"
+    is_super_admin = g.admin.is_super_admin
 
     cur.execute("""
         SELECT DISTINCT school_year
@@ -554,8 +514,7 @@ def dashboard():
 
     if is_super_admin:
         # Super admin can select any campus
-        cur.execute("SELECT campus_name FROM campus ORDER BY campus_name ASC")
-        campuses = [c[0] for c in cur.fetchall()]
+        campuses = campus_names()
         selected_campus = request.args.get("campus", "")
     else:
         # Sub-admin: fixed campus
@@ -679,11 +638,10 @@ def dashboard():
 
 @admin_bp.route("/edit-student", methods=["POST"])
 def edit_student():
-    if "admin_username" not in session:
+    if not g.admin:
         return redirect(url_for("admin.login"))
 
     admin_username = session["admin_username"]
-    role = session.get("admin_role")
 
     student_id = request.form["student_id"]
     new_fullname = request.form["fullname"]
@@ -693,13 +651,7 @@ def edit_student():
     conn = get_db_connection()
     cur = conn.cursor()
 
-    # ✅ Get admin campus based on role
-    table = "super_admin" if role == "super_admin" else "admin"
-    cur.execute(
-        f"SELECT campus FROM {table} WHERE username = %s;",
-        (admin_username,)
-    )
-    admin_campus = cur.fetchone()[0]
+    admin_campus = g.admin.campus
 
     # ✅ Get student info (including campus)
     cur.execute("""
@@ -717,12 +669,13 @@ def edit_student():
     old_fullname, old_gender, old_email, student_campus = student
 
     # ✅ Restrict sub-admin
-    if role != "super_admin" and student_campus != admin_campus:
+    if not g.admin.is_super_admin and student_campus != admin_campus:
         cur.close()
         conn.close()
         return "Unauthorized", 403
 
-    # ✅ Update student
+    # ✅ Update student (gender is part of the analytics cube key)
+    apply_cube_delta(cur, student_id, -1)
     cur.execute("""
         UPDATE student
         SET fullname = %s,
@@ -730,6 +683,7 @@ def edit_student():
             email = %s
         WHERE id = %s;
     """, (new_fullname, new_gender, new_email, student_id))
+    apply_cube_delta(cur, student_id, 1)
 
     # ✅ Logs
     if old_fullname != new_fullname:
@@ -761,24 +715,17 @@ def edit_student():
 
 @admin_bp.route("/delete-student", methods=["POST"])
 def delete_student():
-    if "admin_username" not in session:
+    if not g.admin:
         return redirect(url_for("admin.login"))
 
     admin_username = session["admin_username"]
-    role = session.get("admin_role")
 
     student_id = request.form["student_id"]
 
     conn = get_db_connection()
     cur = conn.cursor()
 
-    # ✅ Get admin campus
-    table = "super_admin" if role == "super_admin" else "admin"
-    cur.execute(
-        f"SELECT campus FROM {table} WHERE username = %s;",
-        (admin_username,)
-    )
-    admin_campus = cur.fetchone()[0]
+    admin_campus = g.admin.campus
 
     # ✅ Get student info
     cur.execute("""
@@ -796,12 +743,13 @@ def delete_student():
     student_fullname, student_campus = student
 
     # ✅ Restrict sub-admin
-    if role != "super_admin" and student_campus != admin_campus:
+    if not g.admin.is_super_admin and student_campus != admin_campus:
         cur.close()
         conn.close()
         return "Unauthorized", 403
 
     # ✅ Delete
+    apply_cube_delta(cur, student_id, -1)
     cur.execute(
         "DELETE FROM student WHERE id = %s;",
         (student_id,)
@@ -832,8 +780,7 @@ def addSuper():
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
     # Fetch campuses
-    cur.execute("SELECT campus_name FROM campus ORDER BY campus_name ASC")
-    campuses = cur.fetchall()
+    campuses = [{"campus_name": name} for name in campus_names()]
 
     message = None
     category = None
@@ -862,7 +809,7 @@ def addSuper():
             message = "Username or Email already exists!"
             category = "danger"
         else:
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            hashed_password = hash_password(password)
 
             cur.execute("""
                 INSERT INTO super_admin (fullname, username, email, password, campus, created_at)
@@ -870,6 +817,7 @@ def addSuper():
             """, (fullname, username, email, hashed_password, campus, datetime.now()))
 
             conn.commit()
+            invalidate_admin(username)
 
             message = "Super Admin added successfully!"
             category = "success"
@@ -890,40 +838,25 @@ def addAdmin():
     message = None
     category = None
     admin_username = session["admin_username"]
-    role = session.get("admin_role", "admin")  # "super_admin" or "admin"
-    is_super_admin = role == "super_admin"
-
-    # Determine admin campus
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    table = "super_admin" if is_super_admin else "admin"
-    cur.execute(f"SELECT campus, fullname FROM {table} WHERE username = %s", (admin_username,))
-    admin_row = cur.fetchone()
-    if not admin_row:
-        cur.close()
-        conn.close()
+    if not g.admin:
         return redirect(url_for("admin.login"))
 
-    admin_campus = admin_row.get("campus") or "ALL"
-    admin_fullname = admin_row["fullname"]
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus or "ALL"
+    admin_fullname = g.admin.fullname
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
 
     # Get campus info
-    cur.execute("""
-        SELECT campus_name, campus_address 
-        FROM campus 
-        WHERE campus_name = %s
-    """, (admin_campus,))
-    campus_data = cur.fetchone()
-    campus_name = campus_data["campus_name"] if campus_data else admin_campus
-    campus_address = campus_data["campus_address"] if campus_data else ""
+    campus_name, campus_address = campus_header(admin_campus)
 
     # Fetch campuses for dropdown
     if is_super_admin:
-        cur.execute("SELECT campus_name FROM campus ORDER BY campus_name ASC")
+        campuses = campus_names()
     else:
-        cur.execute("SELECT campus_name FROM campus WHERE campus_name = %s", (admin_campus,))
-    campuses = [c["campus_name"] for c in cur.fetchall()]
+        campuses = [name for name in campus_names() if name == admin_campus]
 
     cur.close()
     conn.close()
@@ -947,7 +880,7 @@ def addAdmin():
                 admin_campus=admin_campus
             )
 
-        hashed_pw = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_pw = hash_password(password)
 
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -1036,17 +969,14 @@ def delete_admin():
 
     deleter = session["admin_username"]
 
-    conn = get_db_connection()
-    cur = conn.cursor()
-
     # Check if the logged-in user is a super admin
-    cur.execute("SELECT username FROM super_admin WHERE username = %s", (deleter,))
-    if not cur.fetchone():
-        cur.close()
-        conn.close()
+    if not g.admin or not g.admin.is_super_admin:
         # Not a super admin → cannot delete
         return redirect(url_for("admin.addAdmin"))
 
+    conn = get_db_connection()
+    cur = conn.cursor()
+
     deleted_admin_id = request.form["admin_id"]
     new_admin_id = request.form["reassign_admin_id"]
 
@@ -1109,6 +1039,7 @@ def delete_admin():
     conn.commit()
     cur.close()
     conn.close()
+    invalidate_admin(username)
 
     return redirect(url_for("admin.addAdmin"))
 
@@ -1229,16 +1160,13 @@ def editAdmin():
 
     deleter = session["admin_username"]
 
-    conn = get_db_connection()
-    cur = conn.cursor()
-
     # Check if logged-in user is super admin
-    cur.execute("SELECT username FROM super_admin WHERE username = %s", (deleter,))
-    if not cur.fetchone():
-        cur.close()
-        conn.close()
+    if not g.admin or not g.admin.is_super_admin:
         return jsonify(success=False, message="Only super admins can edit admins")
 
+    conn = get_db_connection()
+    cur = conn.cursor()
+
     data = request.get_json()
     admin_id = data.get("id")
     fullname = data.get("fullname")
@@ -1296,9 +1224,7 @@ def editAdmin():
         """, (fullname, username, email, campus, admin_id))
 
         # Get deleter's campus for logging
-        cur.execute("SELECT campus FROM admin WHERE username = %s", (deleter,))
-        row = cur.fetchone()
-        admin_campus = row[0] if row else "ALL"
+        admin_campus = g.admin.campus or "ALL"
 
         # Log the changes
         action = f"Edited admin '{old_username}': " + ", ".join(changes)
@@ -1310,6 +1236,8 @@ def editAdmin():
         conn.commit()
         cur.close()
         conn.close()
+        invalidate_admin(old_username)
+        invalidate_admin(username)
 
         return jsonify(success=True)
 
@@ -1326,19 +1254,18 @@ def program():
     admin_username = session["admin_username"]
     selected_campus = request.args.get("campus", "")
 
+    if not g.admin:
+        return redirect(url_for("admin.login"))
+
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus_or_all
+
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Determine role
-    cur.execute("SELECT id, campus FROM super_admin WHERE username = %s", (admin_username,))
-    super_admin_row = cur.fetchone()
-    is_super_admin = bool(super_admin_row)
-
     if is_super_admin:
-        admin_campus = super_admin_row.get("campus") or "ALL"
         # Fetch all campuses for dropdown
-        cur.execute("SELECT campus_name FROM campus ORDER BY campus_name ASC")
-        campuses = cur.fetchall()
+        campuses = [{"campus_name": name} for name in campus_names()]
 
         # Fetch programs
         if selected_campus and selected_campus != "":
@@ -1365,14 +1292,6 @@ def program():
 
     else:
         # Sub admin: only their campus
-        cur.execute("SELECT id, campus FROM admin WHERE username = %s", (admin_username,))
-        admin_row = cur.fetchone()
-        if not admin_row:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-
-        admin_campus = admin_row["campus"]
         campuses = [{"campus_name": admin_campus}]
         cur.execute("""
             SELECT id, program_name, campus, created_at, is_active, color
@@ -1415,35 +1334,22 @@ def addProgram():
 
     admin_username = session["admin_username"]
 
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        # Determine role
-        cur.execute("SELECT username, campus FROM super_admin WHERE username = %s", (admin_username,))
-        row = cur.fetchone()
-
-        if row:
-            is_super_admin = True
-            admin_campus = row.get("campus") or "ALL"
-            campus = request.form.get("campus")  # ✅ now assigned here
+    if not g.admin:
+        return jsonify(success=False, message="Unauthorized")
 
-        else:
-            cur.execute("SELECT username, campus FROM admin WHERE username = %s", (admin_username,))
-            row = cur.fetchone()
+    admin_campus = g.admin.campus_or_all
+    if g.admin.is_super_admin:
+        campus = request.form.get("campus")
+    else:
+        campus = admin_campus  # ✅ forced
 
-            if row:
-                is_super_admin = False
-                admin_campus = row["campus"]
-                campus = admin_campus  # ✅ forced
-            else:
-                cur.close()
-                conn.close()
-                return jsonify(success=False, message="Unauthorized")
+    # ✅ NOW validate AFTER campus is set
+    if not program_name or not campus:
+        return jsonify(success=False, message="Missing data")
 
-        # ✅ NOW validate AFTER campus is set
-        if not program_name or not campus:
-            return jsonify(success=False, message="Missing data")
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
 
         # Insert program
         cur.execute("""
@@ -1457,7 +1363,9 @@ def addProgram():
             VALUES (%s, %s, %s)
         """, (admin_username, admin_campus, f"Added new program '{program_name}' at campus '{campus}'"))
 
+        bump_catalog_version(cur)
         conn.commit()
+        invalidate_catalog()
         cur.close()
         conn.close()
         return jsonify(success=True)
@@ -1479,27 +1387,15 @@ def addProgramColor():
     if not program_name or not color:
         return jsonify(success=False, message="Missing data")
 
+    if not g.admin:
+        return jsonify(success=False, message="Unauthorized")
+
+    admin_campus = g.admin.campus_or_all
+
     try:
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        # Determine role
-        cur.execute("SELECT username, campus FROM super_admin WHERE username = %s", (admin_username,))
-        row = cur.fetchone()
-        if row:
-            is_super_admin = True
-            admin_campus = row.get("campus") or "ALL"
-        else:
-            cur.execute("SELECT username, campus FROM admin WHERE username = %s", (admin_username,))
-            row = cur.fetchone()
-            if row:
-                is_super_admin = False
-                admin_campus = row["campus"]
-            else:
-                cur.close()
-                conn.close()
-                return jsonify(success=False, message="Unauthorized")
-
         # Update program color
         cur.execute("UPDATE program SET color = %s WHERE program_name = %s", (color, program_name))
 
@@ -1509,7 +1405,9 @@ def addProgramColor():
             VALUES (%s, %s, %s)
         """, (admin_username, admin_campus, f"Set color '{color}' for program '{program_name}'"))
 
+        bump_catalog_version(cur)
         conn.commit()
+        invalidate_catalog()
         cur.close()
         conn.close()
         return jsonify(success=True)
@@ -1530,27 +1428,15 @@ def deleteProgram():
     if not program_id:
         return jsonify(success=False, message="Missing program ID")
 
+    if not g.admin:
+        return jsonify(success=False, message="Unauthorized")
+
+    admin_campus = g.admin.campus_or_all
+
     try:
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        # Determine role
-        cur.execute("SELECT username, campus FROM super_admin WHERE username = %s", (admin_username,))
-        row = cur.fetchone()
-        if row:
-            is_super_admin = True
-            admin_campus = row.get("campus") or "ALL"
-        else:
-            cur.execute("SELECT username, campus FROM admin WHERE username = %s", (admin_username,))
-            row = cur.fetchone()
-            if row:
-                is_super_admin = False
-                admin_campus = row["campus"]
-            else:
-                cur.close()
-                conn.close()
-                return jsonify(success=False, message="Unauthorized")
-
         cur.execute("SELECT program_name FROM program WHERE id = %s", (program_id,))
         row = cur.fetchone()
         if not row:
@@ -1565,7 +1451,9 @@ def deleteProgram():
             VALUES (%s, %s, %s)
         """, (admin_username, admin_campus, f"Deleted program '{program_name}'"))
 
+        bump_catalog_version(cur)
         conn.commit()
+        invalidate_catalog()
         cur.close()
         conn.close()
         return jsonify(success=True)
@@ -1590,27 +1478,15 @@ def editProgram():
     if not program_id or (not new_name and not new_color):
         return jsonify(success=False, message="Missing data")
 
+    if not g.admin:
+        return jsonify(success=False, message="Unauthorized")
+
+    admin_campus = g.admin.campus_or_all
+
     try:
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        # Determine role
-        cur.execute("SELECT username, campus FROM super_admin WHERE username = %s", (admin_username,))
-        row = cur.fetchone()
-        if row:
-            is_super_admin = True
-            admin_campus = row.get("campus") or "ALL"
-        else:
-            cur.execute("SELECT username, campus FROM admin WHERE username = %s", (admin_username,))
-            row = cur.fetchone()
-            if row:
-                is_super_admin = False
-                admin_campus = row["campus"]
-            else:
-                cur.close()
-                conn.close()
-                return jsonify(success=False, message="Unauthorized")
-
         # Fetch old program
         cur.execute("SELECT program_name, color FROM program WHERE id = %s", (program_id,))
         old_row = cur.fetchone()
@@ -1654,7 +1530,9 @@ def editProgram():
             VALUES (%s, %s, %s)
         """, (admin_username, admin_campus, action_text))
 
+        bump_catalog_version(cur)
         conn.commit()
+        invalidate_catalog()
         cur.close()
         conn.close()
         return jsonify(success=True)
@@ -1669,45 +1547,18 @@ def campuses():
 
     admin_username = session["admin_username"]
 
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    if not g.admin:
+        return redirect(url_for("admin.login"))
 
-    # Check if super admin
-    cur.execute("SELECT * FROM super_admin WHERE username = %s", (admin_username,))
-    super_admin = cur.fetchone()
-    is_super_admin = bool(super_admin)
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus_or_all
 
-    # Check if sub admin
-    if not is_super_admin:
-        cur.execute("SELECT * FROM admin WHERE username = %s", (admin_username,))
-        sub_admin = cur.fetchone()
-        if not sub_admin:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_campus = sub_admin["campus"]
-    else:
-        admin_campus = super_admin.get("campus") or "ALL"
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
 
     # Determine campus info for header
-    if is_super_admin and admin_campus != "ALL":
-        cur.execute("""
-            SELECT campus_name, campus_address
-            FROM campus
-            WHERE campus_name = %s
-        """, (admin_campus,))
-        campus_data = cur.fetchone()
-        campus_name = campus_data["campus_name"] if campus_data else admin_campus
-        campus_address = campus_data["campus_address"] if campus_data else ""
-    elif not is_super_admin:
-        cur.execute("""
-            SELECT campus_name, campus_address
-            FROM campus
-            WHERE campus_name = %s
-        """, (admin_campus,))
-        campus_data = cur.fetchone()
-        campus_name = campus_data["campus_name"] if campus_data else admin_campus
-        campus_address = campus_data["campus_address"] if campus_data else ""
+    if not is_super_admin or admin_campus != "ALL":
+        campus_name, campus_address = campus_header(admin_campus)
     else:
         campus_name = "ALL CAMPUSES"
         campus_address = ""
@@ -1729,7 +1580,9 @@ def campuses():
                 INSERT INTO campus (campus_name, campus_address, guidance_counselor)
                 VALUES (%s, %s, %s)
             """, (campus_name_input, campus_address_input, guidance_counselor))
+            bump_catalog_version(cur)
             conn.commit()
+            invalidate_catalog()
             duplicate = False
 
     elif action == "edit" and is_super_admin:
@@ -1745,20 +1598,23 @@ def campuses():
                 guidance_counselor = %s
             WHERE id = %s
         """, (campus_name_input, campus_address_input, guidance_counselor, campus_id))
+        bump_catalog_version(cur)
         conn.commit()
+        invalidate_catalog()
 
     elif action == "delete" and is_super_admin:
         campus_id = request.form.get("campus_id")
         cur.execute("DELETE FROM campus WHERE id = %s", (campus_id,))
+        bump_catalog_version(cur)
         conn.commit()
+        invalidate_catalog()
 
     # Fetch campuses
     if is_super_admin:
-        cur.execute("SELECT * FROM campus ORDER BY campus_name ASC")
+        campuses = get_campuses()
     else:
         # Sub admin → only their campus
-        cur.execute("SELECT * FROM campus WHERE campus_name = %s", (admin_campus,))
-    campuses = cur.fetchall()
+        campuses = [c for c in get_campuses() if c["campus_name"] == admin_campus]
 
     cur.close()
     conn.close()
@@ -1785,28 +1641,18 @@ def addParticipant():
 
     admin_username = session["admin_username"]
 
+    # Identify if super or sub admin
+    if not g.admin:
+        return redirect(url_for("admin.dashboard", error="Admin not found"))
+
+    added_by_id = g.admin.id
+    added_by_type = "super" if g.admin.is_super_admin else "sub"
+    admin_campus = g.admin.campus_or_all
+
     try:
         conn = get_db_connection()
         cur = conn.cursor()
 
-        # Identify if super or sub admin
-        cur.execute("SELECT id, campus FROM super_admin WHERE username = %s", (admin_username,))
-        super_admin = cur.fetchone()
-        if super_admin:
-            added_by_id = super_admin[0]
-            added_by_type = "super"
-            admin_campus = super_admin[1] or "ALL"
-        else:
-            cur.execute("SELECT id, campus FROM admin WHERE username = %s", (admin_username,))
-            sub_admin = cur.fetchone()
-            if not sub_admin:
-                cur.close()
-                conn.close()
-                return redirect(url_for("admin.dashboard", error="Admin not found"))
-            added_by_id = sub_admin[0]
-            added_by_type = "sub"
-            admin_campus = sub_admin[1]
-
         # Check duplicate exam_id or email
         cur.execute("SELECT 1 FROM student WHERE exam_id = %s OR email = %s", (exam_id, email))
         if cur.fetchone():
@@ -1911,95 +1757,67 @@ def upload():
     if not allowed_file(file.filename):
         return redirect(url_for(
             "admin.dashboard",
-            error="Only Excel files (.xlsx, .xls) are allowed"
+            error="Only Excel or CSV files (.xlsx, .xls, .csv) are allowed"
         ))
 
     admin_username = session["admin_username"]
 
-    try:
-        df = pd.read_excel(file, dtype=str)
-        df.columns = df.columns.str.lower().str.strip()
+    # Identify if super or sub admin
+    if not g.admin:
+        return redirect(url_for("admin.dashboard", error="Admin not found"))
 
-        # Enforce exact required columns
-        required_cols = ["exam_id", "fullname", "email", "gender", "school_year"]
-        if list(df.columns) != required_cols:
-            return redirect(url_for(
-                "admin.dashboard",
-                error=f"Excel must contain exactly these columns in this order: {', '.join(required_cols)}"
-            ))
+    added_by_id = g.admin.id
+    added_by_type = "super" if g.admin.is_super_admin else "sub"
+    admin_campus = g.admin.campus_or_all
 
+    try:
         conn = get_db_connection()
         cur = conn.cursor()
 
-        # Identify if super admin
-        cur.execute("SELECT id, campus FROM super_admin WHERE username = %s", (admin_username,))
-        super_admin = cur.fetchone()
-        if super_admin:
-            added_by_id = super_admin[0]
-            added_by_type = "super"
-            admin_campus = super_admin[1] or "ALL"
-        else:
-            # Then check sub admin
-            cur.execute("SELECT id, campus FROM admin WHERE username = %s", (admin_username,))
-            sub_admin = cur.fetchone()
-            if not sub_admin:
-                cur.close()
-                conn.close()
-                return redirect(url_for("admin.dashboard", error="Admin not found"))
-            added_by_id = sub_admin[0]
-            added_by_type = "sub"
-            admin_campus = sub_admin[1]
-
-        inserted = 0
-        skipped = 0
-
-        for _, row in df.iterrows():
-            exam_id = (row.get("exam_id") or "").strip()
-            fullname = (row.get("fullname") or "").strip().upper()
-            email = (row.get("email") or "").strip()
-            gender = (row.get("gender") or "").strip()
-            school_year = (row.get("school_year") or "").strip()
-
-            # Skip invalid rows
-            if not all([exam_id, fullname, email, gender, school_year]) or "-" not in school_year:
-                skipped += 1
-                continue
-
-            # Check duplicates
-            cur.execute("SELECT 1 FROM student WHERE exam_id = %s OR email = %s", (exam_id, email))
-            if cur.fetchone():
-                skipped += 1
-                continue
-
-            # Insert student with added_by_id and added_by_type
-            cur.execute("""
-                INSERT INTO student
-                    (exam_id, fullname, email, gender, campus, added_by, added_by_type, school_year)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (exam_id, fullname, email, gender, admin_campus, added_by_id, added_by_type, school_year))
-            inserted += 1
-
-        # Log admin action
-        if inserted > 0:
-            cur.execute("""
-                INSERT INTO admin_logs (admin_username, campus, action)
-                VALUES (%s, %s, %s)
-            """, (admin_username, admin_campus, f"Added {inserted} new student(s) through Excel upload"))
+        # Parsing and inserting happen on a background worker; the request
+        # only stores the file and hands back the job id.
+        job_id = create_import_job(cur, file, admin_username, admin_campus, added_by_id, added_by_type)
 
         conn.commit()
         cur.close()
         conn.close()
 
-        # Redirect to respondents page like addParticipant
+        start_import_job(job_id)
+        resume_stale_imports()
+
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify(success=True, job_id=job_id), 202
+
         return redirect(url_for(
             "admin.dashboard",
             success=1,
-            message=f"Upload complete! Inserted: {inserted}, Skipped: {skipped}"
+            message="Upload received! Importing students in the background...",
+            import_job=job_id
         ))
 
     except Exception as e:
         return redirect(url_for("admin.dashboard", error=f"Error reading Excel file: {str(e)}"))
 
+@admin_bp.route("/import_status/<job_id>")
+def import_status(job_id):
+    if "admin_username" not in session:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    job = get_import_job(cur, job_id, session["admin_username"])
+    cur.close()
+    conn.close()
+
+    if not job:
+        return jsonify({"error": "Import job not found"}), 404
+
+    # A worker that died mid-import is picked up again from its checkpoint.
+    if job["status"] == "queued" or job["stale"]:
+        start_import_job(job_id)
+
+    return jsonify(job)
+
 PER_PAGE = 20
 
 @admin_bp.route("/respondents")
@@ -2009,43 +1827,22 @@ def respondents():
 
     username = session["admin_username"]
 
+    if not g.admin:
+        return redirect(url_for("admin.login"))
+
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus
+
     conn = get_db_connection()
     cur = conn.cursor()
 
-    # Check super admin
-    cur.execute("SELECT username, campus FROM super_admin WHERE username = %s", (username,))
-    super_admin = cur.fetchone()
-    is_super_admin = bool(super_admin)
-
     if is_super_admin:
-        admin_campus = super_admin[1]
         # fetch all campuses for dropdown
-        cur.execute("SELECT campus_name FROM campus ORDER BY campus_name ASC")
-        campuses = [c[0] for c in cur.fetchall()]
+        campuses = campus_names()
     else:
-        cur.execute("SELECT username, campus FROM admin WHERE username = %s", (username,))
-        admin = cur.fetchone()
-        if not admin:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_campus = admin[1]
         campuses = [{"campus_name": admin_campus}]  # only their campus
 
-    cur.execute("""
-        SELECT campus_name, campus_address 
-        FROM campus 
-        WHERE campus_name = %s
-    """, (admin_campus,))
-
-    campus_data = cur.fetchone()
-
-    if campus_data:
-        campus_name = campus_data[0]
-        campus_address = campus_data[1]
-    else:
-        campus_name = admin_campus
-        campus_address = ""
+    campus_name, campus_address = campus_header(admin_campus)
 
     selected_campus = request.args.get("campus", "")
     selected_program = request.args.get("program", "")
@@ -2123,88 +1920,63 @@ def respondents():
     if where_clause:
         where_clause = "AND " + where_clause
 
-    sql = f"""
-        SELECT s.exam_id, s.fullname, sa.preferred_program,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
-        FROM student s
-        LEFT JOIN student_survey_answer sa ON s.exam_id = sa.exam_id
-        WHERE s.school_year = %s
-        {where_clause}
-        ORDER BY s.fullname ASC;
-    """
-
-    cur.execute(sql, params)
-    raw_students = cur.fetchall()
-
-    students = []
-
-    for row in raw_students:
-        exam_id, fullname, preferred_program, *pairs = row
-        answers_clean = [p for p in pairs if p]
-
-        top_letters = [l for l, _ in Counter(answers_clean).most_common(3)]
-        top_letters = [l.strip().upper() for l in top_letters]
-
-        program_letters = []
-
-        if preferred_program:
-            cur.execute("""
-                SELECT category_letter 
-                FROM program 
-                WHERE LOWER(TRIM(program_name)) = LOWER(TRIM(%s))
-                AND LOWER(TRIM(campus)) = LOWER(TRIM(%s))
+    # ===== MATCH STATUS IN SQL =====
+    # Top letters come from student_letter_scores and the preferred program's
+    # letters from the student's own campus, so the database can filter,
+    # count and page without handing the whole cohort back to Python.
+    cohort_sql = f"""
+        WITH cohort AS (
+            SELECT s.id, s.exam_id, s.fullname, sa.preferred_program,
+                   CASE
+                       WHEN NULLIF(sa.preferred_program, '') IS NULL
+                            AND COALESCE(ls.answered_count, 0) = 0 THEN '——'
+                       WHEN array_remove(regexp_split_to_array(COALESCE(ls.top_letters, ''), ''), '')
+                            && array_remove(string_to_array(UPPER(REPLACE(COALESCE(pl.category_letter, ''), ' ', '')), ','), '')
+                            THEN 'Match'
+                       ELSE 'Not Match'
+                   END AS match_status
+            FROM student s
+            LEFT JOIN student_survey_answer sa ON s.exam_id = sa.exam_id
+            LEFT JOIN student_letter_scores ls ON ls.student_id = s.id
+            LEFT JOIN LATERAL (
+                SELECT p.category_letter
+                FROM program p
+                WHERE LOWER(TRIM(p.program_name)) = LOWER(TRIM(sa.preferred_program))
+                AND LOWER(TRIM(p.campus)) = LOWER(TRIM(s.campus))
+                ORDER BY p.id
                 LIMIT 1
-            """, (preferred_program, admin_campus if not is_super_admin else (selected_campus or admin_campus)))
+            ) pl ON TRUE
+            WHERE s.school_year = %s
+            {where_clause}
+        )
+    """
 
-            result = cur.fetchone()
+    status_clause = ""
+    if status_filter == "match":
+        status_clause = "WHERE match_status = 'Match'"
+    elif status_filter == "not_match":
+        status_clause = "WHERE match_status = 'Not Match'"
 
-            if result and result[0]:
-                program_letters = [l.strip().upper() for l in result[0].split(",")]
-            else:
-                program_letters = []
+    ensure_letter_scores_table()
 
-        common_letters = set(top_letters) & set(program_letters)
+    cur.execute(cohort_sql + f"SELECT COUNT(*) FROM cohort {status_clause};", params)
+    total_students = cur.fetchone()[0]
 
-        if not preferred_program and not answers_clean:
-            match_status = "——"
-        elif common_letters:
-            match_status = "Match"
-        else:
-            match_status = "Not Match"
+    total_pages = ceil(total_students / PER_PAGE)
+    offset = (max(page, 1) - 1) * PER_PAGE
 
-        students.append((exam_id, fullname, preferred_program, match_status))
+    cur.execute(cohort_sql + f"""
+        SELECT exam_id, fullname, preferred_program, match_status
+        FROM cohort
+        {status_clause}
+        ORDER BY fullname ASC, id ASC
+        LIMIT %s OFFSET %s;
+    """, params + [PER_PAGE, offset])
+    students_paginated = [tuple(row) for row in cur.fetchall()]
 
     cur.close()
     conn.close()
 
-    if status_filter == "match":
-        students = [s for s in students if s[3] == "Match"]
-    elif status_filter == "not_match":
-        students = [s for s in students if s[3] == "Not Match"]
-
-    total_students = len(students)
-    total_pages = ceil(total_students / PER_PAGE)
-    start = (page - 1) * PER_PAGE
-    end = start + PER_PAGE
-    students_paginated = students[start:end]
-
     return render_template(
         "admin/respondents.html",
         admin_username=username,
@@ -2232,51 +2004,20 @@ def adminSurveyResult():
         flash("Invalid request. No Exam ID provided.")
         return redirect(url_for("admin.dashboard"))
     
-    admin_username = session["admin_username"]
+    # --- Get admin info ---
+    if not g.admin:
+        return redirect(url_for("admin.login"))
+
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus
 
     conn = get_db_connection()
     cur = conn.cursor()
 
-    # --- Get admin info ---
-    cur.execute("SELECT fullname, campus FROM super_admin WHERE username = %s", (admin_username,))
-    super_admin = cur.fetchone()
-    is_super_admin = bool(super_admin)
-
-    if super_admin:
-        admin_fullname = super_admin[0]
-        admin_campus = super_admin[1]
-    else:
-        cur.execute("SELECT fullname, campus FROM admin WHERE username = %s", (admin_username,))
-        admin = cur.fetchone()
-        if not admin:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_fullname = admin[0]
-        admin_campus = admin[1]
-
     cur.execute("""
         SELECT s.exam_id, s.fullname, s.school_year, s.campus, s.photo,
                c.campus_name, c.campus_address, c.guidance_counselor,
-               sa.preferred_program, sa.ai_explanation,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
+               sa.preferred_program, sa.ai_explanation, s.id
         FROM student s
         LEFT JOIN student_survey_answer sa ON s.exam_id = sa.exam_id
         LEFT JOIN campus c ON s.campus = c.campus_name
@@ -2300,68 +2041,32 @@ def adminSurveyResult():
         "campus_address": row[6],
         "guidance_counselor": row[7],
         "preferred_program": row[8],
-        "ai_explanation": format_ai_explanation_for_pdf(row[9]),
-        "answers": [row[i] for i in range(10, 96)]
+        "ai_explanation": format_ai_explanation_for_pdf(row[9])
     }
+    student_id = row[10]
 
     # --- Fetch all campuses and addresses ---
-    cur.execute("SELECT campus_name, campus_address FROM campus")
-    campus_info = {c[0]: c[1] for c in cur.fetchall()}
+    campus_info = campus_addresses()
 
-    answers_clean = student_results["answers"]
+    scores = get_letter_scores(cur, student_id)
+    answers_clean = bool(scores and scores["answered_count"])
     preferred = student_results["preferred_program"]
 
-    top_letters = []
-    program_letters = []
+    top_letters = scores["top_letters"] if answers_clean else []
 
-    if answers_clean:
-        letter_counts = Counter(answers_clean)
-        top_letters = [letter for letter, _ in letter_counts.most_common(3)]
-        top_letters = [letter.strip().upper() for letter in top_letters]
+    match_status = program_match_status(
+        preferred,
+        scores["top_mask"] if answers_clean else 0,
+        get_program_mask(student_results["campus"], preferred),
+        answers_clean
+    )
 
-    if preferred:
-        cur.execute("""
-            SELECT category_letter 
-            FROM program 
-            WHERE LOWER(TRIM(program_name)) = LOWER(TRIM(%s))
-            AND LOWER(TRIM(campus)) = LOWER(TRIM(%s))
-            LIMIT 1
-        """, (preferred, student_results["campus"]))
+    predicted_programs = []
 
-        result = cur.fetchone()
+    if top_letters:
+        predicted_programs = get_catalog().predicted_programs(student_results["campus"], top_letters)
 
-        if result and result[0]:
-            program_letters = [letter.strip().upper() for letter in result[0].split(",")]
-        else:
-            program_letters = []
-
-    if not preferred and not answers_clean:
-        match_status = "Not Yet Answer"
-    elif any(letter in program_letters for letter in top_letters):
-        match_status = "Match"
-    else:
-        match_status = "Not Match"
-
-    predicted_programs = []
-
-    if top_letters:
-        conditions = " OR ".join(["category_letter ILIKE %s"] * len(top_letters))
-        values = [f"%{letter}%" for letter in top_letters]
-
-        query = f"""
-            SELECT DISTINCT ON (program_name) program_name, category_letter
-            FROM program
-            WHERE ({conditions})
-            AND TRIM(LOWER(campus)) = TRIM(LOWER(%s))
-            ORDER BY program_name
-            LIMIT 5
-        """
-
-        values.append(student_results["campus"])
-        cur.execute(query, values)
-        predicted_programs = cur.fetchall()
-
-    conn.close()
+    conn.close()
 
     return render_template(
         "admin/adminSurveyResult.html",
@@ -2382,57 +2087,15 @@ def adminSurveyResult():
         year=year
     )
 
-@admin_bp.route('/download_result/<exam_id>')
-def download_result(exam_id):
-    if not exam_id:
-        flash("Invalid request.")
-        return redirect(url_for('admin.dashboard'))
-    
-    admin_username = session["admin_username"]
-
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    # --- Get admin info ---
-    cur.execute("SELECT fullname, campus FROM super_admin WHERE username = %s", (admin_username,))
-    super_admin = cur.fetchone()
-    is_super_admin = bool(super_admin)
-
-    if super_admin:
-        admin_fullname = super_admin[0]
-        admin_campus = super_admin[1]
-    else:
-        cur.execute("SELECT fullname, campus FROM admin WHERE username = %s", (admin_username,))
-        admin = cur.fetchone()
-        if not admin:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_fullname = admin[0]
-        admin_campus = admin[1]
-
+def survey_result_pdf_context(cur, exam_id):
+    """
+    Template kwargs for admin/adminSurveyResultPDF.html, or None if the
+    exam ID is unknown. Shared by download_result and the bulk export.
+    """
     cur.execute("""
         SELECT s.exam_id, s.fullname, s.school_year, s.campus, s.photo,
                c.campus_name, c.guidance_counselor,
-               sa.preferred_program, sa.ai_explanation,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
+               sa.preferred_program, sa.ai_explanation, s.id
         FROM student s
         LEFT JOIN student_survey_answer sa ON s.exam_id = sa.exam_id
         LEFT JOIN campus c ON s.campus = c.campus_name
@@ -2442,7 +2105,7 @@ def download_result(exam_id):
     row = cur.fetchone()
 
     if not row:
-        return "Survey results not found", 404
+        return None
 
     year = row[2]
 
@@ -2455,59 +2118,33 @@ def download_result(exam_id):
         "campus_name": row[5],
         "guidance_counselor": row[6],
         "preferred_program": row[7],
-        "ai_explanation": format_ai_explanation_for_pdf(row[8]),
-        "answers": [row[i] for i in range(9, 95)]
+        "ai_explanation": format_ai_explanation_for_pdf(row[8])
     }
-    
-    cur.execute("SELECT campus_name, campus_address FROM campus")
-    campus_info = {c[0]: c[1] for c in cur.fetchall()}
-
-    answers_clean = [a for a in student_data["answers"] if a]
-    letter_counts = Counter(answers_clean)
-    top_letters = [l for l, _ in letter_counts.most_common(3)]
-
-    preferred = student_data["preferred_program"]
-    if not preferred and not answers_clean:
-        match_status = "Not Yet Answer"
-    elif preferred in preferred_program_map and any(
-        l in preferred_program_map[preferred] for l in top_letters
-    ):
-        match_status = "Match"
-    else:
-        match_status = "Not Match"
+    student_id = row[9]
+
+    scores = get_letter_scores(cur, student_id)
+    answers_clean = bool(scores and scores["answered_count"])
+    top_letters = scores["top_letters"] if answers_clean else []
+
+    # Same rule as the on-screen result: the program's letters on the
+    # student's campus, not the short-code preferred_program_map.
+    match_status = program_match_status(
+        student_data["preferred_program"],
+        scores["top_mask"] if answers_clean else 0,
+        get_program_mask(student_data["campus"], student_data["preferred_program"]),
+        answers_clean
+    )
 
     predicted_programs = []
 
     if top_letters:
-        conditions = " OR ".join(["category_letter ILIKE %s"] * len(top_letters))
-        values = [f"%{letter}%" for letter in top_letters]
-
-        query = f"""
-            SELECT DISTINCT ON (program_name) program_name, category_letter
-            FROM program
-            WHERE ({conditions})
-            AND TRIM(LOWER(campus)) = TRIM(LOWER(%s))
-            ORDER BY program_name
-            LIMIT 5
-        """
-
-        values.append(student_data["campus"])
-        cur.execute(query, values)
-        predicted_programs = cur.fetchall()
-
-    student_photo_base64 = None
+        predicted_programs = get_catalog().predicted_programs(student_data["campus"], top_letters)
 
     student_photo_base64 = student_photo_to_base64(student_data.get("photo"))
 
-    cur.execute("SELECT campus_name, campus_address FROM campus")
-    campus_info = {c[0]: c[1] for c in cur.fetchall()}
+    campus_info = campus_addresses()
 
-    cpsu_logo = image_to_base64("cpsulogo.png")
-    bagong_logo = image_to_base64("bagong-pilipinas-logo.png")
-    safe_logo = image_to_base64("logo.png")
-
-    html = render_template(
-        "admin/adminSurveyResultPDF.html",
+    return dict(
         guidance_counselor=student_data["guidance_counselor"],
         campus_name=student_data["campus_name"],
         student_data=student_data,
@@ -2519,23 +2156,38 @@ def download_result(exam_id):
         ai_explanation=student_data["ai_explanation"],
         year=year,
         predicted_programs=predicted_programs,
-        cpsu_logo_base64=cpsu_logo,
-        bagong_logo_base64=bagong_logo,
-        safe_logo_base64=safe_logo,
-        student_photo_base64=student_photo_base64
+        student_photo_base64=student_photo_base64,
+        **pdf_logos()
     )
 
-    pdf_io = BytesIO()
-    HTML(string=html, base_url=current_app.root_path).write_pdf(pdf_io)
-    pdf_io.seek(0)
+def survey_result_pdf_filename(context):
+    student_data = context["student_data"]
+    return f"Career_Survey_Result_{student_data['exam_id']}_{student_data['fullname']}.pdf"
+
+@admin_bp.route('/download_result/<exam_id>')
+def download_result(exam_id):
+    if not exam_id:
+        flash("Invalid request.")
+        return redirect(url_for('admin.dashboard'))
+    
+    # --- Get admin info ---
+    if not g.admin:
+        return redirect(url_for("admin.login"))
+
+    conn = get_db_connection()
+    cur = conn.cursor()
 
-    filename = f"Career_Survey_Result_{student_data['exam_id']}_{student_data['fullname']}.pdf"
+    context = survey_result_pdf_context(cur, exam_id)
 
-    return send_file(
-        pdf_io,
-        mimetype="application/pdf",
-        download_name=filename,
-        as_attachment=True
+    if not context:
+        return "Survey results not found", 404
+
+    html = render_template("admin/adminSurveyResultPDF.html", **context)
+
+    return send_cached_pdf(
+        pdf_cache_key("admin/adminSurveyResultPDF.html", html),
+        lambda: render_pdf(html, "survey result"),
+        survey_result_pdf_filename(context)
     )
 
 PER_PAGE = 20
@@ -2547,44 +2199,23 @@ def adminInventory():
 
     username = session["admin_username"]
 
+    if not g.admin:
+        return redirect(url_for("admin.login"))
+
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus
+
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    # Check super admin
-    cur.execute("SELECT id, campus FROM super_admin WHERE username = %s", (username,))
-    super_admin_row = cur.fetchone()
-    is_super_admin = bool(super_admin_row)
-
     if is_super_admin:
-        admin_campus = super_admin_row["campus"]
         # Fetch all campuses for dropdown
-        cur.execute("SELECT campus_name FROM campus ORDER BY campus_name ASC")
-        campuses = cur.fetchall()
+        campuses = [{"campus_name": name} for name in campus_names()]
     else:
         # Sub admin
-        cur.execute("SELECT id, campus FROM admin WHERE username = %s", (username,))
-        admin_row = cur.fetchone()
-        if not admin_row:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_campus = admin_row["campus"]
         campuses = [{"campus_name": admin_campus}]
 
-    cur.execute("""
-        SELECT campus_name, campus_address 
-        FROM campus 
-        WHERE campus_name = %s
-    """, (admin_campus,))
-
-    campus_data = cur.fetchone()
-
-    if campus_data:
-        campus_name = campus_data["campus_name"]
-        campus_address = campus_data["campus_address"]
-    else:
-        campus_name = admin_campus
-        campus_address = ""
+    campus_name, campus_address = campus_header(admin_campus)
 
     cur.execute("""
         SELECT DISTINCT school_year
@@ -2710,42 +2341,17 @@ def adminInventoryResult():
 
     username = session["admin_username"]
 
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
     # --- Get admin info ---
-    cur.execute("SELECT id, campus FROM super_admin WHERE username = %s", (username,))
-    admin = cur.fetchone()
-
-    is_super_admin = False
-    admin_campus = None
-
-    if admin:
-        is_super_admin = True
-        admin_id, admin_campus = admin
-    else:
-        cur.execute("SELECT id, campus FROM admin WHERE username = %s", (username,))
-        admin = cur.fetchone()
-        if not admin:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_id, admin_campus = admin
+    if not g.admin:
+        return redirect(url_for("admin.login"))
 
-    cur.execute("""
-        SELECT campus_name, campus_address 
-        FROM campus 
-        WHERE campus_name = %s
-    """, (admin_campus,))
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus
 
-    campus_data = cur.fetchone()
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    if campus_data:
-        campus_name = campus_data["campus_name"]
-        campus_address = campus_data["campus_address"]
-    else:
-        campus_name = admin_campus
-        campus_address = ""
+    campus_name, campus_address = campus_header(admin_campus)
 
     cur.execute("""
         SELECT 
@@ -2819,8 +2425,7 @@ def adminInventoryResult():
     if info and info["photo"]:
         student_photo_base64 = student_photo_to_base64(info["photo"])
 
-    cur.execute("SELECT campus_name, campus_address FROM campus")
-    campus_info = {c[0]: c[1] for c in cur.fetchall()}
+    campus_info = campus_addresses()
 
     cur.execute("""
         SELECT reasons, other_reason
@@ -2869,14 +2474,11 @@ def adminInventoryResult():
         campus_name=campus_name
     )
 
-@admin_bp.route('/download_admin_inventory_pdf/<int:student_id>')
-def download_admin_inventory_pdf(student_id):
-    if "admin_username" not in session:
-        return redirect(url_for("admin.login"))
-
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
+def inventory_pdf_context(cur, student_id, admin_username):
+    """
+    Template kwargs for admin/adminInventoryResultPDF.html, or None if the
+    student does not exist. Expects a DictCursor.
+    """
     cur.execute("""
         SELECT 
             s.id AS id,
@@ -2912,14 +2514,13 @@ def download_admin_inventory_pdf(student_id):
 
     info = cur.fetchone()
     if not info:
-        return "Student Inventory results not found.", 404
+        return None
 
     student_photo_base64 = None
-    if info and info["photo"]:
+    if info["photo"]:
         student_photo_base64 = student_photo_to_base64(info["photo"])
 
-    cur.execute("SELECT campus_name, campus_address FROM campus")
-    campus_info = {c[0]: c[1] for c in cur.fetchall()}
+    campus_info = campus_addresses()
 
     cur.execute("""
         SELECT reasons, other_reason
@@ -2935,20 +2536,14 @@ def download_admin_inventory_pdf(student_id):
     """, (student_id,))
     other_school_data = cur.fetchone()
 
-    cur.close()
-    conn.close()
-
     selected_reasons = enroll_reason[0].split(",") if enroll_reason and enroll_reason[0] else []
     other_reason = enroll_reason[1] if enroll_reason else ""
 
     other_schools_selected = other_school_data[0].split(",") if other_school_data and other_school_data[0] else []
     other_school = other_school_data[1] if other_school_data else ""
 
-    cpsu_logo_base64 = image_to_base64("cpsulogo.png")
-
-    html = render_template(
-        "admin/adminInventoryResultPDF.html",
-        admin_username=session["admin_username"],
+    return dict(
+        admin_username=admin_username,
         info=info,
         selected_reasons=selected_reasons,
         other_reason=other_reason,
@@ -2956,299 +2551,211 @@ def download_admin_inventory_pdf(student_id):
         other_school=other_school,
         student_photo_base64=student_photo_base64,
         campus_info=campus_info,
-        cpsu_logo_base64=cpsu_logo_base64
+        **pdf_logos("cpsu_logo_base64")
     )
 
-    pdf_io = BytesIO()
-    HTML(string=html, base_url=current_app.root_path).write_pdf(pdf_io)
-    pdf_io.seek(0)
-
-    filename = f"Inventory_{info['fullname'].replace(' ', '_')}.pdf"
+def inventory_pdf_filename(context):
+    return f"Inventory_{context['info']['fullname'].replace(' ', '_')}.pdf"
 
-    return send_file(
-        pdf_io,
-        mimetype="application/pdf",
-        download_name=filename,
-        as_attachment=True
-    )
-
-@admin_bp.route("/interviewAI/<int:student_id>")
-def interviewAI(student_id):
+@admin_bp.route('/download_admin_inventory_pdf/<int:student_id>')
+def download_admin_inventory_pdf(student_id):
     if "admin_username" not in session:
-        return jsonify({"error": "Unauthorized"}), 403
-
-    username = session["admin_username"]
+        return redirect(url_for("admin.login"))
 
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    # ===== ROLE CHECK =====
-    cur.execute("SELECT campus FROM super_admin WHERE username = %s", (username,))
-    super_admin = cur.fetchone()
+    context = inventory_pdf_context(cur, student_id, session["admin_username"])
 
-    print("SESSION USERNAME:", username)
-    print("SUPER ADMIN RESULT:", super_admin)
-
-    if super_admin:
-        admin_campus = super_admin["campus"]
-        is_super_admin = True
-    else:
-        cur.execute("SELECT campus FROM admin WHERE username = %s", (username,))
-        sub_admin = cur.fetchone()
-
-        if not sub_admin:
-            return jsonify({"error": "Unauthorized"}), 403
-
-        admin_campus = sub_admin["campus"]
-        is_super_admin = False
-
-    # ===== STUDENT ACCESS CHECK =====
-    cur.execute("SELECT campus FROM student WHERE id = %s", (student_id,))
-    student = cur.fetchone()
-
-    if not student:
-        return jsonify({"error": "Student not found"}), 404
-
-    if not is_super_admin and student["campus"] != admin_campus:
-        return jsonify({"error": "Forbidden"}), 403
-
-    try:
-        # ===== CHECK EXISTING (VIEW) =====
-        cur.execute(
-            "SELECT questions FROM interview_questions WHERE student_id = %s",
-            (student_id,)
-        )
-        existing = cur.fetchone()
-
-        if existing:
-            data = json.loads(existing[0])
-
-            # Safety check
-            if "questions" not in data:
-                return jsonify({"error": "Invalid stored data"}), 500
+    cur.close()
+    conn.close()
 
-            return jsonify(data)
+    if not context:
+        return "Student Inventory results not found.", 404
 
-        # ===== FETCH STUDENT DATA =====
-        cur.execute("""
-            SELECT 
-                s.fullname,
-                sa.preferred_program,
-                sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-                sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-                sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-                sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-                sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-                sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-                sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-                sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-                sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-                sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-                sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-                sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-                sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-                sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-                sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-                sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-                sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-                sa.pair86
-            FROM student s
-            LEFT JOIN student_survey_answer sa ON s.id = sa.student_id
-            WHERE s.id = %s
-        """, (student_id,))
+    html = render_template("admin/adminInventoryResultPDF.html", **context)
 
-        row = cur.fetchone()
+    pdf_io = render_pdf(html, "inventory result")
 
-        if not row:
-            return jsonify({"error": "Student not found"}), 404
+    return send_file(
+        pdf_io,
+        mimetype="application/pdf",
+        download_name=inventory_pdf_filename(context),
+        as_attachment=True
+    )
 
-        fullname = row[0]
-        preferred_program = row[1]
-        letters = [l for l in row[2:] if l]
+# ===== BULK PDF EXPORT =====
+BULK_MATCH_LABELS = {"match": "Match", "not_match": "Not Match"}
 
-        if not letters:
-            return jsonify({"error": "No survey answers"}), 400
+@admin_bp.route("/bulk_export", methods=["POST"])
+def bulk_export():
+    if "admin_username" not in session:
+        return jsonify(success=False, message="Unauthorized"), 403
 
-        # ===== PROGRAM LETTERS =====
-        program_letters = []
-        if preferred_program:
-            cur.execute(
-                "SELECT category_letter FROM program WHERE program_name = %s",
-                (preferred_program,)
-            )
-            res = cur.fetchone()
-            if res and res[0]:
-                program_letters = [x.strip() for x in res[0].split(",")]
+    admin_username = session["admin_username"]
+    data = request.get_json(silent=True) or request.form
 
-        # ===== ANALYSIS =====
-        counts = Counter(letters)
-        top_three = [l for l, _ in counts.most_common(3)]
+    kind = data.get("kind", "survey")
+    campus = data.get("campus")
+    school_year = data.get("school_year")
+    match_filter = data.get("match", "")
 
-        top_three_descriptions = [
-            short_letter_descriptions.get(l, "Unknown")
-            for l in top_three
-        ]
+    if kind not in ("survey", "inventory") or match_filter not in ("", *BULK_MATCH_LABELS):
+        return jsonify(success=False, message="Invalid export options"), 400
 
-        all_letter_descriptions = [
-            short_letter_descriptions.get(l, "Unknown")
-            for l in letters
-        ]
+    if not g.admin:
+        return jsonify(success=False, message="Unauthorized"), 403
 
-        program_descriptions = [
-            short_letter_descriptions.get(l, "Unknown")
-            for l in program_letters
-        ]
+    if not g.admin.is_super_admin:
+        campus = g.admin.campus  # sub admins can only export their own campus
 
-        # ===== AI PROMPT =====
-        prompt = f"""
-You are an expert educational guidance counselor AI.
+    if not campus or not school_year:
+        return jsonify(success=False, message="Campus and school year are required"), 400
 
-Your job is to analyze if a student's chosen program aligns with their interests,
-and generate SMART, NATURAL, and VARIED interview questions.
+    conn = get_db_connection()
+    cur = conn.cursor()
 
----
+    cur.execute("""
+        SELECT s.id, s.exam_id
+        FROM student s
+        WHERE s.campus = %s AND s.school_year = %s
+        ORDER BY s.fullname ASC, s.id ASC
+    """, (campus, school_year))
+    students = cur.fetchall()
 
-🎯 GOALS:
+    cur.close()
+    conn.close()
 
-1. Detect alignment level:
-   - STRONG MATCH → interests align well
-   - PARTIAL MATCH → some overlap
-   - MISMATCH → little to no overlap
+    if not students:
+        return jsonify(success=False, message="No students found for that campus and year"), 404
 
-2. Adjust explanation tone:
-   - If mismatch is strong → clearly explain concern
-   - If partial → suggest exploration
-   - If strong match → reinforce decision
+    def producer():
+        # Runs on the export thread: HTML is rendered here, PDFs in the pool.
+        conn = get_db_connection()
+        try:
+            cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
----
+            for student_id, exam_id in students:
+                context = survey_result_pdf_context(cur, exam_id)
 
-🧠 QUESTION GENERATION RULES:
+                if not context or (
+                    match_filter and context["match_status"] != BULK_MATCH_LABELS[match_filter]
+                ):
+                    yield None
+                    continue
 
-Generate EXACTLY 6 questions that are:
+                if kind == "survey":
+                    html = render_template("admin/adminSurveyResultPDF.html", **context)
+                    yield survey_result_pdf_filename(context), html
+                else:
+                    context = inventory_pdf_context(cur, student_id, admin_username)
+                    if not context:
+                        yield None
+                        continue
+                    html = render_template("admin/adminInventoryResultPDF.html", **context)
+                    yield inventory_pdf_filename(context), html
+
+            # get_letter_scores may have filled in missing score rows
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
 
-✔ Natural and conversational (like a real counselor)
-✔ NOT repetitive in structure
-✔ RANDOMIZED phrasing each time
-✔ Personalized using:
-   - Preferred program
-   - Student top interests
+    label = "Career_Survey_Results" if kind == "survey" else "Inventory_Results"
+    zip_name = f"{label}_{campus}_{school_year}.zip".replace(" ", "_")
 
-✔ Mix of:
-   - 2 program-focused questions
-   - 2 interest-based questions
-   - 2 hybrid (program + interest)
+    job_id = start_export(
+        current_app._get_current_object(), producer, len(students), admin_username, zip_name
+    )
 
-✔ Use varied sentence starters such as:
-   - "What draws you to..."
-   - "How do you see yourself..."
-   - "Have you considered..."
-   - "In what ways do you think..."
-   - "Would you be interested in..."
-   - "Can you imagine..."
+    return jsonify(success=True, job_id=job_id, total=len(students)), 202
 
-❌ DO NOT repeat patterns
-❌ DO NOT make generic questions
-❌ DO NOT use identical structure
+@admin_bp.route("/bulk_export_status/<job_id>")
+def bulk_export_status(job_id):
+    if "admin_username" not in session:
+        return jsonify(success=False, message="Unauthorized"), 403
 
----
+    job = get_export(job_id, owner=session["admin_username"])
+    if not job:
+        return jsonify(success=False, message="Export not found"), 404
 
-📊 STUDENT DATA:
+    return jsonify(export_progress(job))
 
-Student Name: {fullname}
-Preferred Program: {preferred_program}
+@admin_bp.route("/bulk_export_download/<job_id>")
+def bulk_export_download(job_id):
+    if "admin_username" not in session:
+        return redirect(url_for("admin.login"))
 
-Program Category Letters: {program_letters}
-Program Descriptions: {program_descriptions}
+    job = get_export(job_id, owner=session["admin_username"])
+    if not job:
+        return jsonify(success=False, message="Export not found"), 404
 
-Top 3 Interest Letters: {top_three}
-Top 3 Interest Descriptions: {top_three_descriptions}
+    if job["status"] != "done":
+        return jsonify(export_progress(job)), 409
 
----
+    return send_file(
+        job["path"],
+        mimetype="application/zip",
+        download_name=job["zip_name"],
+        as_attachment=True
+    )
 
-🧩 ANALYSIS TASK:
+@admin_bp.route("/interviewAI/<int:student_id>")
+def interviewAI(student_id):
+    if "admin_username" not in session:
+        return jsonify({"error": "Unauthorized"}), 403
 
-Compare:
-- Program descriptions vs student interest descriptions
+    # ===== ROLE CHECK =====
+    if not g.admin:
+        return jsonify({"error": "Unauthorized"}), 403
 
-Determine:
-- Alignment level (strong / partial / mismatch)
+    admin_campus = g.admin.campus
+    is_super_admin = g.admin.is_super_admin
 
----
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-📌 OUTPUT REQUIREMENTS:
+    # ===== STUDENT ACCESS CHECK =====
+    cur.execute("SELECT campus FROM student WHERE id = %s", (student_id,))
+    student = cur.fetchone()
 
-Return STRICT JSON ONLY:
+    if not student:
+        return jsonify({"error": "Student not found"}), 404
 
-{{
-  "questions": [
-    "6 unique, varied, natural questions here"
-  ],
-  "mismatch_reason": "Clear explanation of alignment level and reasoning",
-  "talking_points": [
-    "3 smart counseling suggestions based on alignment level"
-  ]
-}}
+    if not is_super_admin and student["campus"] != admin_campus:
+        return jsonify({"error": "Forbidden"}), 403
 
----
+    try:
+        # ===== CHECK EXISTING (VIEW) =====
+        cur.execute(
+            "SELECT questions FROM interview_questions WHERE student_id = %s",
+            (student_id,)
+        )
+        existing = cur.fetchone()
 
-💡 TALKING POINTS GUIDE:
+        if existing:
+            data = json.loads(existing[0])
 
-If STRONG MATCH:
-- Reinforce choice
-- Suggest growth paths
-- Encourage specialization
+            # Safety check
+            if "questions" not in data:
+                return jsonify({"error": "Invalid stored data"}), 500
 
-If PARTIAL:
-- Suggest combining interests
-- Recommend electives or minors
-- Encourage exploration
+            return jsonify(data)
 
-If MISMATCH:
-- Suggest alternative programs
-- Suggest hybrid careers
-- Encourage reconsideration or deeper reflection
+        # ===== FETCH STUDENT DATA =====
+        inputs = load_interview_inputs(cur, student_id)
 
----
+        if not inputs:
+            return jsonify({"error": "Student not found"}), 404
 
-⚠️ IMPORTANT:
-- Use ONLY given descriptions
-- Do NOT invent traits
-- Do NOT mention Holland or theory names
-- Keep tone supportive, not judgmental
-"""
+        if not inputs["answered"]:
+            return jsonify({"error": "No survey answers"}), 400
 
         # ===== CALL AI =====
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": "Return ONLY valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1000
-        )
-
-        raw = response.choices[0].message.content.strip()
-
-        # ===== SAFE JSON PARSE =====
-        try:
-            data = json.loads(raw)
-        except:
-            match = re.search(r"\{.*\}", raw, re.S)
-            if not match:
-                raise ValueError("Invalid JSON from AI")
-            data = json.loads(match.group())
+        data = generate_interview_questions(inputs)
 
         # ===== SAVE (NO CONFLICT VERSION) =====
-        cur.execute(
-            "DELETE FROM interview_questions WHERE student_id = %s",
-            (student_id,)
-        )
-
-        cur.execute(
-            "INSERT INTO interview_questions (student_id, questions) VALUES (%s, %s)",
-            (student_id, json.dumps(data))
-        )
+        save_interview_questions(cur, student_id, data)
 
         conn.commit()
 
@@ -3263,96 +2770,79 @@ If MISMATCH:
         cur.close()
         conn.close()
 
-PER_PAGE = 20
-
-@admin_bp.route("/interviewList")
-def interviewList():
+@admin_bp.route("/interviewAI/batch", methods=["POST"])
+def interviewAI_batch():
     if "admin_username" not in session:
-        return redirect(url_for("admin.login"))
+        return jsonify({"error": "Unauthorized"}), 403
 
-    conn = get_db_connection()
-    cur = conn.cursor()
     username = session["admin_username"]
+    params = request.get_json(silent=True) or request.form
+
+    # ===== ROLE CHECK =====
+    if not g.admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    admin_campus = g.admin.campus
+    is_super_admin = g.admin.is_super_admin
 
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-    # Check super admin
-    cur.execute("SELECT id, campus FROM super_admin WHERE username = %s", (username,))
-    super_admin_row = cur.fetchone()
-    is_super_admin = bool(super_admin_row)
+    # ===== SAME STUDENTS AS THE INTERVIEW LIST =====
+    selected_year = params.get("year")
+    if not selected_year:
+        cur.execute("SELECT MAX(school_year) FROM student WHERE school_year IS NOT NULL")
+        selected_year = cur.fetchone()[0]
 
-    if is_super_admin:
-        admin_campus = super_admin_row["campus"]
-        # Fetch all campuses for dropdown
-        cur.execute("SELECT campus_name FROM campus ORDER BY campus_name ASC")
-        campuses = cur.fetchall()
-    else:
-        # Sub admin
-        cur.execute("SELECT id, campus FROM admin WHERE username = %s", (username,))
-        admin_row = cur.fetchone()
-        if not admin_row:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_campus = admin_row["campus"]
-        campuses = [{"campus_name": admin_campus}]
+    students = interview_list_students(
+        cur,
+        selected_year,
+        params.get("q", ""),
+        is_super_admin,
+        params.get("campus", ""),
+        admin_campus
+    )
 
-    cur.execute("""
-        SELECT campus_name, campus_address 
-        FROM campus 
-        WHERE campus_name = %s
-    """, (admin_campus,))
+    cur.close()
+    conn.close()
 
-    campus_data = cur.fetchone()
+    pending = [student[0] for student in students if not student[4]]
 
-    if campus_data:
-        campus_name = campus_data["campus_name"]
-        campus_address = campus_data["campus_address"]
-    else:
-        campus_name = admin_campus
-        campus_address = ""
+    if not pending:
+        return jsonify({"job_id": None, "status": "done", "total": 0})
 
-    selected_campus = request.args.get("campus", "")
-    search_query = request.args.get("q", "")
-    page = request.args.get("page", 1, type=int)
+    job_id = start_interview_batch(pending, owner=username)
+    print(f"Interview batch {job_id}: {len(pending)} student(s) queued by {username}")
 
-    # Fetch available years first
-    cur.execute("""
-        SELECT DISTINCT school_year
-        FROM student
-        WHERE school_year IS NOT NULL
-        ORDER BY school_year DESC;
-    """)
-    available_years = [row[0] for row in cur.fetchall()]
+    return jsonify({"job_id": job_id, "status": "queued", "total": len(pending)}), 202
 
-    # Get selected year from query string, default to latest available year
-    selected_year = request.args.get("year") or (available_years[0] if available_years else None)
+@admin_bp.route("/interviewAI/batch_status/<job_id>")
+def interviewAI_batch_status(job_id):
+    if "admin_username" not in session:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    job = get_interview_batch(job_id, owner=session["admin_username"])
+    if not job:
+        return jsonify({"error": "Batch not found"}), 404
 
+    return jsonify(interview_batch_progress(job))
+
+PER_PAGE = 20
+
+def interview_list_students(cur, selected_year, search_query, is_super_admin, selected_campus, admin_campus):
+    """
+    "Not Match" students shown on the interview list, as
+    (student_id, exam_id, fullname, schedule_str, has_interview) tuples.
+    """
     query = """
         SELECT 
             s.id,
             s.exam_id,
             s.fullname,
+            s.campus,
             sa.preferred_program,
-            sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-            sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-            sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-            sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-            sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-            sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-            sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-            sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-            sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-            sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-            sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-            sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-            sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-            sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-            sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-            sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-            sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-            sa.pair86,
+            ls.top_letters,
+            ls.answered_count,
             sch.schedule_date,
             sch.start_time,
             sch.end_time,
@@ -3362,6 +2852,7 @@ def interviewList():
             END AS has_interview
         FROM student s
         LEFT JOIN student_survey_answer sa ON s.id = sa.student_id
+        LEFT JOIN student_letter_scores ls ON ls.student_id = s.id
         LEFT JOIN student_schedules ss ON s.id = ss.student_id
         LEFT JOIN schedules sch ON ss.schedule_id = sch.id
         LEFT JOIN interview_questions iq ON s.id = iq.student_id
@@ -3386,59 +2877,77 @@ def interviewList():
 
     query += " ORDER BY s.fullname ASC"
 
+    ensure_letter_scores_table()
     cur.execute(query, tuple(params))
     raw_students = cur.fetchall()
 
+    # ✅ One mask pass over the whole cohort, each student on their own campus
+    statuses = cohort_match_statuses(
+        ((row[3], row[4], row[5], row[6]) for row in raw_students),
+        get_catalog().program_mask
+    )
+
     students = []
 
-    for row in raw_students:
-        student_id, exam_id, fullname, preferred_program, *rest = row
-        pairs = rest[:-4]
-        schedule_date, start_time, end_time, has_interview = rest[-4:]
+    for row, match_status in zip(raw_students, statuses):
+        student_id, exam_id, fullname = row[:3]
+        schedule_date, start_time, end_time, has_interview = row[7:]
 
-        answers_clean = [p for p in pairs if p]
-        top_letters = [l for l, _ in Counter(answers_clean).most_common(3)]
+        if match_status == "Not Match":
+            schedule_str = (
+                f"{schedule_date.strftime('%Y-%m-%d')} "
+                f"({start_time.strftime('%I:%M %p')} - {end_time.strftime('%I:%M %p')})"
+                if schedule_date else None
+            )
 
-        # ✅ CLEAN top letters
-        top_letters = [l.strip().upper() for l in top_letters]
+            students.append((student_id, exam_id, fullname, schedule_str, has_interview))
 
-        program_letters = []
+    return students
 
-        # ✅ Determine correct campus to use
-        student_campus = selected_campus if is_super_admin and selected_campus else admin_campus
+@admin_bp.route("/interviewList")
+def interviewList():
+    if "admin_username" not in session:
+        return redirect(url_for("admin.login"))
 
-        if preferred_program:
-            cur.execute("""
-                SELECT category_letter 
-                FROM program 
-                WHERE LOWER(TRIM(program_name)) = LOWER(TRIM(%s))
-                AND LOWER(TRIM(campus)) = LOWER(TRIM(%s))
-                LIMIT 1
-            """, (preferred_program, student_campus))
+    username = session["admin_username"]
 
-            res = cur.fetchone()
+    if not g.admin:
+        return redirect(url_for("admin.login"))
 
-            if res and res[0]:
-                program_letters = [l.strip().upper() for l in res[0].split(",")]
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus
 
-        # ✅ Better match logic
-        common_letters = set(top_letters) & set(program_letters)
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-        if not preferred_program and not answers_clean:
-            match_status = "Not Yet Answer"
-        elif common_letters:
-            match_status = "Match"
-        else:
-            match_status = "Not Match"
+    if is_super_admin:
+        # Fetch all campuses for dropdown
+        campuses = [{"campus_name": name} for name in campus_names()]
+    else:
+        # Sub admin
+        campuses = [{"campus_name": admin_campus}]
 
-        if match_status == "Not Match":
-            schedule_str = (
-                f"{schedule_date.strftime('%Y-%m-%d')} "
-                f"({start_time.strftime('%I:%M %p')} - {end_time.strftime('%I:%M %p')})"
-                if schedule_date else None
-            )
+    campus_name, campus_address = campus_header(admin_campus)
 
-            students.append((student_id, exam_id, fullname, schedule_str, has_interview))
+    selected_campus = request.args.get("campus", "")
+    search_query = request.args.get("q", "")
+    page = request.args.get("page", 1, type=int)
+
+    # Fetch available years first
+    cur.execute("""
+        SELECT DISTINCT school_year
+        FROM student
+        WHERE school_year IS NOT NULL
+        ORDER BY school_year DESC;
+    """)
+    available_years = [row[0] for row in cur.fetchall()]
+
+    # Get selected year from query string, default to latest available year
+    selected_year = request.args.get("year") or (available_years[0] if available_years else None)
+
+    students = interview_list_students(
+        cur, selected_year, search_query, is_super_admin, selected_campus, admin_campus
+    )
 
     cur.close()
     conn.close()
@@ -3482,21 +2991,13 @@ def save_schedule():
     cur = conn.cursor()
 
     try:
-        cur.execute("""
-            SELECT campus FROM admin WHERE username = %s
-            UNION
-            SELECT campus FROM super_admin WHERE username = %s
-        """, (admin_username, admin_username))
-
-        result = cur.fetchone()
-
-        if not result:
+        if not g.admin:
             return jsonify({
                 "status": "error",
                 "error": "Admin campus not found."
             }), 400
 
-        admin_campus = result[0]
+        admin_campus = g.admin.campus
 
         cur.execute("""
             SELECT 1 FROM schedules 
@@ -3555,23 +3056,16 @@ def visualization():
         return redirect(url_for("admin.login"))
 
     username = session["admin_username"]
-    conn = get_db_connection()
-    cur = conn.cursor()
 
     # --- Check if super admin ---
-    cur.execute("SELECT id, campus FROM super_admin WHERE username = %s", (username,))
-    admin = cur.fetchone()
-    is_super_admin = bool(admin)
-    admin_campus = admin[1] if admin else None
+    if not g.admin:
+        return redirect(url_for("admin.login"))
 
-    if not is_super_admin:
-        cur.execute("SELECT id, campus FROM admin WHERE username = %s", (username,))
-        admin = cur.fetchone()
-        if not admin:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
-        admin_campus = admin[1]
+    is_super_admin = g.admin.is_super_admin
+    admin_campus = g.admin.campus
+
+    conn = get_db_connection()
+    cur = conn.cursor()
 
     selected_year = request.args.get("year", str(datetime.now().year))
     selected_gender = request.args.get("gender", "All")
@@ -3604,62 +3098,65 @@ def visualization():
         selected_year = available_years[0] if available_years else "All"
 
     # --- Fetch programs ---
-    cur.execute("SELECT id, program_name, color, campus FROM program ORDER BY id ASC;")
-    all_programs = cur.fetchall()
+    all_programs = [(p["id"], p["program_name"], p["color"], p["campus"]) for p in get_catalog().programs]
 
     # --- Fetch data for visualization ---
-    def fetch_data_for_year(year=None, gender=None, campus_filter=None):
-        filters = []
-        params = []
+    # Everything comes from survey_analytics_cube, which already holds one
+    # pre-aggregated row per campus × year × gender × preferred program;
+    # fetch_data_for_year then just sums the matching cells.
+    filters = []
+    params = []
+
+    if not is_super_admin:
+        filters.append("campus = %s")
+        params.append(admin_campus or "")
+    elif selected_campus:
+        filters.append("campus = %s")
+        params.append(selected_campus)
 
-        # --- CAMPUS FILTER ---
-        if campus_filter:
-            filters.append("s.campus = %s")
-            params.append(campus_filter)
+    if selected_year.lower() != "all":
+        filters.append("school_year = %s")
+        params.append(str(selected_year))
 
-        # --- YEAR FILTER ---
-        if year and str(year).lower() != "all":
-            filters.append("s.school_year = %s")
-            params.append(str(year))
+    if selected_gender and selected_gender != "All":
+        filters.append("gender = LOWER(%s)")
+        params.append(selected_gender)
 
-        # --- GENDER FILTER ---
-        if gender and gender != "All":
-            filters.append("LOWER(s.gender) = LOWER(%s)")
-            params.append(gender)
+    where_clause = "WHERE " + " AND ".join(filters) if filters else ""
 
-        where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+    ensure_analytics_cube_table()
+    cur.execute(f"""
+        SELECT campus, school_year, preferred_program, respondents, letter_counts
+        FROM survey_analytics_cube
+        {where_clause}
+    """, tuple(params))
+
+    preferred_rows = []
+    letter_rows = []
+    for campus, school_year, preferred_program, respondents, counts in cur.fetchall():
+        campus = campus or None
+        preferred_rows.append((campus, school_year, preferred_program, respondents))
+        letter_rows.extend(
+            (campus, school_year, slot, count)
+            for slot, count in enumerate(counts, start=1) if count
+        )
 
-        # --- Preferred programs ---
-        cur.execute(f"""
-            SELECT COALESCE(ssa.preferred_program, 'Unknown'), COUNT(*)
-            FROM student_survey_answer ssa
-            JOIN student s ON ssa.student_id = s.id
-            {where_clause}
-            GROUP BY COALESCE(ssa.preferred_program, 'Unknown')
-            ORDER BY COUNT(*) DESC
-        """, tuple(params))
-        preferred = cur.fetchall()
-
-        # --- Letter counts ---
-        letter_cols = [f"pair{i}" for i in range(1, 87)]
-        unions = [
-            f"""SELECT {c} AS letter
-                FROM student_survey_answer ssa
-                JOIN student s ON ssa.student_id = s.id
-                {where_clause} AND {c} BETWEEN 'A' AND 'R'
-            """
-            for c in letter_cols
-        ]
+    def sum_cell(rows, year, campus_filter):
+        totals = Counter()
+        for campus, school_year, key, count in rows:
+            if campus_filter and campus != campus_filter:
+                continue
+            if year and str(year).lower() != "all" and str(school_year) != str(year):
+                continue
+            totals[key] += count
+        return totals
 
-        cur.execute(f"""
-            SELECT letter, COUNT(*) FROM (
-                {" UNION ALL ".join(unions)}
-            ) t
-            GROUP BY letter
-            ORDER BY COUNT(*) DESC
-            LIMIT 18
-        """, tuple(params * len(letter_cols)))
-        letters = cur.fetchall()
+    def fetch_data_for_year(year=None, gender=None, campus_filter=None):
+        preferred = sum_cell(preferred_rows, year, campus_filter).most_common()
+        letters = [
+            (LETTERS[slot - 1], count)
+            for slot, count in sum_cell(letter_rows, year, campus_filter).most_common(18)
+        ]
 
         return {
             "year": str(year) if year else "All",
@@ -3715,10 +3212,7 @@ def visualization():
     # --- Campus details ---
     campus_to_fetch = selected_campus or (admin_campus if admin_campus != "ALL" else None)
     if campus_to_fetch:
-        cur.execute("SELECT campus_name, campus_address FROM campus WHERE campus_name = %s", (campus_to_fetch,))
-        campus_data = cur.fetchone()
-        campus_name = campus_data[0] if campus_data else campus_to_fetch
-        campus_address = campus_data[1] if campus_data else ""
+        campus_name, campus_address = campus_header(campus_to_fetch)
     else:
         campus_name = "ALL CAMPUSES"
         campus_address = ""
@@ -3750,53 +3244,21 @@ def adminProfile():
 
     username = session["admin_username"]
 
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT fullname, username, email, campus
-        FROM super_admin
-        WHERE username = %s
-    """, (username,))
-    admin = cur.fetchone()
-
-    is_super_admin = False
-    table_name = "admin"
-
-    if admin:
-        is_super_admin = True
-        table_name = "super_admin"
-    else:
-        cur.execute("""
-            SELECT fullname, username, email, campus
-            FROM admin
-            WHERE username = %s
-        """, (username,))
-        admin = cur.fetchone()
+    if not g.admin:
+        return redirect(url_for("admin.login"))
 
-        if not admin:
-            cur.close()
-            conn.close()
-            return redirect(url_for("admin.login"))
+    is_super_admin = g.admin.is_super_admin
+    table_name = "super_admin" if is_super_admin else "admin"
 
+    admin = (g.admin.fullname, g.admin.username, g.admin.email, g.admin.campus)
     admin_fullname, admin_username, admin_email, admin_campus = admin
 
+    conn = get_db_connection()
+    cur = conn.cursor()
+
     # Fetch campus details
     if admin_campus and admin_campus != "ALL":
-        cur.execute("""
-            SELECT campus_name, campus_address
-            FROM campus
-            WHERE campus_name = %s
-        """, (admin_campus,))
-        
-        campus_data = cur.fetchone()
-        
-        if campus_data:
-            campus_name = campus_data[0]
-            campus_address = campus_data[1]
-        else:
-            campus_name = admin_campus
-            campus_address = ""
+        campus_name, campus_address = campus_header(admin_campus)
     else:
         campus_name = "ALL CAMPUSES"
         campus_address = ""
@@ -3811,6 +3273,7 @@ def adminProfile():
             WHERE username = %s
         """, (fullname, username))
         conn.commit()
+        invalidate_admin(username)
 
         if new_email != admin_email:
             otp = generate_otp()
@@ -3893,6 +3356,7 @@ def verify_email_change():
         conn.commit()
         cur.close()
         conn.close()
+        invalidate_admin(data["username"])
 
         session.pop("email_change")
         flash("Email updated successfully.", "success")
@@ -0,0 +1,120 @@
+"""
+Pre-generate cached AI career explanations so students don't wait on Groq.
+
+    python -m backend.admin.warm_ai_explanations [--observed] [--program NAME] [--limit N] [--delay 1.0]
+
+By default every ordered top-3 letter combination (18P3 = 4896) is generated
+for every active program in the program table. --observed only warms the
+combinations students actually have, which is far fewer calls.
+"""
+import argparse
+import time
+from itertools import permutations
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from ..db import get_db_connection
+from ..utils.ai_explanation_cache import (
+    ensure_ai_explanation_cache_table,
+    get_ai_explanation_cache_stats,
+    get_template,
+    normalize_program,
+)
+from ..utils.letter_scores import LETTERS, ensure_letter_scores_table
+from ..student.routes import generate_ai_insights
+
+
+def active_programs(cur, only=None):
+    cur.execute("""
+        SELECT DISTINCT program_name
+        FROM program
+        WHERE program_name IS NOT NULL
+        AND is_active = TRUE
+    """)
+    programs = {}
+    for (name,) in cur.fetchall():
+        # One entry per normalized name; campuses share explanations.
+        programs.setdefault(normalize_program(name), name)
+
+    if only:
+        programs = {k: v for k, v in programs.items() if k == normalize_program(only)}
+    return sorted(programs.values())
+
+
+def observed_combinations(cur, only=None):
+    ensure_letter_scores_table()
+    cur.execute("""
+        SELECT DISTINCT ls.top_letters, sa.preferred_program
+        FROM student_letter_scores ls
+        JOIN student_survey_answer sa ON sa.exam_id = ls.exam_id
+        WHERE ls.top_letters IS NOT NULL
+        AND sa.preferred_program IS NOT NULL
+    """)
+    combos = [(letters, program) for letters, program in cur.fetchall()]
+
+    if only:
+        combos = [c for c in combos if normalize_program(c[1]) == normalize_program(only)]
+    return combos
+
+
+def warm(observed=False, program=None, limit=None, delay=1.0):
+    ensure_ai_explanation_cache_table()
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    if observed:
+        combos = observed_combinations(cur, program)
+    else:
+        combos = [
+            (letters, name)
+            for name in active_programs(cur, program)
+            for letters in ("".join(p) for p in permutations(LETTERS, 3))
+        ]
+
+    if limit:
+        combos = combos[:limit]
+
+    print(f"Warming {len(combos)} letter/program combination(s)...")
+
+    generated = 0
+    failed = 0
+
+    for n, (letters, name) in enumerate(combos, start=1):
+        try:
+            _, source = get_template(cur, letters, name, generate_ai_insights)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed += 1
+            print(f"❌ {letters} / {name}: {e}")
+            continue
+
+        if source == "generated":
+            generated += 1
+            # Stay under the Groq rate limit.
+            if delay:
+                time.sleep(delay)
+
+        if n % 100 == 0:
+            print(f"{n}/{len(combos)} checked, {generated} generated, {failed} failed...")
+
+    cur.close()
+    conn.close()
+
+    print(f"Done. {generated} generated, {failed} failed, {len(combos) - generated - failed} already cached.")
+    print(get_ai_explanation_cache_stats())
+    return generated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--observed", action="store_true", help="only combinations students already have")
+    parser.add_argument("--program", help="only this program")
+    parser.add_argument("--limit", type=int, help="stop after this many combinations")
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds to wait after each Groq call")
+    args = parser.parse_args()
+
+    warm(observed=args.observed, program=args.program, limit=args.limit, delay=args.delay)
@@ -0,0 +1,143 @@
+import os
+import threading
+
+# =========================
+# AI CLIENT SETTINGS (per gunicorn worker process)
+# =========================
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))
+AI_CONNECT_TIMEOUT = float(os.getenv("AI_CONNECT_TIMEOUT", "5"))
+AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "2"))
+AI_POOL_SIZE = int(os.getenv("AI_POOL_SIZE", "10"))
+
+# "stub" swaps every client for the offline stand-in in ai_stub.py.
+AI_PROVIDER = os.getenv("AI_PROVIDER", "live").lower()
+
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Retried with backoff: rate limiting and transient upstream failures.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_clients = {}
+_clients_pid = None
+_clients_lock = threading.Lock()
+
+
+def _get(name, factory):
+    global _clients_pid
+
+    with _clients_lock:
+        # A forked worker must not share the parent's sockets.
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = factory()
+        return client
+
+
+def _groq_client():
+    if AI_PROVIDER == "stub":
+        from .ai_stub import StubChatClient
+        return StubChatClient("groq")
+
+    from groq import Groq
+
+    return Groq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        timeout=AI_TIMEOUT,
+        max_retries=AI_MAX_RETRIES
+    )
+
+
+def _openai_client():
+    if AI_PROVIDER == "stub":
+        from .ai_stub import StubChatClient
+        return StubChatClient("openai")
+
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        timeout=AI_TIMEOUT,
+        max_retries=AI_MAX_RETRIES
+    )
+
+
+def _http_session():
+    if AI_PROVIDER == "stub":
+        from .ai_stub import StubSession
+        return StubSession()
+
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=AI_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=AI_POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_groq_client():
+    """Process-wide Groq client; its HTTP pool keeps connections alive."""
+    return _get("groq", _groq_client)
+
+
+def get_openai_client():
+    return _get("openai", _openai_client)
+
+
+def get_http_session():
+    """Process-wide requests.Session for plain HTTP AI APIs (Gemini, Ollama)."""
+    return _get("http", _http_session)
+
+
+def http_timeout(read_timeout=None):
+    return (AI_CONNECT_TIMEOUT, read_timeout or AI_TIMEOUT)
+
+
+def groq_chat(messages, temperature=0.3, max_tokens=700, model=None):
+    response = get_groq_client().chat.completions.create(
+        model=model or GROQ_MODEL,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    return response.choices[0].message.content
+
+
+def groq_chat_stream(messages, temperature=0.3, max_tokens=700, model=None):
+    """Like groq_chat(), but yields the reply text piece by piece as it arrives."""
+    stream = get_groq_client().chat.completions.create(
+        model=model or GROQ_MODEL,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+
+def close_ai_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _clients.clear()
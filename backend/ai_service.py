@@ -1,9 +1,36 @@
+import asyncio
 import os
-import requests
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .ai_clients import AI_PROVIDER, OPENAI_MODEL, get_http_session, get_openai_client, http_timeout
 
 ENV = os.getenv("FLASK_ENV", "local")
 
+# =========================
+# ROUTER SETTINGS
+# =========================
+# Online providers in order of preference.
+AI_PROVIDER_ORDER = [
+    p.strip() for p in os.getenv("AI_PROVIDER_ORDER", "gemini,openai").split(",") if p.strip()
+]
+# Start the next provider if the current one hasn't answered after this long.
+AI_HEDGE_DELAY = float(os.getenv("AI_HEDGE_DELAY", "4"))
+# Give up on the whole request after this long.
+AI_ROUTER_TIMEOUT = float(os.getenv("AI_ROUTER_TIMEOUT", "45"))
+# Open a provider's breaker after this many failures in a row, then skip it
+# for the cooldown before letting a single trial call through.
+AI_BREAKER_THRESHOLD = int(os.getenv("AI_BREAKER_THRESHOLD", "3"))
+AI_BREAKER_COOLDOWN = float(os.getenv("AI_BREAKER_COOLDOWN", "30"))
+
+UNAVAILABLE_REPLY = "All AI services are currently unavailable."
+
+# Provider calls are blocking (requests / SDK clients), so the router runs
+# them here. A hedged call that loses keeps running to completion in its
+# thread; its answer is just discarded.
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-provider")
+
 # =========================
 # MAIN ENTRY FUNCTION
 # =========================
@@ -13,22 +40,115 @@ def ask_ai(prompt):
     else:
         return ask_online_ai(prompt)
 
+# =========================
+# PROVIDER STATS + CIRCUIT BREAKER
+# =========================
+class ProviderState:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+        self.last_error = None
+        self.open_until = 0.0
+        self.trial_started = None
+
+    def allow(self):
+        """False while the breaker is open; once it cools down one trial call may pass."""
+        with self.lock:
+            if self.consecutive_failures < AI_BREAKER_THRESHOLD:
+                return True
+            now = time.monotonic()
+            if now < self.open_until:
+                return False
+            # A trial that never reported back (cancelled before it ran)
+            # doesn't block the provider forever.
+            if self.trial_started is not None and now - self.trial_started < AI_BREAKER_COOLDOWN:
+                return False
+            self.trial_started = now
+            return True
+
+    def record(self, latency, error=None):
+        with self.lock:
+            self.calls += 1
+            self.total_latency += latency
+            self.last_latency = latency
+            self.trial_started = None
+
+            if error is None:
+                self.successes += 1
+                self.consecutive_failures = 0
+                return
+
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:200]
+            if self.consecutive_failures >= AI_BREAKER_THRESHOLD:
+                self.open_until = time.monotonic() + AI_BREAKER_COOLDOWN
+
+    def stats(self):
+        with self.lock:
+            is_open = (
+                self.consecutive_failures >= AI_BREAKER_THRESHOLD
+                and time.monotonic() < self.open_until
+            )
+            return {
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "avg_latency_ms": round(1000 * self.total_latency / self.calls) if self.calls else None,
+                "last_latency_ms": round(1000 * self.last_latency) if self.last_latency is not None else None,
+                "last_error": self.last_error,
+                "breaker": "open" if is_open else "closed",
+            }
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def _state(name):
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = ProviderState(name)
+        return _providers[name]
+
+
+def _call_provider(name, prompt):
+    # Runs in _executor; stats are recorded even if the router already
+    # moved on with another provider's answer.
+    state = _state(name)
+    started = time.monotonic()
+    try:
+        answer = PROVIDERS[name](prompt)
+    except Exception as e:
+        state.record(time.monotonic() - started, e)
+        raise
+    state.record(time.monotonic() - started)
+    return answer
+
+
+def get_ai_provider_stats():
+    with _providers_lock:
+        names = list(_providers)
+    return {name: _state(name).stats() for name in names}
+
 # =========================
 # OFFLINE AI (OLLAMA)
 # =========================
 def ask_offline_ai(prompt):
+    import requests
+
+    if not _state("ollama").allow():
+        # Don't wait on a server that has just failed several times.
+        return "Offline AI not running. Please start Ollama."
+
     try:
-        res = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "mistral",
-                "prompt": prompt,
-                "stream": False
-            },
-            timeout=120
-        )
-
-        data = res.json()
+        data = _call_provider("ollama", prompt)
 
         # DEBUG (optional but helpful)
         print("Ollama response:", data)
@@ -47,30 +167,99 @@ def ask_offline_ai(prompt):
     except Exception as e:
         return f"Offline AI exception: {str(e)}"
 
+
+def ollama_generate(prompt):
+    res = get_http_session().post(
+        "http://localhost:11434/api/generate",
+        json={
+            "model": "mistral",
+            "prompt": prompt,
+            "stream": False
+        },
+        timeout=http_timeout(120)
+    )
+    return res.json()
+
 # =========================
-# ONLINE AI (AUTO FALLBACK)
+# ONLINE AI (HEDGED ROUTER)
 # =========================
 def ask_online_ai(prompt):
-    # Order matters
-    providers = [
-        ask_gemini,
-        ask_openai
-    ]
+    try:
+        return asyncio.run(route_prompt(prompt, AI_PROVIDER_ORDER))
+    except Exception as e:
+        print(f"AI failed on every provider ({e})")
+        return UNAVAILABLE_REPLY
+
+
+async def route_prompt(prompt, names, hedge_delay=None, timeout=None):
+    """
+    Ask the providers in `names` for an answer. The first one starts right
+    away; the next one starts when the running ones have all failed or
+    after hedge_delay seconds without an answer. The first good answer
+    wins and every other call is cancelled. Providers with an open breaker
+    are skipped.
+    """
+    hedge_delay = AI_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    timeout = AI_ROUTER_TIMEOUT if timeout is None else timeout
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    waiting = [name for name in names if name in PROVIDERS]
+    running = {}
+    errors = []
 
-    for provider in providers:
-        try:
-            return provider(prompt)
-        except Exception as e:
-            print(f"AI failed, switching... ({e})")
+    def start_next():
+        while waiting:
+            name = waiting.pop(0)
+            if not _state(name).allow():
+                errors.append(f"{name}: circuit open")
+                continue
+            future = loop.run_in_executor(_executor, _call_provider, name, prompt)
+            running[future] = name
+            return True
+        return False
 
-    return "All AI services are currently unavailable."
+    start_next()
+
+    try:
+        while running:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"no answer within {timeout}s")
+
+            wait_for = min(hedge_delay, remaining) if waiting else remaining
+            done, _ = await asyncio.wait(
+                running, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                # Hedge: the current provider is slow, race the next one.
+                start_next()
+                continue
+
+            for future in done:
+                name = running.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    print(f"AI failed, switching... ({name}: {e})")
+                    errors.append(f"{name}: {e}")
+
+            if not running:
+                start_next()
+
+        raise RuntimeError("; ".join(errors) or "no providers configured")
+
+    finally:
+        for future in running:
+            future.cancel()
 
 # =========================
 # GEMINI
 # =========================
 def ask_gemini(prompt):
     api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if not api_key and AI_PROVIDER != "stub":
         raise Exception("Gemini API key missing")
 
     url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={api_key}"
@@ -82,7 +271,7 @@ def ask_gemini(prompt):
         ]
     }
 
-    res = requests.post(url, json=payload, timeout=30)
+    res = get_http_session().post(url, json=payload, timeout=http_timeout())
     res.raise_for_status()
 
     return res.json()["candidates"][0]["content"]["parts"][0]["text"]
@@ -91,11 +280,16 @@ def ask_gemini(prompt):
 # OPENAI
 # =========================
 def ask_openai(prompt):
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = get_openai_client().chat.completions.create(
+        model=OPENAI_MODEL,
         messages=[{"role": "user", "content": prompt}]
     )
 
     return response.choices[0].message.content
+
+
+PROVIDERS = {
+    "gemini": ask_gemini,
+    "openai": ask_openai,
+    "ollama": ollama_generate,
+}
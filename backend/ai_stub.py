@@ -0,0 +1,192 @@
+"""
+Offline stand-in for Groq, OpenAI, Gemini and Ollama, used when
+AI_PROVIDER=stub. Replies are deterministic for a given prompt and come back
+in the same shapes the real SDKs/APIs use, after a configurable delay, so
+the AI paths can be load-tested without network access or API keys.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import requests
+
+# =========================
+# STUB SETTINGS
+# =========================
+# Time to first token, with gaussian jitter, then a delay per streamed word.
+AI_STUB_LATENCY_MS = float(os.getenv("AI_STUB_LATENCY_MS", "800"))
+AI_STUB_JITTER_MS = float(os.getenv("AI_STUB_JITTER_MS", "200"))
+AI_STUB_TOKEN_MS = float(os.getenv("AI_STUB_TOKEN_MS", "15"))
+# Fraction of calls that fail (after the latency, like a real timeout or 5xx).
+AI_STUB_FAILURE_RATE = float(os.getenv("AI_STUB_FAILURE_RATE", "0"))
+AI_STUB_SEED = os.getenv("AI_STUB_SEED")
+
+_rng = random.Random(AI_STUB_SEED)
+_rng_lock = threading.Lock()
+
+
+class StubAIError(RuntimeError):
+    pass
+
+
+def configure(latency_ms=None, jitter_ms=None, token_ms=None, failure_rate=None, seed=None):
+    """Change the stub's behaviour at runtime (benchmarks)."""
+    global AI_STUB_LATENCY_MS, AI_STUB_JITTER_MS, AI_STUB_TOKEN_MS, AI_STUB_FAILURE_RATE
+
+    if latency_ms is not None:
+        AI_STUB_LATENCY_MS = latency_ms
+    if jitter_ms is not None:
+        AI_STUB_JITTER_MS = jitter_ms
+    if token_ms is not None:
+        AI_STUB_TOKEN_MS = token_ms
+    if failure_rate is not None:
+        AI_STUB_FAILURE_RATE = failure_rate
+    if seed is not None:
+        with _rng_lock:
+            _rng.seed(seed)
+
+
+def _first_token_delay():
+    with _rng_lock:
+        ms = _rng.gauss(AI_STUB_LATENCY_MS, AI_STUB_JITTER_MS) if AI_STUB_JITTER_MS else AI_STUB_LATENCY_MS
+    return max(0.0, ms) / 1000
+
+
+def _should_fail():
+    if AI_STUB_FAILURE_RATE <= 0:
+        return False
+    with _rng_lock:
+        return _rng.random() < AI_STUB_FAILURE_RATE
+
+
+# =========================
+# CANNED REPLIES
+# =========================
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+
+
+def stub_reply(prompt):
+    """Deterministic reply text shaped like what the real prompt asks for."""
+    tag = _digest(prompt)
+
+    if "JSON" in prompt and "questions" in prompt:
+        return json.dumps({
+            "questions": [f"Stub interview question {i + 1} ({tag})?" for i in range(6)],
+            "mismatch_reason": f"Stub alignment analysis ({tag}).",
+            "talking_points": [f"Stub talking point {i + 1}." for i in range(3)]
+        })
+
+    if "Career Letter Explanation" in prompt and "Strengths" in prompt:
+        return (
+            "Career Letter Explanation\n"
+            f"Each top letter is explained here ({tag}).\n"
+            "Strengths\n"
+            "• Stub strength one\n"
+            "• Stub strength two\n"
+            "Weaknesses\n"
+            "• Stub area to improve\n"
+            "Personalized Career Advice\n"
+            "Keep exploring your interests. This is stub advice."
+        )
+
+    return f"This is a stub AI reply ({tag}). It stands in for the real model during offline testing."
+
+
+def _prompt_from_messages(messages):
+    return "\n".join(str(m.get("content", "")) for m in messages or [])
+
+
+# =========================
+# GROQ / OPENAI CLIENT
+# =========================
+class _Completions:
+    def create(self, model=None, messages=None, temperature=None, max_tokens=None, stream=False, **kwargs):
+        text = stub_reply(_prompt_from_messages(messages))
+        words = text.split(" ")
+
+        if stream:
+            return self._stream(words)
+
+        time.sleep(_first_token_delay())
+        if _should_fail():
+            raise StubAIError("stub provider failure (injected)")
+        time.sleep(len(words) * AI_STUB_TOKEN_MS / 1000)
+
+        return SimpleNamespace(choices=[
+            SimpleNamespace(message=SimpleNamespace(role="assistant", content=text), finish_reason="stop")
+        ])
+
+    def _stream(self, words):
+        time.sleep(_first_token_delay())
+        if _should_fail():
+            raise StubAIError("stub provider failure (injected)")
+
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(AI_STUB_TOKEN_MS / 1000)
+            piece = word if i == 0 else " " + word
+            yield SimpleNamespace(choices=[
+                SimpleNamespace(delta=SimpleNamespace(content=piece), finish_reason=None)
+            ])
+
+
+class StubChatClient:
+    """Answers client.chat.completions.create(...) like the Groq and OpenAI SDKs."""
+
+    def __init__(self, provider="stub"):
+        self.provider = provider
+        self.chat = SimpleNamespace(completions=_Completions())
+
+    def close(self):
+        pass
+
+
+# =========================
+# PLAIN HTTP (GEMINI / OLLAMA)
+# =========================
+class StubResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} stub error", response=self)
+
+
+class StubSession:
+    """Answers session.post(...) for the Ollama and Gemini endpoints."""
+
+    def post(self, url, json=None, timeout=None, **kwargs):
+        payload = json or {}
+        time.sleep(_first_token_delay())
+
+        if _should_fail():
+            return StubResponse(503, {"error": "stub provider failure (injected)"})
+
+        if "generativelanguage" in url:
+            prompt = " ".join(
+                part.get("text", "")
+                for content in payload.get("contents", [])
+                for part in content.get("parts", [])
+            )
+            text = stub_reply(prompt)
+            time.sleep(len(text.split(" ")) * AI_STUB_TOKEN_MS / 1000)
+            return StubResponse(200, {"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+        # Ollama /api/generate
+        text = stub_reply(payload.get("prompt", ""))
+        time.sleep(len(text.split(" ")) * AI_STUB_TOKEN_MS / 1000)
+        return StubResponse(200, {"model": payload.get("model"), "response": text, "done": True})
+
+    def close(self):
+        pass
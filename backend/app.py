@@ -1,4 +1,4 @@
-from flask import Flask, session, redirect, url_for, request, flash
+from flask import Flask, session, redirect, url_for, request, flash, current_app
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
@@ -6,25 +6,13 @@ from datetime import datetime, timezone, timedelta
 load_dotenv()
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../frontend"))
-
-app = Flask(
-    __name__,
-    template_folder=os.path.join(BASE_DIR, "templates"),
-    static_folder=os.path.join(BASE_DIR, "static")
-)
-app.secret_key = os.getenv("SECRET_KEY")
-app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(minutes=10)
-
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
-@app.before_request
+
 def check_session_timeout():
 
     now = datetime.now(timezone.utc)
-    timeout = app.permanent_session_lifetime.total_seconds()
+    timeout = current_app.permanent_session_lifetime.total_seconds()
     
     if request.blueprint == "admin":
 
@@ -39,7 +27,7 @@ def check_session_timeout():
 
         if last_activity:
             idle_time = (now - last_activity).total_seconds()
-            timeout = app.permanent_session_lifetime.total_seconds()
+            timeout = current_app.permanent_session_lifetime.total_seconds()
 
             if idle_time > timeout:
                 flash("Session expired due to inactivity.", "session_expired")
@@ -74,15 +62,44 @@ def check_session_timeout():
         session["last_activity"] = now
         session.permanent = True
 
-# Import Blueprints
-from .admin.routes import admin_bp
-from .student.routes import student_bp
+def create_app(config=None):
+    """
+    Build the Flask app. `config` overrides app.config (tests, benchmarks).
+    Nothing here touches the database; see warmup.py for preloading caches
+    in the gunicorn master.
+    """
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(BASE_DIR, "templates"),
+        static_folder=os.path.join(BASE_DIR, "static")
+    )
+    app.secret_key = os.getenv("SECRET_KEY")
+    app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(minutes=10)
+
+    if not os.path.exists(UPLOAD_FOLDER):
+        os.makedirs(UPLOAD_FOLDER)
+    app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+
+    if config:
+        app.config.update(config)
+
+    app.before_request(check_session_timeout)
+
+    # Import Blueprints
+    from .admin.routes import admin_bp
+    from .student.routes import student_bp
+
+    # Blueprints
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    app.register_blueprint(student_bp, url_prefix='/student')
+
+    return app
+
 
-# Blueprints
-app.register_blueprint(admin_bp, url_prefix='/admin')
-app.register_blueprint(student_bp, url_prefix='/student')
+# Kept for start commands that still point at backend.app:app.
+app = create_app()
 
 if __name__ == "__main__":
     app.run()
     #app.run(host="127.0.0.1", port=5002, debug=True)
-    #python -m backend.app  
\ No newline at end of file
+    #python -m backend.app  
@@ -0,0 +1,247 @@
+"""
+Measure throughput and tail latency of the AI paths against the local stub.
+
+    python -m backend.benchmarks.bench_ai_paths [--requests 200] [--concurrency 8]
+        [--latency-ms 800] [--jitter-ms 200] [--token-ms 15] [--failure-rate 0]
+        [--http --student-id ID --admin-username NAME]
+
+AI_PROVIDER is forced to "stub", so nothing leaves the machine. By default
+the code behind each endpoint is called directly (no database needed):
+the chatbot's LLM fallback, the streamed chatbot reply (time to first
+token), generate_ai_insights, interview question generation and the hedged
+ai_service router.
+
+With --http the real endpoints are driven through Flask's test client
+instead: /student/chatbot, /student/chatbot_stream,
+/student/generate-ai-explanation and /admin/interviewAI/<id>. That needs
+the database from .env and an existing student and admin. Stored
+explanations and interview questions are returned without calling the
+model, so repeat requests measure the cached path.
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["AI_PROVIDER"] = "stub"
+# The benchmark should measure the stub, not the Groq rate limit.
+os.environ.setdefault("INTERVIEW_AI_RATE_PER_MIN", "0")
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from .. import ai_stub
+from ..ai_clients import groq_chat_stream
+
+CHAT_MESSAGES = [
+    "hello",
+    "What career would suit me?",
+    "What are my strengths?",
+    "Show me my career result",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def run(label, fn, requests, concurrency):
+    """Call fn(i) `requests` times on `concurrency` threads and report."""
+    latencies = []
+    first_bytes = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ttfb = fn(i)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if ttfb is not None:
+                first_bytes.append(ttfb)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    def ms(value):
+        return f"{value * 1000:7.0f}" if value is not None else "      -"
+
+    line = (
+        f"{label:32} {len(latencies) / wall:7.1f} req/s  "
+        f"p50 {ms(percentile(latencies, 50))}  p95 {ms(percentile(latencies, 95))}  "
+        f"p99 {ms(percentile(latencies, 99))}  max {ms(max(latencies) if latencies else None)} ms  "
+        f"errors {errors}"
+    )
+    if first_bytes:
+        line += f"  ttfb p50 {ms(percentile(first_bytes, 50))} p95 {ms(percentile(first_bytes, 95))} ms"
+    print(line)
+
+
+# ===== DIRECT MODE (no database) =====
+
+def direct_scenarios():
+    from ..ai_service import ask_online_ai
+    from ..student.routes import SYSTEM_PROMPT, ask_ai, generate_ai_insights
+    from ..utils.interview_ai import generate_interview_questions
+    from ..utils.letter_scores import LETTERS
+
+    def chatbot_fallback(i):
+        ask_ai([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{CHAT_MESSAGES[1]} #{i}"}
+        ])
+
+    def chatbot_stream(i):
+        started = time.perf_counter()
+        ttfb = None
+        for _ in groq_chat_stream([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"{CHAT_MESSAGES[1]} #{i}"}
+        ]):
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+        return ttfb
+
+    def explanation(i):
+        letters = [LETTERS[i % 18], LETTERS[(i + 5) % 18], LETTERS[(i + 11) % 18]]
+        generate_ai_insights(letters, "Bachelor of Science in Information Technology", f"Student {i}")
+
+    def interview(i):
+        data = generate_interview_questions({
+            "fullname": f"Student {i}",
+            "preferred_program": "Bachelor of Science in Criminology",
+            "program_letters": ["D", "K"],
+            "top_three": ["A", "G", "L"]
+        })
+        if "questions" not in data:
+            raise ValueError("no questions")
+
+    def online_router(i):
+        ask_online_ai(f"Summarize career option #{i}")
+
+    return [
+        ("chatbot (LLM fallback)", chatbot_fallback),
+        ("chatbot_stream (LLM fallback)", chatbot_stream),
+        ("generate_ai_insights", explanation),
+        ("interviewAI generation", interview),
+        ("ai_service.ask_online_ai", online_router),
+    ]
+
+
+# ===== HTTP MODE (Flask test client + database) =====
+
+def http_scenarios(student_id, admin_username):
+    from ..app import create_app
+
+    app = create_app()
+    app.secret_key = app.secret_key or "benchmark"
+    local = threading.local()
+
+    def client(session_values):
+        key = tuple(sorted(session_values.items()))
+        clients = local.__dict__.setdefault("clients", {})
+        if key not in clients:
+            c = app.test_client()
+            with c.session_transaction() as sess:
+                sess.update(session_values)
+            clients[key] = c
+        return clients[key]
+
+    def check(response):
+        if response.status_code >= 500:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        return response
+
+    def chatbot(i):
+        check(client({"student_id": student_id}).post("/student/chatbot", json={
+            "message": CHAT_MESSAGES[i % len(CHAT_MESSAGES)],
+            "student_id": student_id
+        }))
+
+    def chatbot_stream(i):
+        started = time.perf_counter()
+        response = check(client({"student_id": student_id}).post("/student/chatbot_stream", json={
+            "message": CHAT_MESSAGES[i % len(CHAT_MESSAGES)],
+            "student_id": student_id
+        }, buffered=False))
+        ttfb = None
+        for _ in response.response:
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+        response.close()
+        return ttfb
+
+    def explanation(i):
+        check(client({"student_id": student_id}).post("/student/generate-ai-explanation", json={
+            "top_letters": ["A", "G", "L"],
+            "preferred_program": "Bachelor of Science in Information Technology",
+            "fullname": "Benchmark Student"
+        }))
+
+    def interview(i):
+        check(client({"admin_username": admin_username}).get(f"/admin/interviewAI/{student_id}"))
+
+    return [
+        ("POST /student/chatbot", chatbot),
+        ("POST /student/chatbot_stream", chatbot_stream),
+        ("POST /generate-ai-explanation", explanation),
+        ("GET /admin/interviewAI/<id>", interview),
+    ]
+
+
+def main(args):
+    ai_stub.configure(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        token_ms=args.token_ms,
+        failure_rate=args.failure_rate,
+        seed=args.seed
+    )
+
+    print(
+        f"stub: first token {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+        f"{args.token_ms:.0f} ms/word, failure rate {args.failure_rate:.0%}; "
+        f"{args.requests} requests x {args.concurrency} threads"
+    )
+
+    if args.http:
+        if not args.student_id or not args.admin_username:
+            raise SystemExit("--http needs --student-id and --admin-username")
+        scenarios = http_scenarios(args.student_id, args.admin_username)
+    else:
+        scenarios = direct_scenarios()
+
+    for label, fn in scenarios:
+        run(label, fn, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--http", action="store_true", help="drive the Flask endpoints (needs the database)")
+    parser.add_argument("--student-id", type=int)
+    parser.add_argument("--admin-username")
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,114 @@
+"""
+Report how long importing the WSGI app takes and what it pulls in.
+
+    python -m backend.benchmarks.bench_import_time [--module backend.wsgi] [--top 20]
+        [--runs 3] [--budget-ms 0] [--allow-heavy]
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters,
+prints the median wall time and the slowest imports by cumulative time,
+and lists any heavy optional library that got imported eagerly. Exits
+non-zero if a heavy library is imported at startup (unless --allow-heavy)
+or the median exceeds --budget-ms, so it can guard against regressions.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Only needed by specific pages or background jobs; they must be imported
+# where they are used, not when a worker boots.
+HEAVY_MODULES = [
+    "pandas",
+    "numpy",
+    "weasyprint",
+    "PIL",
+    "openpyxl",
+    "groq",
+    "openai",
+    "bcrypt",
+    "requests",
+]
+
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def profile_once(module):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - started
+
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append({
+                "name": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                # -X importtime indents nested imports by two spaces per level
+                "depth": (len(indent) - 1) // 2,
+            })
+    return wall, imports
+
+
+def heavy_imported(imports):
+    names = {i["name"] for i in imports}
+    return [m for m in HEAVY_MODULES if m in names]
+
+
+def main(module, top, runs, budget_ms, allow_heavy):
+    walls = []
+    imports = []
+    for _ in range(runs):
+        wall, imports = profile_once(module)
+        walls.append(wall)
+
+    median_ms = statistics.median(walls) * 1000
+    own = [i for i in imports if i["name"].split(".")[0] == module.split(".")[0]]
+
+    print(f"import {module}: median {median_ms:.0f} ms over {runs} run(s) "
+          f"(interpreter start included), {len(imports)} modules imported")
+    print(f"  project modules: {sum(i['self_ms'] for i in own):.0f} ms self time")
+
+    print(f"\nTop {top} by cumulative time:")
+    for i in sorted(imports, key=lambda i: i["cumulative_ms"], reverse=True)[:top]:
+        print(f"  {i['cumulative_ms']:8.1f} ms  {i['self_ms']:7.1f} ms self  {i['name']}")
+
+    heavy = heavy_imported(imports)
+    print("\nHeavy libraries imported at startup:", ", ".join(heavy) if heavy else "none")
+
+    failed = False
+    if heavy and not allow_heavy:
+        print("FAIL: import these lazily where they are used.")
+        failed = True
+    if budget_ms and median_ms > budget_ms:
+        print(f"FAIL: {median_ms:.0f} ms is over the {budget_ms:.0f} ms budget.")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="backend.wsgi")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail if the median is slower (0 = no budget)")
+    parser.add_argument("--allow-heavy", action="store_true", help="don't fail on eagerly imported heavy libraries")
+    args = parser.parse_args()
+
+    sys.exit(main(args.module, args.top, args.runs, args.budget_ms, args.allow_heavy))
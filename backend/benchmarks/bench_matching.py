@@ -0,0 +1,145 @@
+"""
+Compare the old set-based program matching with the letter-mask engine.
+
+    python -m backend.benchmarks.bench_matching [--students 20000] [--programs 60] [--campuses 10]
+
+Builds a synthetic catalog and cohort (no database involved), then runs
+the per-student match status, the cohort pass used by the interview list
+and the top-3 program ranking both ways, checks they agree and reports
+wall time.
+"""
+import argparse
+import random
+import time
+
+from ..utils.letter_scores import LETTERS
+from ..utils.matching import cohort_match_statuses, letters_mask, match_status, rank_programs
+
+
+def make_catalog(programs, campuses, rng):
+    rows = []
+    for i in range(programs):
+        letters = rng.sample(LETTERS, rng.randint(1, 4))
+        rows.append({
+            "id": i + 1,
+            "program_name": f"Program {i % (programs // 2 or 1)}",
+            "campus": f"Campus {i % campuses}",
+            "category_letter": ", ".join(letters),
+            "letters": letters,
+            "mask": letters_mask(letters),
+        })
+
+    by_key = {}
+    for p in rows:
+        by_key.setdefault((p["campus"], p["program_name"]), p)
+    return rows, by_key
+
+
+def make_cohort(students, rows, rng):
+    cohort = []
+    for _ in range(students):
+        p = rng.choice(rows)
+        answered = rng.random() > 0.05
+        top = "".join(rng.sample(LETTERS, 3)) if answered else ""
+        preferred = p["program_name"] if rng.random() > 0.02 else None
+        cohort.append((p["campus"], preferred, top, 86 if answered else 0))
+    return cohort
+
+
+# ===== OLD SET LOGIC =====
+
+def set_statuses(cohort, by_key):
+    statuses = []
+    for campus, preferred, top, answered_count in cohort:
+        p = by_key.get((campus, preferred))
+        program_letters = [l.strip() for l in p["category_letter"].split(",")] if p else []
+        common_letters = set(top) & set(program_letters)
+
+        if not preferred and not answered_count:
+            statuses.append("Not Yet Answer")
+        elif common_letters:
+            statuses.append("Match")
+        else:
+            statuses.append("Not Match")
+    return statuses
+
+
+def set_rankings(cohort, rows):
+    rankings = []
+    for _, _, top, _ in cohort:
+        matched = []
+        for prog in rows:
+            prog_letters = [l.strip() for l in prog["category_letter"].split(",")]
+            score = sum(1 for l in top if l in prog_letters)
+            if score > 0:
+                matched.append((prog, score))
+        rankings.append(sorted(matched, key=lambda x: x[1], reverse=True)[:3])
+    return rankings
+
+
+# ===== MASK ENGINE =====
+
+def mask_statuses(cohort, by_key):
+    statuses = []
+    for campus, preferred, top, answered_count in cohort:
+        p = by_key.get((campus, preferred))
+        statuses.append(match_status(
+            preferred, letters_mask(top), p["mask"] if p else 0, bool(answered_count)
+        ))
+    return statuses
+
+
+def mask_cohort_statuses(cohort, by_key):
+    def program_mask(campus, name):
+        p = by_key.get((campus, name))
+        return p["mask"] if p else 0
+
+    return cohort_match_statuses(cohort, program_mask)
+
+
+def mask_rankings(cohort, rows):
+    return [rank_programs(letters_mask(top), rows, limit=3) for _, _, top, _ in cohort]
+
+
+def measure(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main(students, programs, campuses, seed):
+    rng = random.Random(seed)
+    rows, by_key = make_catalog(programs, campuses, rng)
+    cohort = make_cohort(students, rows, rng)
+    print(f"{students} students, {programs} programs on {campuses} campuses")
+
+    for title, cases in [
+        ("match status", [
+            ("set intersection", set_statuses, (cohort, by_key)),
+            ("mask per student", mask_statuses, (cohort, by_key)),
+            ("mask cohort pass", mask_cohort_statuses, (cohort, by_key)),
+        ]),
+        ("top-3 ranking", [
+            ("set intersection", set_rankings, (cohort, rows)),
+            ("mask popcount", mask_rankings, (cohort, rows)),
+        ]),
+    ]:
+        print(f"\n{title}")
+        baseline = reference = None
+        for label, fn, args in cases:
+            result, elapsed = measure(fn, *args)
+            if reference is None:
+                baseline, reference = elapsed, result
+            agrees = "ok" if result == reference else "MISMATCH"
+            print(f"  {label:18} {elapsed * 1000:8.1f} ms  x{baseline / elapsed:5.1f}  {agrees}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--programs", type=int, default=60)
+    parser.add_argument("--campuses", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    main(args.students, args.programs, args.campuses, args.seed)
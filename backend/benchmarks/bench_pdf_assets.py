@@ -0,0 +1,94 @@
+"""
+Compare the PDF header logos as they used to be embedded (full-size file,
+base64-encoded per request) with the cached, downsampled versions.
+
+    python -m backend.benchmarks.bench_pdf_assets [--renders 5]
+
+Reports payload size and encode time per request, and, when WeasyPrint is
+installed, the rendered PDF size and render time for a page carrying the
+same three logos the survey result PDF uses.
+"""
+import argparse
+import base64
+import os
+import time
+from io import BytesIO
+
+from flask import Flask
+
+from ..utils.pdf_assets import PDF_LOGOS, pdf_logos
+
+STATIC_FOLDER = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "static")
+)
+
+PAGE = """
+<html><body>
+  <div style="display: flex; gap: 10px;">
+    <img style="height: 60px" src="data:image/png;base64,{cpsu_logo_base64}">
+    <img style="height: 60px" src="data:image/png;base64,{bagong_logo_base64}">
+    <img style="height: 60px" src="data:image/png;base64,{safe_logo_base64}">
+  </div>
+  <p>Career Interest Survey Result</p>
+</body></html>
+"""
+
+
+def original_logos():
+    logos = {}
+    for name, filename in PDF_LOGOS.items():
+        with open(os.path.join(STATIC_FOLDER, "images", filename), "rb") as f:
+            logos[name] = base64.b64encode(f.read()).decode()
+    return logos
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) * 1000 / repeat
+
+
+def render(logos, repeat):
+    from weasyprint import HTML
+
+    html = PAGE.format(**logos)
+
+    def once():
+        out = BytesIO()
+        HTML(string=html).write_pdf(out)
+        return out.tell()
+
+    return timed(once, repeat)
+
+
+def main(renders):
+    app = Flask(__name__, static_folder=STATIC_FOLDER)
+
+    with app.app_context():
+        before, before_ms = timed(original_logos, 20)
+        pdf_logos()  # first call fills the cache
+        after, after_ms = timed(pdf_logos, 20)
+
+        print(f"{'':24}{'before':>14}{'after':>14}")
+        for name in PDF_LOGOS:
+            print(f"{name:24}{len(before[name]) / 1024:>11.1f} KB{len(after[name]) / 1024:>11.1f} KB")
+        print(f"{'encode per request':24}{before_ms:>11.2f} ms{after_ms:>11.2f} ms")
+
+        try:
+            before_size, before_render = render(before, renders)
+            after_size, after_render = render(after, renders)
+        except ImportError:
+            print("WeasyPrint not installed; skipping render comparison.")
+            return
+
+        print(f"{'PDF size':24}{before_size / 1024:>11.1f} KB{after_size / 1024:>11.1f} KB")
+        print(f"{'render time':24}{before_render:>11.0f} ms{after_render:>11.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--renders", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.renders)
@@ -0,0 +1,85 @@
+"""
+Compare the old pandas roster parse with the streaming reader.
+
+    python -m backend.benchmarks.bench_roster_reader [--rows 20000] [--batch-size 500]
+
+Writes a synthetic .xlsx roster, then parses and validates it both ways
+(no database involved) and reports wall time and peak Python memory.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ..utils.roster_import import ROSTER_COLUMNS, normalize_roster, normalize_rows
+from ..utils.roster_reader import iter_roster_batches
+
+
+def write_roster(path, rows):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(ROSTER_COLUMNS)
+    for i in range(rows):
+        ws.append([
+            f"EX{i:07d}",
+            f"student number {i}",
+            f"student{i}@example.com",
+            "Female" if i % 2 else "Male",
+            "2025-2026" if i % 50 else "2025",   # every 50th row is invalid
+        ])
+    wb.save(path)
+
+
+def pandas_path(path):
+    import pandas as pd
+
+    df = pd.read_excel(path, dtype=str)
+    df.columns = df.columns.str.lower().str.strip()
+    rows, skips = normalize_roster(df)
+    return len(rows), len(skips)
+
+
+def streaming_path(path, batch_size):
+    valid = invalid = 0
+    for batch in iter_roster_batches(path, batch_size):
+        rows, skips = normalize_rows(batch)
+        valid += len(rows)
+        invalid += len(skips)
+    return valid, invalid
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(rows, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "roster.xlsx")
+        write_roster(path, rows)
+        print(f"{rows} rows, {os.path.getsize(path) / 1024:.0f} KB on disk")
+
+        for label, fn, args in [
+            ("pandas read_excel", pandas_path, (path,)),
+            ("openpyxl streaming", streaming_path, (path, batch_size)),
+        ]:
+            (valid, invalid), elapsed, peak = measure(fn, *args)
+            print(f"{label:20} {elapsed:7.2f} s  peak {peak / 1024 / 1024:7.1f} MB  "
+                  f"valid {valid}  invalid {invalid}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    main(args.rows, args.batch_size)
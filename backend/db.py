@@ -1,5 +1,238 @@
 import os
+import threading
+import time
+from collections import deque
+
 import psycopg2
+import psycopg2.extensions
+
+# =========================
+# POOL SETTINGS (per gunicorn worker process)
+# =========================
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_CHECK_IDLE = float(os.getenv("DB_POOL_CHECK_IDLE", "30"))
+POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    pass
+
+
+class PooledConnection:
+    """
+    Thin proxy around a psycopg2 connection. Everything is delegated to the
+    real connection except close(), which hands it back to the pool.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+        self.close()
+
+    @property
+    def closed(self):
+        conn = self.__dict__.get("_conn")
+        return 1 if conn is None else conn.closed
+
+    def close(self):
+        conn = self.__dict__.get("_conn")
+        if conn is not None:
+            self._conn = None
+            self._pool.release(conn)
+
+    def __del__(self):
+        # Handlers that return early without conn.close() still give the
+        # connection back instead of leaking it.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    def __init__(self, dsn, max_size=POOL_MAX_SIZE,
+                 timeout=POOL_TIMEOUT, check_idle=POOL_CHECK_IDLE,
+                 max_lifetime=POOL_MAX_LIFETIME):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.max_lifetime = max_lifetime
+
+        self._lock = threading.Condition()
+        self._idle = deque()        # (conn, created_at, returned_at)
+        self._born = {}             # id(conn) -> created_at
+        self._in_use = 0
+        self._waiting = 0
+        self.created = 0
+        self.recycled = 0
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        with self._lock:
+            self.created += 1
+            self._born[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._born.pop(id(conn), None)
+        self.recycled += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, created_at, returned_at):
+        if conn.closed:
+            return False
+
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+
+        if self.check_idle and now - returned_at > self.check_idle:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+
+        return True
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            with self._lock:
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout}s "
+                            f"({self._in_use} in use)"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+                self._in_use += 1
+                item = self._idle.popleft() if self._idle else None
+
+            if item is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._in_use -= 1
+                        self._lock.notify()
+                    raise
+
+            conn, created_at, returned_at = item
+            if self._is_healthy(conn, created_at, returned_at):
+                return conn
+
+            with self._lock:
+                self._discard(conn)
+                self._in_use -= 1
+                self._lock.notify()
+
+    def release(self, conn):
+        keep = not conn.closed
+        if keep:
+            try:
+                status = conn.get_transaction_status()
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    keep = False
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                keep = False
+
+        with self._lock:
+            self._in_use -= 1
+            if keep:
+                created_at = self._born.get(id(conn), time.monotonic())
+                self._idle.append((conn, created_at, time.monotonic()))
+            else:
+                self._discard(conn)
+            self._lock.notify()
+
+    def close_all(self):
+        with self._lock:
+            while self._idle:
+                conn, _, _ = self._idle.popleft()
+                self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "created": self.created,
+                "recycled": self.recycled,
+                "max_size": self.max_size,
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool, _pool_pid
+
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            # After a fork the parent's sockets must not be reused, so each
+            # worker process builds its own pool.
+            _pool = ConnectionPool(os.getenv("DATABASE_URL"))
+            _pool_pid = pid
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close_all()
+        _pool = None
+
 
 def get_db_connection():
-    return psycopg2.connect(os.getenv("DATABASE_URL"))
+    if POOL_MAX_SIZE <= 0:
+        return psycopg2.connect(os.getenv("DATABASE_URL"))
+
+    pool = get_pool()
+    return PooledConnection(pool, pool.acquire())
+
+
+def get_pool_stats():
+    if POOL_MAX_SIZE <= 0 or _pool is None or _pool_pid != os.getpid():
+        return {"in_use": 0, "idle": 0, "waiting": 0, "created": 0,
+                "recycled": 0, "max_size": max(POOL_MAX_SIZE, 0)}
+    return _pool.stats()
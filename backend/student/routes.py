@@ -1,17 +1,25 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, make_response, send_file, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, make_response, send_file, current_app, Response
 from ..db import get_db_connection
+from ..ai_clients import groq_chat, groq_chat_stream
 from psycopg2.extras import RealDictCursor
 import psycopg2
 import psycopg2.extras
 import os
 import re
+import json
 from werkzeug.utils import secure_filename
 from io import BytesIO
 import base64
-import smtplib
-from email.message import EmailMessage
-from collections import Counter
 from ..description import letter_descriptions, preferred_program_map, ai_responses, short_letter_descriptions
+from ..utils.letter_scores import save_letter_scores, get_letter_scores
+from ..utils.analytics_cube import apply_cube_delta
+from ..utils.pdf_assets import pdf_logos, render_pdf
+from ..utils.pdf_cache import pdf_cache_key, send_cached_pdf
+from ..utils.ai_explanation_cache import cached_ai_explanation
+from ..utils.email_outbox import enqueue_email
+from ..utils.catalog import get_catalog, get_program_mask
+from ..utils.matching import letters_mask, match_status as program_match_status, rank_programs
+from ..utils.section_rewrites import get_cached_rewrite, section_rewrites_available, store_rewrite
 from math import ceil
 from calendar import monthrange
 import datetime
@@ -27,15 +35,6 @@ ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def image_to_base64(filename):
-    path = os.path.join(
-        current_app.static_folder,
-        "images",
-        filename
-    )
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
-    
 def student_photo_to_base64(filename):
     if not filename:
         return None
@@ -54,19 +53,7 @@ def student_photo_to_base64(filename):
         return base64.b64encode(f.read()).decode()
 
 def ask_ai(messages, temperature=0.3, max_tokens=700):
-    from groq import Groq
-    import os
-
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=messages,
-        temperature=temperature,
-        max_tokens=max_tokens
-    )
-
-    return response.choices[0].message.content
+    return groq_chat(messages, temperature=temperature, max_tokens=max_tokens)
 
 def is_ask_about_aspirematch(question):
     question_lower = question.lower()
@@ -99,12 +86,18 @@ SYSTEM_PROMPT = (
     "'I'm sorry, I can only answer questions related to the AspireMatch.'"
 )
 
-def fetch_and_rewrite_section(ai_text, section_name):
+def fetch_and_rewrite_section(ai_text, section_name, cur=None, answer_id=None, section_rewrites=None):
     """
-    Extracts a section from ai_explanation and rewrites it in concise, student-friendly form
+    Extracts a section from ai_explanation and rewrites it in concise, student-friendly form.
+    With cur and answer_id, rewrites are kept in student_survey_answer.section_rewrites
+    and reused until the explanation changes.
     """
     import re
 
+    cached = get_cached_rewrite(section_rewrites, ai_text, section_name)
+    if cached:
+        return cached
+
     # Extract section
     pattern = rf"{section_name}\s*(.*?)(?=\n[A-Z][a-zA-Z ]+\n|$)"
     match = re.search(pattern, ai_text, re.DOTALL | re.IGNORECASE)
@@ -118,11 +111,20 @@ def fetch_and_rewrite_section(ai_text, section_name):
 
     try:
         rewritten = ask_ai(prompt)
-        return rewritten
     except Exception as e:
         print(f"Error rewriting section {section_name}:", e)
         return section_text  # fallback to original if AI fails
 
+    if cur is not None and answer_id is not None:
+        try:
+            store_rewrite(cur, answer_id, ai_text, section_name, rewritten)
+            cur.connection.commit()
+        except Exception as e:
+            cur.connection.rollback()
+            print(f"Could not cache rewritten section {section_name}:", e)
+
+    return rewritten
+
 def generate_ai_insights(top_letters, preferred_program, fullname):
     letters_str = ", ".join(top_letters)
 
@@ -220,73 +222,28 @@ def generate_otp():
 
 def send_otp_email(email, otp):
     import os
-    import requests
     from flask import current_app
 
-    SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
-
-    if not SENDGRID_API_KEY:
+    # Queued; the outbox worker delivers it through SendGrid in the background.
+    if not os.getenv("SENDGRID_API_KEY"):
         current_app.logger.error("❌ SENDGRID_API_KEY not set.")
         return False
 
-    data = {
-        "personalizations": [
-            {
-                "to": [{"email": email}],
-                "subject": "Your AspireMatch Login OTP"
-            }
-        ],
-        "from": {"email": "aspirematch2@gmail.com"},
-        "content": [
-            {
-                "type": "text/plain",
-                "value": f"""Your One-Time Password (OTP) is:
+    return enqueue_email(
+        email,
+        "Your AspireMatch Login OTP",
+        f"""Your One-Time Password (OTP) is:
 
 {otp}
 
 This code will expire in 5 minutes.
 
-If you did not request this, please ignore this email."""
-            }
-        ]
-    }
-
-    try:
-        response = requests.post(
-            "https://api.sendgrid.com/v3/mail/send",
-            headers={
-                "Authorization": f"Bearer {SENDGRID_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json=data,
-            timeout=15
-        )
-
-        if response.status_code == 202:
-            current_app.logger.info("✅ OTP email sent via SendGrid.")
-            return True
-        else:
-            current_app.logger.error(f"❌ SendGrid error: {response.text}")
-            return False
-
-    except Exception as e:
-        current_app.logger.error(f"❌ SendGrid exception: {e}")
-        return False
-    
-def generate_pdf(html):
-    from weasyprint import HTML
-    from io import BytesIO
-    from flask import current_app
-
-    pdf_io = BytesIO()
-
-    HTML(
-        string=html,
-        base_url=current_app.root_path
-    ).write_pdf(pdf_io)
+If you did not request this, please ignore this email.""",
+        transport="sendgrid"
+    )
 
-    pdf_io.seek(0)
-    return pdf_io
+def generate_pdf(html, label="pdf"):
+    return render_pdf(html, label)
     
 def process_image(file):
     from PIL import Image
@@ -951,31 +908,34 @@ interestPairs = [
   ]
 ]
 
-@student_bp.route("/chatbot", methods=["POST"])
-def chatbot():
-    user_msg = request.json.get("message", "").strip()
-    student_id = request.json.get("student_id")
-    print("Student ID received:", student_id)
-    print("User message received:", user_msg)
+def plan_chatbot_reply(user_msg, student_id):
+    """
+    Keyword routing shared by /chatbot and /chatbot_stream. Returns either
+    {"reply": text} for answers that are ready now, or {"messages": [...],
+    "prefix": text, "error": text} when the reply has to come from the LLM.
+    """
 
     if not user_msg:
-        return jsonify({"reply": "Please type a message to get a response."})
+        return {"reply": "Please type a message to get a response."}
 
     if not student_id:
-        return jsonify({"reply": "Student ID is missing. Please login again."})
+        return {"reply": "Student ID is missing. Please login again."}
 
     if not is_ask_about_aspirematch(user_msg):
-        return jsonify({
+        return {
             "reply": "I can only answer questions related to AspireMatch such as survey results or program recommendations."
-        })
+        }
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        # Without the column (migration not run yet) rewrites just aren't cached.
+        has_rewrites = section_rewrites_available(cur)
+        rewrites_column = "ss.section_rewrites" if has_rewrites else "NULL AS section_rewrites"
 
-        pair_columns = ", ".join([f"ss.pair{i}" for i in range(1, 87)])
         cur.execute(f"""
-            SELECT s.fullname, ss.ai_explanation, {pair_columns}
+            SELECT s.fullname, ss.id AS answer_id, ss.ai_explanation, {rewrites_column}
             FROM student s
             JOIN student_survey_answer ss
             ON s.id = ss.student_id
@@ -985,11 +945,15 @@ def chatbot():
         """, (student_id,))
         result = cur.fetchone()
 
-        ai_text = result.get("ai_explanation", "")
+        ai_text = (result.get("ai_explanation") or "") if result else ""
+        rewrite_cache = {
+            "cur": cur,
+            "answer_id": result["answer_id"],
+            "section_rewrites": result["section_rewrites"]
+        } if result and has_rewrites else {}
 
-        pair_letters = [result.get(f"pair{i}") for i in range(1, 87) if result.get(f"pair{i}")]
-        letter_count = Counter(pair_letters)
-        top3 = [l for l, _ in letter_count.most_common(3)]
+        scores = get_letter_scores(cur, student_id) if result else None
+        top3 = scores["top_letters"] if scores else []
 
         msg = user_msg.lower()
 
@@ -997,18 +961,18 @@ def chatbot():
             if any(k in msg for k in ["career interest survey result", "career interest result",
                                         "interest survey result", "career survey result",
                                         "career result", "result"]):
-                return jsonify({
+                return {
                     "reply": "Your survey results are not available yet. Please complete it first."
-                })
+                }
 
             if any(k in msg for k in ["recommended program", "recommended course", "course and program"]):
-                return jsonify({
+                return {
                     "reply": "Please complete a survey first."
-                })
+                }
 
-            return jsonify({
+            return {
                 "reply": "Your survey results are not available yet."
-            })
+            }
         
         if not ai_text or ai_text.strip() == "":
             if any(k in msg for k in [
@@ -1019,42 +983,34 @@ def chatbot():
                 "advice", "career advice",
                 "personalized career advice"
             ]):
-                return jsonify({
+                return {
                     "reply": "Generate an AI explanation first, go to RESULT then select CAREER INTEREST and click the button GENERATE AI EXPLANATION."
-                })
+                }
 
         if any(k in msg for k in ["career letter explanation", "letter explanation", "career explanation"]):
-            rewritten = fetch_and_rewrite_section(ai_text, "Career Letter Explanation")
-            return jsonify({"reply": rewritten})
+            rewritten = fetch_and_rewrite_section(ai_text, "Career Letter Explanation", **rewrite_cache)
+            return {"reply": rewritten}
 
         if any(k in msg for k in ["strengths", "strength"]):
-            rewritten = fetch_and_rewrite_section(ai_text, "Strengths")
-            return jsonify({"reply": rewritten})
+            rewritten = fetch_and_rewrite_section(ai_text, "Strengths", **rewrite_cache)
+            return {"reply": rewritten}
 
         if any(k in msg for k in ["weaknesses", "weakness"]):
-            rewritten = fetch_and_rewrite_section(ai_text, "Weaknesses")
-            return jsonify({"reply": rewritten})
+            rewritten = fetch_and_rewrite_section(ai_text, "Weaknesses", **rewrite_cache)
+            return {"reply": rewritten}
 
         if any(k in msg for k in ["personalized career advice", "career advice", "advice"]):
-            rewritten = fetch_and_rewrite_section(ai_text, "Personalized Career Advice")
-            return jsonify({"reply": rewritten})
+            rewritten = fetch_and_rewrite_section(ai_text, "Personalized Career Advice", **rewrite_cache)
+            return {"reply": rewritten}
 
         if any(k in msg for k in ["recommended program", "recommended course", "course and program"]):
             if not top3:
-                return jsonify({"reply": "Your survey results are not available yet."})
-
-            cur.execute("SELECT program_name, category_letter FROM program")
-            all_programs = cur.fetchall()
-            matched_programs = []
-            for prog in all_programs:
-                prog_letters = [l.strip() for l in prog["category_letter"].split(",")]
-                score = sum(1 for l in top3 if l in prog_letters)
-                if score > 0:
-                    matched_programs.append((prog, score))
-            matched_programs = sorted(matched_programs, key=lambda x: x[1], reverse=True)[:3]
+                return {"reply": "Your survey results are not available yet."}
+
+            matched_programs = rank_programs(letters_mask(top3), get_catalog().programs, limit=3)
 
             if not matched_programs:
-                return jsonify({"reply": "No program recommendations found yet."})
+                return {"reply": "No program recommendations found yet."}
 
             reply_lines = []
             reply_lines.append("Top Recommended Programs:\n")
@@ -1071,63 +1027,139 @@ def chatbot():
             # Join with proper line breaks
             final_reply = "\n".join(reply_lines)
 
-            return jsonify({"reply": final_reply})
+            return {"reply": final_reply}
 
         # Survey Result
         if any(k in msg for k in ["career interest survey result", "career interest result",
                                    "interest survey result", "career survey result",
                                    "career result", "result"]):
             if not ai_text:
-                return jsonify({
+                return {
                     "reply": "Your survey results are not available yet. Please complete a survey first."
-                }) 
+                } 
         
             prompt = [
                 {"role": "system", "content": "Summarize this career result briefly in 3-5 sentences for a student."},
                 {"role": "user", "content": ai_text}
             ]
-            try:
-                short_summary = ask_ai(prompt)
-                return jsonify({"reply": f"Your Career Result:\n\n{short_summary}"})
-            except Exception as e:
-                print("Error in Career Result:", e)
-                return jsonify({"reply": "Sorry, I couldn't answer your career result right now."})
+            return {
+                "messages": prompt,
+                "prefix": "Your Career Result:\n\n",
+                "error": "Sorry, I couldn't answer your career result right now."
+            }
 
         # Survey Info
         if any(k in msg for k in ["career interest survey", "career survey", "interest survey"]):
-            return jsonify({
+            return {
                 "reply": "The AspireMatch survey identifies which CPSU programs best match your interests and strengths based on your answers."
-            })
+            }
         
         if any(k in msg for k in ["hi", "hello", "hey", "aspire"]):
-            return jsonify({
+            return {
                 "reply": "Hello! I'm Aspire, your AspireMatch virtual assistant. How can I assist you today?"
-            })
+            }
 
         # Program List
         if "program" in msg or "course" in msg:
-            cur.execute("SELECT program_name FROM program")
-            programs = cur.fetchall()
+            programs = get_catalog().programs
             program_list = "\n".join([f"• {p['program_name']}" for p in programs])
-            return jsonify({"reply": f"Available Programs:\n\n{program_list}"})
+            return {"reply": f"Available Programs:\n\n{program_list}"}
 
         # Default: fallback AI
         messages = [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_msg}
         ]
-        try:
-            reply = ask_ai(messages)
-            return jsonify({"reply": reply})
-        except Exception as e:
-            print("Error in fallback AI:", e)
-            return jsonify({"reply": "Sorry, I couldn't process your question right now."})
+        return {
+            "messages": messages,
+            "prefix": "",
+            "error": "Sorry, I couldn't process your question right now."
+        }
+
+    finally:
+        cur.close()
+        conn.close()
+
+CHATBOT_ERROR_REPLY = "Something went wrong while processing your request."
+
+def read_chatbot_request():
+    user_msg = request.json.get("message", "").strip()
+    student_id = request.json.get("student_id")
+    print("Student ID received:", student_id)
+    print("User message received:", user_msg)
+    return user_msg, student_id
+
+@student_bp.route("/chatbot", methods=["POST"])
+def chatbot():
+    user_msg, student_id = read_chatbot_request()
+
+    try:
+        plan = plan_chatbot_reply(user_msg, student_id)
+    except Exception as e:
+        print("Chatbot error:", e)
+        return jsonify({"reply": CHATBOT_ERROR_REPLY}), 500
+
+    if "reply" in plan:
+        return jsonify({"reply": plan["reply"]})
+
+    try:
+        reply = ask_ai(plan["messages"])
+        return jsonify({"reply": plan["prefix"] + reply})
+    except Exception as e:
+        print("Error in chatbot AI:", e)
+        return jsonify({"reply": plan["error"]})
+
+def sse_event(data, event=None):
+    lines = f"event: {event}\n" if event else ""
+    return lines + f"data: {json.dumps(data)}\n\n"
+
+@student_bp.route("/chatbot_stream", methods=["POST"])
+def chatbot_stream():
+    """
+    Same answers as /chatbot as Server-Sent Events: {"delta": text} events
+    followed by a "done" event. Keyword answers arrive as one delta; LLM
+    replies are relayed token by token as Groq produces them.
+    """
+    user_msg, student_id = read_chatbot_request()
 
+    try:
+        plan = plan_chatbot_reply(user_msg, student_id)
     except Exception as e:
         print("Chatbot error:", e)
-        return jsonify({
-            "reply": "Something went wrong while processing your request."
-        }), 500
+        plan = {"reply": CHATBOT_ERROR_REPLY}
+
+    def generate():
+        if "reply" in plan:
+            yield sse_event({"delta": plan["reply"]})
+            yield sse_event({}, event="done")
+            return
+
+        sent = False
+        try:
+            for delta in groq_chat_stream(plan["messages"]):
+                if not sent:
+                    delta = plan["prefix"] + delta
+                    sent = True
+                yield sse_event({"delta": delta})
+        except Exception as e:
+            print("Error in chatbot stream:", e)
+            if not sent:
+                yield sse_event({"delta": plan["error"]})
+            else:
+                yield sse_event({"message": plan["error"]}, event="error")
+
+        yield sse_event({}, event="done")
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Don't let nginx hold tokens back until the reply is complete.
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 
 @student_bp.route("/chatbot_receive_interest", methods=["POST"])
 def chatbot_receive_interest():
@@ -1168,25 +1200,7 @@ def home():
     survey_result_unlocked, inventory_result_unlocked = cur.fetchone()
 
     cur.execute("""
-        SELECT s.exam_id, s.fullname, s.campus, sa.preferred_program,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
+        SELECT s.exam_id, s.fullname, s.campus, sa.preferred_program
         FROM student s
         LEFT JOIN student_survey_answer sa 
             ON s.exam_id = sa.exam_id
@@ -1204,46 +1218,18 @@ def home():
             "exam_id": row[0],
             "fullname": row[1],
             "campus": row[2],
-            "preferred_program": row[3],
-            "answers": [row[i] for i in range(4, 90)]
+            "preferred_program": row[3]
         }
 
-        answers_clean = [ans for ans in student_results["answers"] if ans]
+        scores = get_letter_scores(cur, student_id)
 
-        if answers_clean:
+        if scores and scores["answered_count"]:
             student_survey_answer_completed = "✅ Completed"
 
-            from collections import Counter
-
-            letter_counts = Counter(answers_clean)
-            top_letters = [letter for letter, _ in letter_counts.most_common(3)]
-
-            # ✅ CLEAN top letters
-            top_letters = [l.strip().upper() for l in top_letters]
-
             preferred = student_results["preferred_program"]
             student_campus = student_results["campus"]
 
-            program_letters = []
-
-            if preferred:
-                cur.execute("""
-                    SELECT category_letter
-                    FROM program
-                    WHERE LOWER(TRIM(program_name)) = LOWER(TRIM(%s))
-                    AND LOWER(TRIM(campus)) = LOWER(TRIM(%s))
-                    LIMIT 1
-                """, (preferred, student_campus))
-
-                program_row = cur.fetchone()
-
-                if program_row and program_row[0]:
-                    program_letters = [l.strip().upper() for l in program_row[0].split(",")]
-
-            # ✅ BETTER MATCH LOGIC
-            common_letters = set(top_letters) & set(program_letters)
-
-            if common_letters:
+            if scores["top_mask"] & get_program_mask(student_campus, preferred):
                 match_status = "✅ Match"
                 interview_status = "Don't need for interview"
             else:
@@ -1494,13 +1480,7 @@ def surveyForm():
         WHERE id = %s
     """, (student_id,))
     student_campus = cur.fetchone()[0]
-    cur.execute("""
-        SELECT program_name
-        FROM program
-        WHERE campus = %s AND is_active = TRUE
-        ORDER BY program_name
-    """, (student_campus,))
-    programs = cur.fetchall()
+    programs = [(p["program_name"],) for p in get_catalog().campus_programs(student_campus, active_only=True)]
 
     cur.close()
     conn.close()
@@ -1559,6 +1539,9 @@ def submit_survey():
                 {', '.join([f"{c} = EXCLUDED.{c}" for c in columns])}
         """
 
+        # Take any earlier submission out of the analytics cube first
+        apply_cube_delta(cur, session["student_id"], -1)
+
         cur.execute(query, (
             session["exam_id"],
             session["student_id"],
@@ -1566,6 +1549,9 @@ def submit_survey():
             *answers
         ))
 
+        save_letter_scores(cur, session["student_id"], session["exam_id"], answers)
+        apply_cube_delta(cur, session["student_id"], 1)
+
         # --- 4️⃣ Notification ---
         cur.execute("""
             INSERT INTO notifications (student_id, exam_id, message, is_read)
@@ -1622,25 +1608,7 @@ def notification():
     notifications = cur.fetchall()
 
     cur.execute("""
-        SELECT s.exam_id, s.fullname, s.campus, sa.preferred_program,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
+        SELECT s.exam_id, s.fullname, s.campus, sa.preferred_program
         FROM student s
         LEFT JOIN student_survey_answer sa 
             ON s.exam_id = sa.exam_id
@@ -1654,8 +1622,7 @@ def notification():
             "exam_id": row[0],
             "fullname": row[1],
             "campus": row[2],
-            "preferred_program": row[3],
-            "answers": [row[i] for i in range(4, 90)]
+            "preferred_program": row[3]
         }
 
     cur.close()
@@ -1799,25 +1766,7 @@ def surveyResult():
     cur.execute("""
         SELECT s.exam_id, s.fullname, s.school_year, s.campus, s.photo,
                c.campus_name, c.campus_address, c.guidance_counselor,
-               sa.preferred_program, sa.ai_explanation,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
+               sa.preferred_program, sa.ai_explanation
         FROM student s
         LEFT JOIN student_survey_answer sa 
             ON s.exam_id = sa.exam_id
@@ -1843,64 +1792,24 @@ def surveyResult():
         "campus_address": row[6],
         "guidance_counselor": row[7],
         "preferred_program": row[8],
-        "ai_explanation": format_ai_explanation_for_pdf(row[9]) if row[9] else None,
-        "answers": [row[i] for i in range(10, 96)]
+        "ai_explanation": format_ai_explanation_for_pdf(row[9]) if row[9] else None
     }
 
-    answers_clean = student_results["answers"]
+    scores = get_letter_scores(cur, student_id)
+    answers_clean = bool(scores and scores["answered_count"])
     preferred = student_results["preferred_program"]
 
-    top_letters = []
-    program_letters = []
+    top_letters = scores["top_letters"] if answers_clean else []
+    program_mask = get_program_mask(student_results["campus"], preferred)
 
-    if answers_clean:
-        letter_counts = Counter(answers_clean)
-        top_letters = [letter for letter, _ in letter_counts.most_common(3)]
-        top_letters = [letter.strip().upper() for letter in top_letters]
-
-    if preferred:
-        cur.execute("""
-            SELECT category_letter 
-            FROM program 
-            WHERE LOWER(TRIM(program_name)) = LOWER(TRIM(%s))
-            AND LOWER(TRIM(campus)) = LOWER(TRIM(%s))
-            LIMIT 1
-        """, (preferred, student_results["campus"]))
-
-        result = cur.fetchone()
-
-        if result and result[0]:
-            program_letters = [letter.strip().upper() for letter in result[0].split(",")]
-        else:
-            program_letters = []
-
-    if not preferred and not answers_clean:
-        match_status = "Not Yet Answer"
-    elif any(letter in program_letters for letter in top_letters):
-        match_status = "Match"
-    else:
-        match_status = "Not Match"
+    match_status = program_match_status(
+        preferred, scores["top_mask"] if answers_clean else 0, program_mask, answers_clean
+    )
 
     predicted_programs = []
 
     if top_letters:
-        conditions = " OR ".join(["category_letter ILIKE %s"] * len(top_letters))
-        values = [f"%{letter}%" for letter in top_letters]
-
-        query = f"""
-            SELECT DISTINCT ON (program_name) program_name, category_letter
-            FROM program
-            WHERE ({conditions})
-            AND TRIM(LOWER(campus)) = TRIM(LOWER(%s))
-            ORDER BY program_name
-            LIMIT 5
-        """
-
-        values.append(student_results["campus"])
-        cur.execute(query, values)
-        predicted_programs = cur.fetchall()
-    print("Top Letters:", top_letters)
-    print("Program Letters:", program_letters)
+        predicted_programs = get_catalog().predicted_programs(student_results["campus"], top_letters)
 
     conn.close()
 
@@ -1950,10 +1859,14 @@ def generate_ai_explanation():
     preferred_program = data.get("preferred_program", "")
     fullname = data.get("fullname", "")
 
-    explanation = generate_ai_insights(
+    # Same letters + program always produce the same text, so it is
+    # generated once and only the name is filled in per student.
+    explanation = cached_ai_explanation(
+        cur,
         top_letters,
         preferred_program,
-        fullname
+        fullname,
+        generate_ai_insights
     )
 
     # save explanation
@@ -1979,25 +1892,7 @@ def download_pdf(student_id):
     cur.execute("""
         SELECT s.exam_id, s.fullname, s.school_year, s.campus, s.photo,
                c.campus_name, c.campus_address, c.guidance_counselor,
-               sa.preferred_program, sa.ai_explanation,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
+               sa.preferred_program, sa.ai_explanation
         FROM student s
         LEFT JOIN student_survey_answer sa 
             ON s.exam_id = sa.exam_id
@@ -2025,56 +1920,32 @@ def download_pdf(student_id):
         "campus_address": row[6],
         "guidance_counselor": row[7],
         "preferred_program": row[8],
-        "ai_explanation": format_ai_explanation_for_pdf(row[9]),
-        "answers": [row[i] for i in range(10, 96)]
+        "ai_explanation": format_ai_explanation_for_pdf(row[9])
     }
 
-    answers_clean = student_data["answers"]
+    scores = get_letter_scores(cur, student_id)
+    answers_clean = bool(scores and scores["answered_count"])
     preferred = student_data["preferred_program"]
 
-    top_letters = []
-    program_letters = []
-
-    if answers_clean:
-        letter_counts = Counter(answers_clean)
-        top_letters = [letter for letter, _ in letter_counts.most_common(3)]
-
-    if preferred:
-        cur.execute("SELECT category_letter FROM program WHERE program_name = %s", (preferred,))
-        result = cur.fetchone()
-        program_letters = result[0].split(",") if result else []
+    top_letters = scores["top_letters"] if answers_clean else []
 
-    if not preferred and not answers_clean:
-        match_status = "Not Yet Answer"
-    elif any(letter in program_letters for letter in top_letters):
-        match_status = "Match"
-    else:
-        match_status = "Not Match"
+    # Same rule as surveyResult: the program as offered on the student's campus.
+    match_status = program_match_status(
+        preferred,
+        scores["top_mask"] if answers_clean else 0,
+        get_program_mask(student_data["campus"], preferred),
+        answers_clean
+    )
 
     predicted_programs = []
 
     if top_letters:
-        conditions = " OR ".join(["category_letter ILIKE %s"] * len(top_letters))
-        values = [f"%{letter}%" for letter in top_letters]
-
-        query = f"""
-            SELECT program_name, category_letter
-            FROM program
-            WHERE {conditions}
-            ORDER BY program_name
-            LIMIT 5
-        """
-        cur.execute(query, values)
-        predicted_programs = cur.fetchall()
+        predicted_programs = get_catalog().predicted_programs(None, top_letters)
 
     student_photo_base64 = None
 
     student_photo_base64 = student_photo_to_base64(student_data.get("photo"))
 
-    cpsu_logo = image_to_base64("cpsulogo.png")
-    bagong_logo = image_to_base64("bagong-pilipinas-logo.png")
-    safe_logo = image_to_base64("logo.png")
-
     html = render_template(
         "student/surveyResultPDF.html",
         year=year,
@@ -2087,24 +1958,19 @@ def download_pdf(student_id):
         match_status=match_status,
         predicted_programs=predicted_programs,
         letter_descriptions=letter_descriptions,
-        cpsu_logo_base64=cpsu_logo,
-        bagong_logo_base64=bagong_logo,
-        safe_logo_base64=safe_logo,
-        student_photo_base64=student_photo_base64
+        student_photo_base64=student_photo_base64,
+        **pdf_logos()
     )
 
-    pdf_file = generate_pdf(html)
-
     filename = f"Career_Survey_Result_{student_data['exam_id']}_{student_data['fullname']}.pdf"
 
     print("PHOTO FILE:", student_data["photo"])
     print("PHOTO BASE64:", bool(student_photo_base64))
 
-    return send_file(
-        pdf_file,
-        mimetype="application/pdf",
-        download_name=filename,
-        as_attachment=True
+    return send_cached_pdf(
+        pdf_cache_key("student/surveyResultPDF.html", html),
+        lambda: generate_pdf(html, "survey result"),
+        filename
     )
 
 @student_bp.route("/studentInventory")
@@ -2119,25 +1985,7 @@ def studentInventory():
 
     cur.execute("""
         SELECT s.exam_id, s.fullname, s.created_at, s.campus, s.photo, 
-               sa.preferred_program, sa.ai_explanation,
-               sa.pair1, sa.pair2, sa.pair3, sa.pair4, sa.pair5,
-               sa.pair6, sa.pair7, sa.pair8, sa.pair9, sa.pair10,
-               sa.pair11, sa.pair12, sa.pair13, sa.pair14, sa.pair15,
-               sa.pair16, sa.pair17, sa.pair18, sa.pair19, sa.pair20,
-               sa.pair21, sa.pair22, sa.pair23, sa.pair24, sa.pair25,
-               sa.pair26, sa.pair27, sa.pair28, sa.pair29, sa.pair30,
-               sa.pair31, sa.pair32, sa.pair33, sa.pair34, sa.pair35,
-               sa.pair36, sa.pair37, sa.pair38, sa.pair39, sa.pair40,
-               sa.pair41, sa.pair42, sa.pair43, sa.pair44, sa.pair45,
-               sa.pair46, sa.pair47, sa.pair48, sa.pair49, sa.pair50,
-               sa.pair51, sa.pair52, sa.pair53, sa.pair54, sa.pair55,
-               sa.pair56, sa.pair57, sa.pair58, sa.pair59, sa.pair60,
-               sa.pair61, sa.pair62, sa.pair63, sa.pair64, sa.pair65,
-               sa.pair66, sa.pair67, sa.pair68, sa.pair69, sa.pair70,
-               sa.pair71, sa.pair72, sa.pair73, sa.pair74, sa.pair75,
-               sa.pair76, sa.pair77, sa.pair78, sa.pair79, sa.pair80,
-               sa.pair81, sa.pair82, sa.pair83, sa.pair84, sa.pair85,
-               sa.pair86
+               sa.preferred_program, sa.ai_explanation
         FROM student s
         LEFT JOIN student_survey_answer sa 
             ON s.exam_id = sa.exam_id
@@ -2162,14 +2010,7 @@ def studentInventory():
         "campus": row[3],
     }
 
-    cur.execute("""
-        SELECT program_name 
-        FROM program 
-        WHERE campus = %s
-        ORDER BY program_name
-    """, (student_results["campus"],))
-    
-    programs = [row[0] for row in cur.fetchall()]
+    programs = [p["program_name"] for p in get_catalog().campus_programs(student_results["campus"])]
 
     cur.close()
     conn.close()
@@ -3107,8 +2948,6 @@ def download_inventory_pdf(student_id):
             other_schools_selected = [r.strip() for r in other_school_data[0].split(",")]
         other_school = other_school_data[1] or ""
 
-    cpsu_logo_base64 = image_to_base64("cpsulogo.png")
-
     html = render_template(
         "student/studentInventoryResultPDF.html",
         info=info,
@@ -3116,11 +2955,11 @@ def download_inventory_pdf(student_id):
         other_reason=other_reason,
         other_schools_selected=other_schools_selected,
         other_school=other_school,
-        cpsu_logo_base64=cpsu_logo_base64,
         student_photo_base64=student_photo_base64,
+        **pdf_logos("cpsu_logo_base64")
     )
 
-    pdf_file = generate_pdf(html)
+    pdf_file = generate_pdf(html, "inventory result")
 
     filename = f"Inventory_Result_{student_data['exam_id']}_{student_data['fullname'].replace(' ', '_')}.pdf"
 
@@ -3146,6 +2985,8 @@ def profile():
         email = request.form.get("email")
 
         if fullname and gender and email:
+            # Gender is part of the analytics cube key
+            apply_cube_delta(cur, student_id, -1)
             cur.execute("""
                 UPDATE student
                 SET fullname = %s,
@@ -3153,6 +2994,7 @@ def profile():
                     email = %s
                 WHERE id = %s
             """, (fullname, gender, email, student_id))
+            apply_cube_delta(cur, student_id, 1)
             conn.commit()
 
     cur.execute("""
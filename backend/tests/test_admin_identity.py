@@ -0,0 +1,81 @@
+import pytest
+
+from backend.utils import admin_identity
+from backend.utils.admin_identity import AdminIdentity
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    rows = {
+        "root": AdminIdentity(1, "root", "Root", "r@x.com", None, True),
+        "ana": AdminIdentity(2, "ana", "Ana", "a@x.com", "Main", False),
+    }
+    calls = []
+
+    def load(username):
+        calls.append(username)
+        return rows.get(username)
+
+    clock = FakeClock()
+    monkeypatch.setattr(admin_identity, "_load_admin", load)
+    monkeypatch.setattr(admin_identity, "time", clock)
+    monkeypatch.setattr(admin_identity, "_cache", {})
+    return rows, calls, clock
+
+
+def test_campus_or_all():
+    assert AdminIdentity(1, "r", "R", "", None, True).campus_or_all == "ALL"
+    assert AdminIdentity(1, "r", "R", "", "Main", True).campus_or_all == "Main"
+    assert AdminIdentity(2, "a", "A", "", "Main", False).campus_or_all == "Main"
+
+
+def test_hits_are_cached_until_the_ttl(loads):
+    rows, calls, clock = loads
+
+    assert admin_identity.get_admin("ana") is rows["ana"]
+    assert admin_identity.get_admin("ana") is rows["ana"]
+    assert calls == ["ana"]
+
+    clock.now += admin_identity.ADMIN_IDENTITY_TTL + 1
+    admin_identity.get_admin("ana")
+    assert calls == ["ana", "ana"]
+
+
+def test_misses_are_not_cached(loads):
+    rows, calls, _ = loads
+
+    assert admin_identity.get_admin("new") is None
+    rows["new"] = AdminIdentity(3, "new", "New", "n@x.com", "Main", False)
+
+    assert admin_identity.get_admin("new") is rows["new"]
+    assert calls == ["new", "new"]
+
+
+def test_invalidate_one_or_all(loads):
+    rows, calls, _ = loads
+    admin_identity.get_admin("ana")
+    admin_identity.get_admin("root")
+
+    admin_identity.invalidate_admin("ana")
+    del rows["ana"]     # deleted admin
+
+    assert admin_identity.get_admin("ana") is None
+    admin_identity.get_admin("root")
+    assert calls == ["ana", "root", "ana"]
+
+    admin_identity.invalidate_admin()
+    admin_identity.get_admin("root")
+    assert calls == ["ana", "root", "ana", "root"]
+
+
+def test_empty_username(loads):
+    assert admin_identity.get_admin("") is None
+    assert loads[1] == []
@@ -0,0 +1,93 @@
+import pytest
+
+from backend.utils import ai_explanation_cache as cache
+from backend.utils.ai_explanation_cache import (
+    NAME_PLACEHOLDER,
+    PROMPT_VERSION,
+    cache_key,
+    normalize_letters,
+    render_explanation,
+)
+
+
+class FakeCursor:
+    """Empty ai_explanation_cache table: SELECTs miss, INSERTs succeed."""
+
+    def __init__(self):
+        self.inserted = []
+        self.last_sql = ""
+
+    def execute(self, sql, params=None):
+        self.last_sql = sql
+        if "INSERT INTO ai_explanation_cache" in sql:
+            self.inserted.append(params)
+
+    def fetchone(self):
+        if "INSERT INTO" in self.last_sql:
+            return (self.inserted[-1][-1],)
+        return None
+
+
+@pytest.fixture
+def empty_lru(monkeypatch):
+    monkeypatch.setattr(cache, "_lru", cache.OrderedDict())
+    monkeypatch.setattr(cache, "ensure_ai_explanation_cache_table", lambda: None)
+
+
+@pytest.mark.parametrize("letters, expected", [
+    (["D", "A", "K"], "DAK"),
+    (["d", " a ", "k"], "DAK"),
+    ("D, A, K", "DAK"),
+    ("dak", "DAK"),
+    (["D", "A"], None),
+    (["D", "A", "A"], None),
+    (["D", "A", "Z"], None),
+    (None, None),
+])
+def test_normalize_letters(letters, expected):
+    assert normalize_letters(letters) == expected
+
+
+def test_cache_key_ignores_name_case_and_spacing_but_not_order():
+    key = cache_key(["D", "A", "K"], "BS  Information Technology ")
+
+    assert key == ("DAK", "bs information technology", PROMPT_VERSION)
+    assert cache_key("d,a,k", "bs information technology") == key
+    assert cache_key(["A", "D", "K"], "BS Information Technology") != key
+
+
+def test_cache_key_needs_letters_and_program():
+    assert cache_key(["D", "A", "K"], "  ") is None
+    assert cache_key(["D", "A"], "BSIT") is None
+
+
+def test_render_explanation_fills_the_name():
+    text = f"Hi {NAME_PLACEHOLDER}, well done {NAME_PLACEHOLDER}."
+
+    assert render_explanation(text, "Ana") == "Hi Ana, well done Ana."
+    assert render_explanation(text, None) == "Hi Student, well done Student."
+
+
+def test_template_is_generated_once_then_served_from_the_lru(empty_lru):
+    calls = []
+
+    def generate(letters, program, name):
+        calls.append((letters, program, name))
+        return f"{name} fits {program}"
+
+    cur = FakeCursor()
+    first = cache.cached_ai_explanation(cur, ["D", "A", "K"], "BS  IT", "Ana", generate)
+    second = cache.cached_ai_explanation(cur, "DAK", "bs it", "Ben", generate)
+
+    assert first == "Ana fits BS IT"
+    assert second == "Ben fits BS IT"
+    assert calls == [(["D", "A", "K"], "BS IT", NAME_PLACEHOLDER)]
+    assert len(cur.inserted) == 1
+
+
+def test_uncacheable_inputs_call_generate_directly(empty_lru):
+    result = cache.cached_ai_explanation(
+        FakeCursor(), ["D"], "BSIT", "Ana", lambda letters, program, name: f"{name}: {letters}"
+    )
+
+    assert result == "Ana: ['D']"
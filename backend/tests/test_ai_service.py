@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+from backend import ai_service
+from backend.ai_service import AI_BREAKER_COOLDOWN, AI_BREAKER_THRESHOLD, ProviderState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ai_service, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def fresh_providers(monkeypatch):
+    monkeypatch.setattr(ai_service, "_providers", {})
+
+
+def trip(state):
+    for _ in range(AI_BREAKER_THRESHOLD):
+        state.record(0.1, RuntimeError("boom"))
+
+
+# ===== CIRCUIT BREAKER =====
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    state = ProviderState("gemini")
+
+    for _ in range(AI_BREAKER_THRESHOLD - 1):
+        state.record(0.1, RuntimeError("boom"))
+    assert state.allow()
+
+    state.record(0.1, RuntimeError("boom"))
+    assert not state.allow()
+    assert state.stats()["breaker"] == "open"
+    assert state.stats()["last_error"] == "boom"
+
+
+def test_success_resets_the_failure_streak(clock):
+    state = ProviderState("gemini")
+
+    for _ in range(AI_BREAKER_THRESHOLD - 1):
+        state.record(0.1, RuntimeError("boom"))
+    state.record(0.2)
+    state.record(0.1, RuntimeError("boom"))
+
+    assert state.allow()
+    assert state.stats()["successes"] == 1
+    assert state.stats()["failures"] == AI_BREAKER_THRESHOLD
+
+
+def test_one_trial_call_after_cooldown(clock):
+    state = ProviderState("gemini")
+    trip(state)
+
+    clock.now += AI_BREAKER_COOLDOWN + 1
+    assert state.allow()
+    assert not state.allow()    # only one trial at a time
+
+    state.record(0.1)
+    assert state.allow()
+    assert state.stats()["breaker"] == "closed"
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    state = ProviderState("gemini")
+    trip(state)
+
+    clock.now += AI_BREAKER_COOLDOWN + 1
+    assert state.allow()
+    state.record(0.1, RuntimeError("still down"))
+
+    assert not state.allow()
+
+
+def test_lost_trial_does_not_block_forever(clock):
+    state = ProviderState("gemini")
+    trip(state)
+
+    clock.now += AI_BREAKER_COOLDOWN + 1
+    assert state.allow()        # trial never reports back
+
+    clock.now += AI_BREAKER_COOLDOWN + 1
+    assert state.allow()
+
+
+# ===== ROUTER =====
+
+def run(names, providers, monkeypatch, hedge_delay=0.05, timeout=2):
+    for name, fn in providers.items():
+        monkeypatch.setitem(ai_service.PROVIDERS, name, fn)
+    return asyncio.run(ai_service.route_prompt("hi", names, hedge_delay=hedge_delay, timeout=timeout))
+
+
+def test_router_falls_through_failures(monkeypatch, fresh_providers):
+    def broken(prompt):
+        raise RuntimeError("down")
+
+    answer = run(["a", "b"], {"a": broken, "b": lambda p: f"b:{p}"}, monkeypatch)
+
+    assert answer == "b:hi"
+    stats = ai_service.get_ai_provider_stats()
+    assert stats["a"]["failures"] == 1
+    assert stats["b"]["successes"] == 1
+
+
+def test_router_hedges_a_slow_provider(monkeypatch, fresh_providers):
+    def slow(prompt):
+        time.sleep(0.5)
+        return "slow"
+
+    started = time.perf_counter()
+    answer = run(["a", "b"], {"a": slow, "b": lambda p: "fast"}, monkeypatch)
+
+    assert answer == "fast"
+    assert time.perf_counter() - started < 0.4
+
+
+def test_router_skips_open_breakers(monkeypatch, fresh_providers):
+    trip(ai_service._state("a"))
+    called = []
+
+    def a(prompt):
+        called.append("a")
+        return "a"
+
+    assert run(["a", "b"], {"a": a, "b": lambda p: "b"}, monkeypatch) == "b"
+    assert called == []
+
+
+def test_router_reports_every_failure(monkeypatch, fresh_providers):
+    def broken(prompt):
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError, match="a: down; b: down"):
+        run(["a", "b"], {"a": broken, "b": broken}, monkeypatch)
+
+
+def test_router_times_out(monkeypatch, fresh_providers):
+    def slow(prompt):
+        time.sleep(0.3)
+        return "late"
+
+    with pytest.raises(TimeoutError):
+        run(["a"], {"a": slow}, monkeypatch, timeout=0.05)
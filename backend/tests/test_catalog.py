@@ -0,0 +1,76 @@
+from backend.utils.catalog import Catalog, normalize, parse_letters
+from backend.utils.matching import letters_mask
+
+
+def program(id, name, campus, category_letter, is_active=True):
+    # Shaped like the rows _load_catalog builds.
+    letters = parse_letters(category_letter)
+    return {
+        "id": id,
+        "program_name": name,
+        "campus": campus,
+        "category_letter": category_letter,
+        "color": None,
+        "is_active": is_active,
+        "letters": letters,
+        "mask": letters_mask(letters),
+    }
+
+
+def make_catalog():
+    campuses = [
+        {"campus_name": "Main", "campus_address": "Kabankalan"},
+        {"campus_name": "North", "campus_address": "Victorias"},
+    ]
+    programs = [
+        program(1, "BSIT", "Main", "A, B, P"),
+        program(2, "BSHM", "Main", "G,I"),
+        program(3, "BSIT", "North", "c"),
+        program(4, "BSED", "Main", "M", is_active=False),
+        program(5, "BSIT", "Main", "Q"),
+    ]
+    return Catalog(7, campuses, programs)
+
+
+def test_normalize_matches_lower_trim():
+    assert normalize("  BS  IT ") == "bs  it"
+    assert normalize(None) == ""
+
+
+def test_parse_letters():
+    assert parse_letters(" a, B ,,p ") == ["A", "B", "P"]
+    assert parse_letters(None) == []
+
+
+def test_program_lookup_is_case_and_edge_space_insensitive():
+    catalog = make_catalog()
+
+    assert catalog.program(" main ", "bsit ")["id"] == 1
+    assert catalog.program_letters("North", "BSIT") == ["C"]
+    assert catalog.program_letters("Main", "Unknown") == []
+    assert catalog.program_letters_by_name("bsit") == ["A", "B", "P"]
+
+
+def test_campus_lookups():
+    catalog = make_catalog()
+
+    assert catalog.campus_names() == ["Main", "North"]
+    assert catalog.campus_header("north") == ("North", "Victorias")
+    assert catalog.campus_header("Elsewhere") == ("Elsewhere", "")
+
+
+def test_campus_programs_and_names():
+    catalog = make_catalog()
+
+    assert [p["id"] for p in catalog.campus_programs("Main")] == [4, 2, 1, 5]
+    assert [p["id"] for p in catalog.campus_programs("Main", active_only=True)] == [2, 1, 5]
+    assert catalog.program_names() == ["BSED", "BSHM", "BSIT"]
+    assert catalog.program_names("North") == ["BSIT"]
+
+
+def test_predicted_programs_one_per_name():
+    catalog = make_catalog()
+
+    assert catalog.predicted_programs("Main", ["Q", "G"]) == [("BSHM", "G,I"), ("BSIT", "Q")]
+    assert catalog.predicted_programs(None, ["C"]) == [("BSIT", "c")]
+    assert catalog.predicted_programs("Main", ["R"]) == []
@@ -0,0 +1,96 @@
+import psycopg2.extensions
+import pytest
+
+from backend import db
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(max_size=2, timeout=0.05):
+    pool = db.ConnectionPool("dsn", max_size=max_size, timeout=timeout, check_idle=0, max_lifetime=0)
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        with pool._lock:
+            pool.created += 1
+            pool._born[id(conn)] = 0.0
+        return conn
+
+    pool._connect = connect
+    return pool, opened
+
+
+def test_released_connection_is_reused():
+    pool, opened = make_pool()
+
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    assert len(opened) == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool, _ = make_pool(max_size=1)
+    pool.acquire()
+
+    with pytest.raises(db.PoolTimeout):
+        pool.acquire()
+
+    assert pool.stats()["in_use"] == 1
+
+
+def test_open_transaction_is_rolled_back_on_release():
+    pool, _ = make_pool()
+    conn = pool.acquire()
+    conn.status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+    pool.release(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_closed_connection_is_discarded_on_release():
+    pool, opened = make_pool()
+    conn = pool.acquire()
+    conn.closed = 1
+
+    pool.release(conn)
+
+    assert pool.stats() == {
+        "in_use": 0, "idle": 0, "waiting": 0, "created": 1, "recycled": 1, "max_size": 2
+    }
+    assert pool.acquire() is not conn
+    assert len(opened) == 2
+
+
+def test_pooled_connection_returns_once():
+    pool, _ = make_pool()
+    proxy = db.PooledConnection(pool, pool.acquire())
+
+    proxy.close()
+    proxy.close()
+
+    assert proxy.closed == 1
+    assert pool.stats()["in_use"] == 0
+    assert pool.stats()["idle"] == 1
+    with pytest.raises(psycopg2.InterfaceError):
+        proxy.cursor()
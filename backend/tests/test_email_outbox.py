@@ -0,0 +1,135 @@
+import smtplib
+
+import pytest
+
+from backend.utils import email_outbox, email_utils
+
+
+class FakeCursor:
+    def __init__(self):
+        self.queries = []
+
+    def execute(self, sql, params=None):
+        self.queries.append((" ".join(sql.split()), params))
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.fail_next = False
+        FakeSMTP.instances.append(self)
+
+    def login(self, user, password):
+        self.user = user
+
+    def send_message(self, msg):
+        if self.fail_next:
+            self.fail_next = False
+            raise smtplib.SMTPServerDisconnected("idle")
+        self.sent.append(msg)
+
+    def quit(self):
+        pass
+
+
+def message(attempts=1, transport="smtp", from_email=None):
+    return {
+        "id": 9, "transport": transport, "to_email": "s@x.com", "from_email": from_email,
+        "subject": "Hi", "body": "Body", "attempts": attempts,
+    }
+
+
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("EMAIL_USER", "sender@x.com")
+    monkeypatch.setenv("EMAIL_PASS", "secret")
+
+
+# ===== RETRIES =====
+
+def test_failed_send_is_requeued_with_backoff(monkeypatch):
+    monkeypatch.setattr(email_outbox, "EMAIL_RETRY_BASE_SECONDS", 10)
+    monkeypatch.setattr(email_outbox, "EMAIL_RETRY_MAX_SECONDS", 900)
+    cur = FakeCursor()
+
+    email_outbox._mark_failed(cur, message(attempts=3), RuntimeError("timeout"))
+
+    sql, params = cur.queries[-1]
+    assert "SET status = 'queued'" in sql
+    assert params == ("timeout", 40, 9)
+
+
+def test_backoff_is_capped(monkeypatch):
+    monkeypatch.setattr(email_outbox, "EMAIL_MAX_ATTEMPTS", 50)
+    monkeypatch.setattr(email_outbox, "EMAIL_RETRY_MAX_SECONDS", 900)
+    cur = FakeCursor()
+
+    email_outbox._mark_failed(cur, message(attempts=20), RuntimeError("x"))
+
+    assert cur.queries[-1][1][1] == 900
+
+
+def test_last_attempt_is_dead_lettered(monkeypatch):
+    monkeypatch.setattr(email_outbox, "EMAIL_MAX_ATTEMPTS", 5)
+    cur = FakeCursor()
+
+    email_outbox._mark_failed(cur, message(attempts=5), RuntimeError("bounced"))
+
+    assert "INSERT INTO email_dead_letter" in cur.queries[0][0]
+    assert "SET status = 'dead'" in cur.queries[1][0]
+
+
+def test_claim_refresh_only_touches_messages_still_sending():
+    cur = FakeCursor()
+
+    email_outbox._refresh_claim(cur, [3, 4])
+
+    sql, params = cur.queries[0]
+    assert "SET locked_at = NOW()" in sql and "status = 'sending'" in sql
+    assert params == ([3, 4],)
+
+
+# ===== SMTP =====
+
+def test_smtp_session_is_reused_and_reconnected_once(monkeypatch, credentials):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(email_outbox.smtplib, "SMTP_SSL", FakeSMTP)
+    sender = email_outbox.SmtpSender()
+
+    sender.send(message())
+    sender.send(message())
+    FakeSMTP.instances[0].fail_next = True
+    sender.send(message())
+
+    assert len(FakeSMTP.instances) == 2
+    assert len(FakeSMTP.instances[0].sent) == 2
+    assert len(FakeSMTP.instances[1].sent) == 1
+    assert FakeSMTP.instances[1].sent[0]["From"] == "sender@x.com"
+
+
+def test_smtp_without_credentials_fails(monkeypatch):
+    monkeypatch.delenv("EMAIL_USER", raising=False)
+    monkeypatch.delenv("EMAIL_PASS", raising=False)
+
+    with pytest.raises(RuntimeError):
+        email_outbox.SmtpSender().send(message())
+
+
+# ===== VERIFICATION CODES =====
+
+def test_verification_code_is_sent_as_email_user(monkeypatch, credentials):
+    queued = []
+    monkeypatch.setattr(email_utils, "enqueue_email", lambda *args, **kwargs: queued.append(kwargs) or True)
+
+    assert email_utils.send_verification_code("s@x.com", "123456")
+    assert queued[0]["from_email"] == "AspireMatch <sender@x.com>"
+
+
+def test_verification_code_needs_credentials(monkeypatch):
+    monkeypatch.delenv("EMAIL_USER", raising=False)
+    monkeypatch.setenv("EMAIL_PASS", "secret")
+    monkeypatch.setattr(email_utils, "enqueue_email", lambda *args, **kwargs: pytest.fail("queued"))
+
+    assert email_utils.send_verification_code("s@x.com", "123456") is False
@@ -0,0 +1,90 @@
+from backend.utils import letter_scores
+from backend.utils.letter_scores import LETTERS, PAIR_COLUMNS, compute_letter_scores, scores_row_params
+
+
+class FakeCursor:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.queries = []
+
+    def execute(self, sql, params=None):
+        self.queries.append((sql, params))
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+
+def test_counts_every_letter_in_its_slot():
+    scores = compute_letter_scores(["A", "b", " C ", "A", "R"])
+
+    assert scores["letter_counts"][LETTERS.index("A")] == 2
+    assert scores["letter_counts"][LETTERS.index("B")] == 1
+    assert scores["letter_counts"][LETTERS.index("R")] == 1
+    assert scores["answered_count"] == 5
+
+
+def test_ties_keep_first_picked_order():
+    # B, A and C all appear twice; B was picked first, then A, then C.
+    scores = compute_letter_scores(["B", "A", "C", "C", "A", "B", "D"])
+
+    assert scores["ranked_letters"] == "BACD"
+    assert scores["top_letters"] == ["B", "A", "C"]
+
+
+def test_higher_count_beats_earlier_pick():
+    scores = compute_letter_scores(["A", "B", "B", "C", "C", "C"])
+
+    assert scores["top_letters"] == ["C", "B", "A"]
+
+
+def test_blank_and_unknown_answers_are_ignored():
+    scores = compute_letter_scores([None, "", "Z", "AB", "7", "Q"])
+
+    assert scores["ranked_letters"] == "Q"
+    assert scores["answered_count"] == 1
+
+
+def test_no_answers():
+    scores = compute_letter_scores([])
+
+    assert scores["letter_counts"] == [0] * len(LETTERS)
+    assert scores["top_letters"] == []
+
+
+def test_row_params_store_top_letters_as_text():
+    scores = compute_letter_scores(["D", "A", "K"])
+
+    assert scores_row_params(7, "EX1", scores)[4] == "DAK"
+
+
+def test_get_letter_scores_reads_stored_row(monkeypatch):
+    monkeypatch.setattr(letter_scores, "ensure_letter_scores_table", lambda: None)
+    counts = [0] * len(LETTERS)
+    cur = FakeCursor((counts, "DAKB", 86))
+
+    scores = letter_scores.get_letter_scores(cur, 1)
+
+    assert scores["top_letters"] == ["D", "A", "K"]
+    assert scores["answered_count"] == 86
+    assert len(cur.queries) == 1
+
+
+def test_get_letter_scores_computes_and_stores_missing_row(monkeypatch):
+    monkeypatch.setattr(letter_scores, "ensure_letter_scores_table", lambda: None)
+    stored = []
+    monkeypatch.setattr(
+        letter_scores, "_store_letter_scores", lambda *args: stored.append(args)
+    )
+    answers = ["C", "C", "A"] + [None] * (len(PAIR_COLUMNS) - 3)
+    cur = FakeCursor(None, ("EX1", *answers))
+
+    scores = letter_scores.get_letter_scores(cur, 1)
+
+    assert scores["top_letters"] == ["C", "A"]
+    assert stored == [(1, "EX1", scores)]
+
+
+def test_get_letter_scores_without_answers(monkeypatch):
+    monkeypatch.setattr(letter_scores, "ensure_letter_scores_table", lambda: None)
+
+    assert letter_scores.get_letter_scores(FakeCursor(None, None), 1) is None
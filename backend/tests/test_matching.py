@@ -0,0 +1,93 @@
+import pytest
+
+from backend.utils.letter_scores import LETTERS, compute_letter_scores
+from backend.utils.matching import (
+    LETTER_BITS,
+    MATCH,
+    NOT_ANSWERED,
+    NOT_MATCH,
+    cohort_match_statuses,
+    letters_mask,
+    mask_letters,
+    match_status,
+    overlap,
+    popcount,
+    rank_programs,
+)
+
+
+def test_each_letter_has_its_own_bit():
+    assert len(LETTER_BITS) == 18
+    assert LETTER_BITS["A"] == 1
+    assert LETTER_BITS["R"] == 1 << 17
+    assert letters_mask(LETTERS) == (1 << 18) - 1
+
+
+@pytest.mark.parametrize("letters", ["AGL", "a, g, l", ["A", "G", "L"], ("l", " g ", "a"), "LGA"])
+def test_letters_mask_accepts_strings_and_lists(letters):
+    assert mask_letters(letters_mask(letters)) == ["A", "G", "L"]
+
+
+def test_letters_mask_ignores_unknown_characters():
+    assert letters_mask("S, Z, 9, ,") == 0
+    assert letters_mask(None) == 0
+    assert letters_mask([]) == 0
+
+
+def test_popcount_and_overlap():
+    assert popcount(0) == 0
+    assert popcount(letters_mask("ABCR")) == 4
+    assert overlap(letters_mask("DAK"), letters_mask("A, K, Q")) == 2
+
+
+def test_match_status_rule():
+    student = letters_mask("DAK")
+
+    assert match_status("BSIT", student, letters_mask("A,B,P"), True) == MATCH
+    assert match_status("BSIT", student, letters_mask("G,I"), True) == NOT_MATCH
+    assert match_status("BSIT", student, 0, True) == NOT_MATCH        # unknown program
+    assert match_status(None, 0, 0, False) == NOT_ANSWERED
+    assert match_status("BSIT", 0, letters_mask("A"), False) == NOT_MATCH
+
+
+def test_scores_carry_the_top_mask():
+    scores = compute_letter_scores(["K", "K", "D", "A", "B"])
+
+    assert scores["top_mask"] == letters_mask(scores["top_letters"])
+
+
+def test_rank_programs_by_overlap_keeping_catalog_order_on_ties():
+    programs = [
+        {"id": 1, "mask": letters_mask("A")},
+        {"id": 2, "mask": letters_mask("A,K")},
+        {"id": 3, "mask": letters_mask("Q")},
+        {"id": 4, "mask": letters_mask("D")},
+        {"id": 5, "mask": letters_mask("D,A,K")},
+    ]
+
+    ranked = rank_programs(letters_mask("DAK"), programs)
+
+    assert [(p["id"], score) for p, score in ranked] == [(5, 3), (2, 2), (1, 1), (4, 1)]
+    assert [p["id"] for p, _ in rank_programs(letters_mask("DAK"), programs, limit=2)] == [5, 2]
+
+
+def test_cohort_statuses_resolve_each_program_once():
+    masks = {("Main", "BSIT"): letters_mask("A,B,P"), ("North", "BSIT"): letters_mask("C")}
+    lookups = []
+
+    def program_mask(campus, name):
+        lookups.append((campus, name))
+        return masks.get((campus, name), 0)
+
+    students = [
+        ("Main", "BSIT", "AGC", 86),
+        ("North", "BSIT", "AGC", 86),
+        ("Main", "BSIT", "QRG", 86),
+        ("Main", None, "", 0),
+        ("Main", None, "ABC", 86),
+    ]
+
+    assert cohort_match_statuses(students, program_mask) == [
+        MATCH, MATCH, NOT_MATCH, NOT_ANSWERED, NOT_MATCH
+    ]
+    assert lookups == [("Main", "BSIT"), ("North", "BSIT")]
@@ -0,0 +1,95 @@
+import io
+import os
+
+import pytest
+from flask import Flask
+
+from backend.utils import pdf_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def render_counter(payload=b"%PDF-1.7 test"):
+    calls = []
+
+    def render():
+        calls.append(1)
+        return io.BytesIO(payload)
+
+    return render, calls
+
+
+def test_key_depends_on_template_and_html():
+    key = pdf_cache.pdf_cache_key("a.html", "<p>x</p>")
+
+    assert key == pdf_cache.pdf_cache_key("a.html", "<p>x</p>")
+    assert key != pdf_cache.pdf_cache_key("b.html", "<p>x</p>")
+    assert key != pdf_cache.pdf_cache_key("a.html", "<p>y</p>")
+
+
+def test_store_and_get(cache_dir):
+    assert pdf_cache.get_cached_pdf("k1") is None
+
+    path = pdf_cache.store_pdf("k1", b"pdf")
+
+    assert pdf_cache.get_cached_pdf("k1") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"pdf"
+
+
+def test_eviction_drops_least_recently_used(cache_dir, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_MAX_MB", 2.5 / 1024)   # 2.5 KB
+    old = pdf_cache.store_pdf("old", b"x" * 1024)
+    os.utime(old, (1, 1))
+    pdf_cache.store_pdf("mid", b"x" * 1024)
+    pdf_cache.store_pdf("new", b"x" * 1024)
+
+    assert pdf_cache.get_cached_pdf("old") is None
+    assert pdf_cache.get_cached_pdf("mid") is not None
+    assert pdf_cache.get_cached_pdf("new") is not None
+
+
+def test_miss_renders_once_then_hits(cache_dir, app):
+    render, calls = render_counter()
+
+    with app.test_request_context("/"):
+        first = pdf_cache.send_cached_pdf("k", render, "r.pdf")
+        first.direct_passthrough = False
+        second = pdf_cache.send_cached_pdf("k", render, "r.pdf")
+        second.direct_passthrough = False
+
+    assert first.get_data() == second.get_data() == b"%PDF-1.7 test"
+    assert first.get_etag()[0] == second.get_etag()[0] == "k"
+    assert len(calls) == 1
+
+
+def test_matching_etag_gets_304(cache_dir, app):
+    render, calls = render_counter()
+
+    with app.test_request_context("/", headers={"If-None-Match": '"k"'}):
+        response = pdf_cache.send_cached_pdf("k", render, "r.pdf")
+
+    assert response.status_code == 304
+    assert calls == []
+
+
+def test_file_evicted_after_lookup_is_rendered_again(cache_dir, app, monkeypatch):
+    render, calls = render_counter()
+    monkeypatch.setattr(pdf_cache, "get_cached_pdf", lambda key: str(cache_dir / "gone.pdf"))
+
+    with app.test_request_context("/"):
+        response = pdf_cache.send_cached_pdf("k", render, "r.pdf")
+        response.direct_passthrough = False
+
+    assert response.status_code == 200
+    assert response.get_data() == b"%PDF-1.7 test"
+    assert len(calls) == 1
@@ -0,0 +1,73 @@
+import threading
+
+from backend.utils import rate_limit
+from backend.utils.rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+def test_calls_are_spaced_by_the_interval(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    limiter = RateLimiter(30)   # one every 2 seconds
+
+    limiter.acquire()
+    limiter.acquire()
+    limiter.acquire()
+
+    assert clock.sleeps == [2.0, 4.0]
+
+
+def test_idle_time_is_not_banked(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    limiter = RateLimiter(60)
+
+    limiter.acquire()
+    clock.now += 10
+    limiter.acquire()
+    limiter.acquire()
+
+    assert clock.sleeps == [1.0]
+
+
+def test_zero_rate_means_unlimited(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    limiter = RateLimiter(0)
+
+    for _ in range(5):
+        limiter.acquire()
+
+    assert clock.sleeps == []
+
+
+def test_threads_get_distinct_slots(monkeypatch):
+    clock = FakeClock()
+    lock = threading.Lock()
+
+    def sleep(seconds):
+        with lock:
+            clock.sleeps.append(seconds)
+
+    clock.sleep = sleep
+    monkeypatch.setattr(rate_limit, "time", clock)
+    limiter = RateLimiter(60)
+
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(clock.sleeps) == [1.0, 2.0, 3.0, 4.0]
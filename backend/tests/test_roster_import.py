@@ -0,0 +1,75 @@
+import pandas as pd
+
+from backend.utils.roster_import import (
+    ROSTER_COLUMNS,
+    SKIP_DUPLICATE,
+    SKIP_INVALID,
+    drop_duplicates,
+    normalize_roster,
+)
+
+
+class FakeCursor:
+    def __init__(self, existing):
+        self.existing = existing
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return self.existing
+
+
+def roster(*rows):
+    return pd.DataFrame(rows, columns=ROSTER_COLUMNS)
+
+
+def test_normalize_roster_trims_and_uppercases_names():
+    rows, skips = normalize_roster(roster(
+        [" EX1 ", " juan dela cruz ", " j@x.com ", "Male ", " 2025-2026"],
+    ))
+
+    assert rows == [(1, "EX1", "JUAN DELA CRUZ", "j@x.com", "Male", "2025-2026")]
+    assert skips == []
+
+
+def test_normalize_roster_flags_blank_fields_and_bad_school_year():
+    rows, skips = normalize_roster(roster(
+        ["EX1", "a", "a@x.com", "Male", "2025-2026"],
+        ["EX2", None, "b@x.com", "Male", "2025-2026"],
+        ["EX3", "c", "c@x.com", "Female", "2025"],
+        ["EX4", "d", "d@x.com", "Female", "2025-2026"],
+    ))
+
+    assert [r[0] for r in rows] == [1, 4]
+    assert skips == [(2, SKIP_INVALID), (3, SKIP_INVALID)]
+
+
+def test_normalize_roster_ignores_extra_columns():
+    df = roster(["EX1", "a", "a@x.com", "Male", "2025-2026"])
+    df["notes"] = "x"
+
+    rows, _ = normalize_roster(df)
+
+    assert rows == [(1, "EX1", "A", "a@x.com", "Male", "2025-2026")]
+
+
+def test_drop_duplicates_checks_database_and_earlier_rows():
+    rows = [
+        (1, "EX1", "A", "a@x.com", "Male", "2025-2026"),
+        (2, "EX2", "B", "taken@x.com", "Male", "2025-2026"),
+        (3, "EX1", "C", "c@x.com", "Male", "2025-2026"),
+        (4, "EX4", "D", "a@x.com", "Male", "2025-2026"),
+        (5, "OLD", "E", "e@x.com", "Male", "2025-2026"),
+        (6, "EX6", "F", "f@x.com", "Male", "2025-2026"),
+    ]
+    cur = FakeCursor([("OLD", "old@x.com"), ("EX9", "taken@x.com")])
+
+    keep, skips = drop_duplicates(cur, rows)
+
+    assert [r[0] for r in keep] == [1, 6]
+    assert skips == [(n, SKIP_DUPLICATE) for n in (2, 3, 4, 5)]
+
+
+def test_drop_duplicates_without_rows_skips_the_query():
+    assert drop_duplicates(None, []) == ([], [])
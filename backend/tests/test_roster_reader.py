@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+
+from backend.utils.roster_import import SKIP_INVALID, normalize_rows
+from backend.utils.roster_reader import (
+    RosterFormatError,
+    _cell_to_str,
+    estimate_roster_rows,
+    iter_roster_batches,
+)
+
+HEADER = "exam_id,fullname,email,gender,school_year\n"
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "roster.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, ""),
+    (2025.0, "2025"),
+    (12.5, "12.5"),
+    (7, "7"),
+    ("  text ", "  text "),
+    (datetime.datetime(2025, 6, 1), "2025-06-01 00:00:00"),
+])
+def test_cell_to_str_matches_pandas_strings(value, expected):
+    assert _cell_to_str(value) == expected
+
+
+def test_normalize_rows_matches_normalize_roster_rules():
+    rows, skips = normalize_rows([
+        (1, " EX1 ", " juan ", "j@x.com", "Male", "2025-2026 "),
+        (2, "EX2", "", "b@x.com", "Male", "2025-2026"),
+        (3, "EX3", "c", "c@x.com", "Male", "2025"),
+    ])
+
+    assert rows == [(1, "EX1", "JUAN", "j@x.com", "Male", "2025-2026")]
+    assert skips == [(2, SKIP_INVALID), (3, SKIP_INVALID)]
+
+
+def test_csv_batches_number_rows_and_drop_trailing_blanks(tmp_path):
+    path = write_csv(tmp_path, HEADER + (
+        "EX1,a,a@x.com,Male,2025-2026\n"
+        ",,,,\n"
+        "EX3,c,c@x.com,Female\n"
+        ",,,,\n"
+        ",,,,\n"
+    ))
+
+    batches = list(iter_roster_batches(path, batch_size=2))
+
+    assert batches == [
+        [(1, "EX1", "a", "a@x.com", "Male", "2025-2026"), (2, "", "", "", "", "")],
+        [(3, "EX3", "c", "c@x.com", "Female", "")],
+    ]
+
+
+def test_wrong_header_is_rejected_before_rows(tmp_path):
+    path = write_csv(tmp_path, "exam_id,name\nEX1,a\n")
+
+    with pytest.raises(RosterFormatError):
+        list(iter_roster_batches(path))
+
+
+def test_estimate_csv_rows(tmp_path):
+    path = write_csv(tmp_path, HEADER + "EX1,a,a@x.com,Male,2025-2026\nEX2,b,b@x.com,Male,2025-2026\n")
+
+    assert estimate_roster_rows(path) == 2
+
+
+def test_xlsx_rows_are_streamed_as_strings(tmp_path):
+    from openpyxl import Workbook
+
+    path = str(tmp_path / "roster.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["exam_id", "fullname", "email", "gender", "school_year"])
+    ws.append([20250001, "a", "a@x.com", "Male", "2025-2026"])
+    ws.append([None, None, None, None, None])
+    wb.save(path)
+
+    assert list(iter_roster_batches(path)) == [
+        [(1, "20250001", "a", "a@x.com", "Male", "2025-2026")],
+    ]
@@ -0,0 +1,63 @@
+import pytest
+
+from backend.utils import section_rewrites
+from backend.utils.section_rewrites import explanation_hash, get_cached_rewrite
+
+
+class FakeCursor:
+    def __init__(self, column_exists):
+        self.column_exists = column_exists
+        self.queries = 0
+
+    def execute(self, sql, params=None):
+        self.queries += 1
+
+    def fetchone(self):
+        return (1,) if self.column_exists else None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def unchecked(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(section_rewrites, "time", clock)
+    monkeypatch.setattr(section_rewrites, "_available", False)
+    monkeypatch.setattr(section_rewrites, "_checked_at", None)
+    return clock
+
+
+def test_cached_rewrite_is_tied_to_the_explanation():
+    stored = {"hash": explanation_hash("text v1"), "sections": {"Strengths": "short"}}
+
+    assert get_cached_rewrite(stored, "text v1", "Strengths") == "short"
+    assert get_cached_rewrite(stored, "text v1", "Weaknesses") is None
+    assert get_cached_rewrite(stored, "text v2", "Strengths") is None
+    assert get_cached_rewrite(None, "text v1", "Strengths") is None
+
+
+def test_present_column_is_remembered(unchecked):
+    cur = FakeCursor(column_exists=True)
+
+    assert section_rewrites.section_rewrites_available(cur)
+    assert section_rewrites.section_rewrites_available(cur)
+    assert cur.queries == 1
+
+
+def test_missing_column_is_rechecked_after_the_interval(unchecked):
+    cur = FakeCursor(column_exists=False)
+
+    assert not section_rewrites.section_rewrites_available(cur)
+    assert not section_rewrites.section_rewrites_available(cur)
+    assert cur.queries == 1
+
+    cur.column_exists = True
+    unchecked.now += section_rewrites.SECTION_REWRITES_RECHECK + 1
+    assert section_rewrites.section_rewrites_available(cur)
+    assert cur.queries == 2
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+from ..db import get_db_connection
+
+# Every admin write (login, add, edit, delete, profile and email changes)
+# calls invalidate_admin() in the worker that made it. Other gunicorn
+# workers keep their cached copy for up to this many seconds, so a deleted
+# or demoted admin can stay authorized there for that long. Lower it to
+# shrink the window at the cost of one more query per request.
+ADMIN_IDENTITY_TTL = float(os.getenv("ADMIN_IDENTITY_TTL", "30"))
+
+
+class AdminIdentity(namedtuple(
+    "AdminIdentity",
+    ["id", "username", "fullname", "email", "campus", "is_super_admin"]
+)):
+    __slots__ = ()
+
+    @property
+    def campus_or_all(self):
+        """A super admin's campus, or "ALL" when they aren't tied to one."""
+        if self.is_super_admin:
+            return self.campus or "ALL"
+        return self.campus
+
+
+_cache = {}     # username -> (AdminIdentity, loaded_at)
+_lock = threading.Lock()
+
+
+def _load_admin(username):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    # Super admins win if the same username is in both tables, like the
+    # handlers that checked super_admin first.
+    cur.execute("""
+        SELECT id, username, fullname, email, campus, TRUE AS is_super_admin
+        FROM super_admin
+        WHERE username = %s
+        UNION ALL
+        SELECT id, username, fullname, email, campus, FALSE AS is_super_admin
+        FROM admin
+        WHERE username = %s
+        ORDER BY is_super_admin DESC
+        LIMIT 1
+    """, (username, username))
+    row = cur.fetchone()
+    cur.close()
+    conn.close()
+
+    return AdminIdentity(*row) if row else None
+
+
+def get_admin(username):
+    """
+    The super_admin/admin row for `username` as an AdminIdentity, or None if
+    it is in neither table. Found rows are cached for ADMIN_IDENTITY_TTL;
+    misses are not, so a newly added admin can log in right away.
+    """
+    if not username:
+        return None
+
+    cached = _cache.get(username)
+    if cached and time.monotonic() - cached[1] <= ADMIN_IDENTITY_TTL:
+        return cached[0]
+
+    admin = _load_admin(username)
+
+    with _lock:
+        if admin:
+            _cache[username] = (admin, time.monotonic())
+        else:
+            _cache.pop(username, None)
+    return admin
+
+
+def invalidate_admin(username=None):
+    """Drop one cached identity, or all of them."""
+    with _lock:
+        if username is None:
+            _cache.clear()
+        else:
+            _cache.pop(username, None)
+
@@ -0,0 +1,169 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from .letter_scores import LETTERS
+from .schema import ensure_schema
+
+# Bump whenever the explanation prompt, model or sampling settings change so
+# old text is not served for the new prompt.
+PROMPT_VERSION = "1"
+
+# Sent to the model in place of the student's name and swapped for the real
+# name when the text is shown, so one generation serves every student.
+NAME_PLACEHOLDER = "[STUDENT_NAME]"
+
+AI_EXPLANATION_LRU_SIZE = int(os.getenv("AI_EXPLANATION_LRU_SIZE", "2048"))
+
+AI_EXPLANATION_CACHE_DDL = """
+    CREATE TABLE IF NOT EXISTS ai_explanation_cache (
+        letters VARCHAR(3) NOT NULL,
+        program_key TEXT NOT NULL,
+        prompt_version TEXT NOT NULL,
+        program_name TEXT NOT NULL,
+        explanation TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (letters, program_key, prompt_version)
+    );
+"""
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+_stats = {"lru_hits": 0, "db_hits": 0, "misses": 0, "uncacheable": 0}
+
+
+def ensure_ai_explanation_cache_table():
+    ensure_schema("ai_explanation_cache", AI_EXPLANATION_CACHE_DDL)
+
+
+def _count(key):
+    # Request threads share the counters; same lock as the LRU.
+    with _lru_lock:
+        _stats[key] += 1
+
+
+def normalize_letters(top_letters):
+    """
+    Ordered top-3 letters as a string like "DAK", or None if they are not
+    three distinct survey letters (those requests skip the cache).
+    """
+    if isinstance(top_letters, str):
+        top_letters = re.findall(r"[A-Za-z]", top_letters)
+
+    letters = [str(l).strip().upper() for l in top_letters or [] if str(l).strip()]
+    if len(letters) != 3 or len(set(letters)) != 3 or any(l not in LETTERS for l in letters):
+        return None
+    return "".join(letters)
+
+
+def normalize_program(preferred_program):
+    return " ".join((preferred_program or "").split()).lower()
+
+
+def cache_key(top_letters, preferred_program):
+    letters = normalize_letters(top_letters)
+    program_key = normalize_program(preferred_program)
+    if not letters or not program_key:
+        return None
+    return (letters, program_key, PROMPT_VERSION)
+
+
+def render_explanation(text, fullname):
+    return text.replace(NAME_PLACEHOLDER, fullname or "Student")
+
+
+def _lru_get(key):
+    with _lru_lock:
+        text = _lru.get(key)
+        if text is not None:
+            _lru.move_to_end(key)
+        return text
+
+
+def _lru_put(key, text):
+    with _lru_lock:
+        _lru[key] = text
+        _lru.move_to_end(key)
+        while len(_lru) > AI_EXPLANATION_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _db_get(cur, key):
+    cur.execute("""
+        SELECT explanation
+        FROM ai_explanation_cache
+        WHERE letters = %s AND program_key = %s AND prompt_version = %s
+    """, key)
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _db_put(cur, key, program_name, text):
+    # Another worker may have generated the same combination meanwhile;
+    # the first one stored wins so every student sees the same text.
+    cur.execute("""
+        INSERT INTO ai_explanation_cache
+            (letters, program_key, prompt_version, program_name, explanation)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (letters, program_key, prompt_version) DO NOTHING
+        RETURNING explanation
+    """, (*key, program_name, text))
+    if cur.fetchone():
+        return text
+    return _db_get(cur, key) or text
+
+
+def get_template(cur, top_letters, preferred_program, generate):
+    """
+    Explanation text for a letter combination and program, still holding
+    NAME_PLACEHOLDER. Looks in the process LRU, then ai_explanation_cache,
+    and only calls generate(letters, program, NAME_PLACEHOLDER) on a miss.
+    Returns (text, source) with source "lru", "db" or "generated".
+    """
+    key = cache_key(top_letters, preferred_program)
+    if key is None:
+        _count("uncacheable")
+        return None, None
+
+    text = _lru_get(key)
+    if text is not None:
+        _count("lru_hits")
+        return text, "lru"
+
+    ensure_ai_explanation_cache_table()
+
+    text = _db_get(cur, key)
+    if text is not None:
+        _count("db_hits")
+        _lru_put(key, text)
+        return text, "db"
+
+    _count("misses")
+    program_name = " ".join(preferred_program.split())
+    text = generate(list(key[0]), program_name, NAME_PLACEHOLDER)
+    text = _db_put(cur, key, program_name, text)
+    _lru_put(key, text)
+    return text, "generated"
+
+
+def cached_ai_explanation(cur, top_letters, preferred_program, fullname, generate):
+    """
+    generate(top_letters, preferred_program, fullname) answered from the
+    cache, with the student's name filled in. Inputs that can't be keyed
+    (missing letters or program) go straight to generate().
+    """
+    text, _ = get_template(cur, top_letters, preferred_program, generate)
+    if text is None:
+        return generate(top_letters, preferred_program, fullname)
+    return render_explanation(text, fullname)
+
+
+def get_ai_explanation_cache_stats():
+    with _lru_lock:
+        stats = dict(_stats)
+        stats["lru_size"] = len(_lru)
+    lookups = stats["lru_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["lru_hits"] + stats["db_hits"]) / lookups, 4) if lookups else None
+    stats["prompt_version"] = PROMPT_VERSION
+    return stats
@@ -0,0 +1,125 @@
+from .letter_scores import LETTERS, _row_values, get_letter_scores
+from .schema import ensure_schema
+
+# One row per (campus, school_year, gender, preferred_program) with the
+# number of respondents and their summed A-R letter counts. Gender is stored
+# lower-cased and missing values as '' so every key column is NOT NULL.
+ANALYTICS_CUBE_DDL = """
+    CREATE TABLE IF NOT EXISTS survey_analytics_cube (
+        campus TEXT NOT NULL DEFAULT '',
+        school_year TEXT NOT NULL DEFAULT '',
+        gender TEXT NOT NULL DEFAULT '',
+        preferred_program TEXT NOT NULL DEFAULT 'Unknown',
+        respondents INTEGER NOT NULL DEFAULT 0,
+        letter_counts INTEGER[] NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (campus, school_year, gender, preferred_program)
+    );
+"""
+
+# Key of the cube cell a student currently lands in, taken from their
+# latest survey row.
+CELL_SQL = """
+    SELECT COALESCE(s.campus, ''),
+           COALESCE(s.school_year::text, ''),
+           LOWER(COALESCE(s.gender, '')),
+           COALESCE(sa.preferred_program, 'Unknown')
+    FROM student s
+    JOIN student_survey_answer sa ON sa.student_id = s.id
+    WHERE s.id = %s
+    ORDER BY sa.id DESC
+    LIMIT 1
+"""
+
+DELTA_SQL = """
+    INSERT INTO survey_analytics_cube AS cube
+        (campus, school_year, gender, preferred_program, respondents, letter_counts, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, NOW())
+    ON CONFLICT (campus, school_year, gender, preferred_program) DO UPDATE SET
+        respondents = cube.respondents + EXCLUDED.respondents,
+        letter_counts = (
+            SELECT array_agg(COALESCE(old, 0) + COALESCE(delta, 0) ORDER BY slot)
+            FROM unnest(cube.letter_counts, EXCLUDED.letter_counts)
+                 WITH ORDINALITY AS u(old, delta, slot)
+        ),
+        updated_at = NOW()
+"""
+
+REBUILD_SQL = """
+    WITH contrib AS (
+        SELECT DISTINCT ON (s.id)
+               COALESCE(s.campus, '') AS campus,
+               COALESCE(s.school_year::text, '') AS school_year,
+               LOWER(COALESCE(s.gender, '')) AS gender,
+               COALESCE(sa.preferred_program, 'Unknown') AS preferred_program,
+               COALESCE(ls.letter_counts, array_fill(0::smallint, ARRAY[18])) AS letter_counts
+        FROM student s
+        JOIN student_survey_answer sa ON sa.student_id = s.id
+        LEFT JOIN student_letter_scores ls ON ls.student_id = s.id
+        ORDER BY s.id, sa.id DESC
+    ),
+    heads AS (
+        SELECT campus, school_year, gender, preferred_program, COUNT(*) AS respondents
+        FROM contrib
+        GROUP BY campus, school_year, gender, preferred_program
+    ),
+    slots AS (
+        SELECT campus, school_year, gender, preferred_program, t.slot, SUM(t.cnt) AS total
+        FROM contrib
+        CROSS JOIN LATERAL unnest(letter_counts) WITH ORDINALITY AS t(cnt, slot)
+        GROUP BY campus, school_year, gender, preferred_program, t.slot
+    ),
+    vectors AS (
+        SELECT campus, school_year, gender, preferred_program,
+               array_agg(total::int ORDER BY slot) AS letter_counts
+        FROM slots
+        GROUP BY campus, school_year, gender, preferred_program
+    )
+    INSERT INTO survey_analytics_cube
+        (campus, school_year, gender, preferred_program, respondents, letter_counts)
+    SELECT h.campus, h.school_year, h.gender, h.preferred_program, h.respondents, v.letter_counts
+    FROM heads h
+    JOIN vectors v USING (campus, school_year, gender, preferred_program)
+"""
+
+
+def ensure_analytics_cube_table():
+    ensure_schema("survey_analytics_cube", ANALYTICS_CUBE_DDL)
+
+
+def apply_cube_delta(cur, student_id, sign):
+    """
+    Add (sign=1) or remove (sign=-1) one student's survey from the cube.
+    Call with -1 before changing anything the cell key or letter counts
+    depend on, and with 1 afterwards, inside the same transaction.
+    """
+    ensure_analytics_cube_table()
+
+    cur.execute(CELL_SQL, (student_id,))
+    cell = cur.fetchone()
+    if not cell:
+        return
+
+    scores = get_letter_scores(cur, student_id)
+    counts = scores["letter_counts"] if scores else [0] * len(LETTERS)
+
+    cur.execute(DELTA_SQL, (
+        *_row_values(cell),
+        sign,
+        [sign * c for c in counts]
+    ))
+
+    if sign < 0:
+        cur.execute("""
+            DELETE FROM survey_analytics_cube
+            WHERE campus = %s AND school_year = %s AND gender = %s
+            AND preferred_program = %s AND respondents <= 0
+        """, tuple(_row_values(cell)))
+
+
+def rebuild_cube(cur):
+    ensure_analytics_cube_table()
+
+    cur.execute("TRUNCATE survey_analytics_cube")
+    cur.execute(REBUILD_SQL)
+    return cur.rowcount
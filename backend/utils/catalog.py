@@ -0,0 +1,273 @@
+import logging
+import os
+import threading
+import time
+
+import psycopg2
+from flask import g, has_app_context
+from psycopg2.extras import RealDictCursor
+
+from ..db import get_db_connection
+from .matching import letters_mask
+from .schema import ensure_schema
+
+logger = logging.getLogger(__name__)
+
+# Workers poll the catalog_version row at most this often; a write made
+# through another worker shows up here within this many seconds.
+CATALOG_VERSION_CHECK = float(os.getenv("CATALOG_VERSION_CHECK", "5"))
+# Reload anyway after this long, for edits made outside the app.
+CATALOG_MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", "600"))
+
+# Single row bumped by every campus/program write.
+CATALOG_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS catalog_version (
+        id INT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+
+    INSERT INTO catalog_version (id, version) VALUES (1, 0)
+    ON CONFLICT (id) DO NOTHING;
+"""
+
+_catalog = None
+_loaded_at = 0.0
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def normalize(value):
+    # Same as LOWER(TRIM(...)) in SQL (the respondents filter still matches
+    # there), so both sides agree on which names are the same program.
+    return (value or "").strip(" ").lower()
+
+
+def parse_letters(category_letter):
+    if not category_letter:
+        return []
+    return [l.strip().upper() for l in category_letter.split(",") if l.strip()]
+
+
+def ensure_catalog_version_table():
+    ensure_schema("catalog_version", CATALOG_VERSION_DDL)
+
+
+class Catalog:
+    """
+    Immutable snapshot of the campus and program tables. Lookups take the
+    raw names from forms/rows and compare them case-insensitively with
+    surrounding spaces trimmed, like the LOWER(TRIM(...)) queries.
+    """
+
+    def __init__(self, version, campuses, programs):
+        self.version = version
+        self.campuses = campuses        # ordered by campus_name
+        self.programs = programs        # ordered by id
+
+        self._campus_by_key = {}
+        for c in campuses:
+            self._campus_by_key.setdefault(normalize(c["campus_name"]), c)
+
+        self._program_by_key = {}
+        self._program_by_name = {}
+        self._programs_by_campus = {}
+        for p in programs:
+            # First row by id, the one "... LIMIT 1" would normally return.
+            self._program_by_key.setdefault((normalize(p["campus"]), normalize(p["program_name"])), p)
+            self._program_by_name.setdefault(normalize(p["program_name"]), p)
+            self._programs_by_campus.setdefault(normalize(p["campus"]), []).append(p)
+
+        for rows in self._programs_by_campus.values():
+            rows.sort(key=lambda p: p["program_name"] or "")
+
+        self._program_names = sorted({p["program_name"] for p in programs if p["program_name"]})
+
+    # ===== CAMPUSES =====
+
+    def campus(self, name):
+        return self._campus_by_key.get(normalize(name))
+
+    def campus_names(self):
+        return [c["campus_name"] for c in self.campuses]
+
+    def campus_addresses(self):
+        return {c["campus_name"]: c["campus_address"] for c in self.campuses}
+
+    def campus_header(self, name):
+        """(campus_name, campus_address) for the page header, falling back to the raw name."""
+        c = self.campus(name)
+        return (c["campus_name"], c["campus_address"]) if c else (name, "")
+
+    # ===== PROGRAMS =====
+
+    def program(self, campus, program_name):
+        return self._program_by_key.get((normalize(campus), normalize(program_name)))
+
+    def program_letters(self, campus, program_name):
+        p = self.program(campus, program_name)
+        return p["letters"] if p else []
+
+    def program_letters_by_name(self, program_name):
+        """Letters of the first program with this name on any campus."""
+        p = self._program_by_name.get(normalize(program_name))
+        return p["letters"] if p else []
+
+    def program_mask(self, campus, program_name):
+        """Letter mask (see utils/matching.py) of a campus's program, 0 if unknown."""
+        p = self.program(campus, program_name)
+        return p["mask"] if p else 0
+
+    def campus_programs(self, campus, active_only=False):
+        """Programs offered at a campus, ordered by name."""
+        rows = self._programs_by_campus.get(normalize(campus), [])
+        if active_only:
+            rows = [p for p in rows if p["is_active"]]
+        return rows
+
+    def program_names(self, campus=None):
+        """Distinct program names, on one campus or everywhere, sorted."""
+        if campus is None:
+            return self._program_names
+        return sorted({p["program_name"] for p in self.campus_programs(campus) if p["program_name"]})
+
+    def predicted_programs(self, campus, top_letters, limit=5):
+        """
+        Up to `limit` (program_name, category_letter) pairs that share a
+        letter with top_letters, one per name, alphabetical. campus=None
+        searches every campus.
+        """
+        rows = self.programs if campus is None else self.campus_programs(campus)
+        wanted = letters_mask(top_letters)
+
+        found = {}
+        for p in rows:
+            name = p["program_name"]
+            if name and name not in found and wanted & p["mask"]:
+                found[name] = p["category_letter"]
+        return sorted(found.items())[:limit]
+
+
+def _read_version(cur):
+    cur.execute("SELECT version FROM catalog_version WHERE id = 1")
+    row = cur.fetchone()
+    return row["version"] if row else 0
+
+
+def _load_catalog():
+    ensure_catalog_version_table()
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    # Read the version first: a write racing this load bumps it again and
+    # the next check reloads.
+    version = _read_version(cur)
+    cur.execute("SELECT * FROM campus ORDER BY campus_name ASC")
+    campuses = [dict(r) for r in cur.fetchall()]
+    cur.execute("""
+        SELECT id, program_name, campus, category_letter, color, is_active
+        FROM program
+        ORDER BY id
+    """)
+    programs = []
+    for r in cur.fetchall():
+        p = dict(r)
+        p["letters"] = parse_letters(p["category_letter"])
+        p["mask"] = letters_mask(p["letters"])
+        programs.append(p)
+    cur.close()
+    conn.close()
+
+    return Catalog(version, campuses, programs)
+
+
+def _current_version():
+    ensure_catalog_version_table()
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        return _read_version(cur)
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_catalog():
+    """
+    The process-wide Catalog. Loaded once (in the gunicorn master when
+    preloading, see warmup.py) and reloaded only when the catalog_version
+    row moves, checked at most every CATALOG_VERSION_CHECK seconds. A
+    request keeps the snapshot it started with.
+    """
+    global _catalog, _loaded_at, _checked_at
+
+    if has_app_context() and "catalog" in g:
+        return g.catalog
+
+    with _lock:
+        now = time.monotonic()
+        if _catalog is None or now - _loaded_at > CATALOG_MAX_AGE:
+            _catalog = _load_catalog()
+            _loaded_at = _checked_at = now
+        elif now - _checked_at > CATALOG_VERSION_CHECK:
+            try:
+                if _current_version() != _catalog.version:
+                    _catalog = _load_catalog()
+                    _loaded_at = now
+            except psycopg2.Error as e:
+                logger.warning(f"Catalog version check failed, keeping version {_catalog.version}: {e}")
+            _checked_at = now
+        catalog = _catalog
+
+    if has_app_context():
+        g.catalog = catalog
+    return catalog
+
+
+def bump_catalog_version(cur):
+    """
+    Call in the same transaction as any campus/program write, then
+    invalidate_catalog() after the commit. Other workers reload on their
+    next version check.
+    """
+    ensure_catalog_version_table()
+    cur.execute("""
+        UPDATE catalog_version
+        SET version = version + 1, updated_at = NOW()
+        WHERE id = 1
+    """)
+
+
+def invalidate_catalog():
+    global _catalog
+
+    with _lock:
+        _catalog = None
+
+    if has_app_context():
+        g.pop("catalog", None)
+
+
+# Shorthands for the common lookups.
+
+def get_campuses():
+    return get_catalog().campuses
+
+
+def campus_names():
+    return get_catalog().campus_names()
+
+
+def campus_addresses():
+    return get_catalog().campus_addresses()
+
+
+def campus_header(name):
+    return get_catalog().campus_header(name)
+
+
+def get_program_mask(campus, program_name):
+    if not program_name:
+        return 0
+    return get_catalog().program_mask(campus, program_name)
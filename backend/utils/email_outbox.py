@@ -0,0 +1,397 @@
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+
+from ..db import get_db_connection
+from .schema import ensure_schema
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# OUTBOX SETTINGS
+# =========================
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+# Retry n waits EMAIL_RETRY_BASE_SECONDS * 2^(n-1), capped at EMAIL_RETRY_MAX_SECONDS.
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "10"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "900"))
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "5"))
+# A message claimed by a worker that died is picked up again after this long.
+# The sender refreshes locked_at on the rest of its batch before every send,
+# so this only has to outlast one send (SMTP reconnect + retry, or the 15s
+# SendGrid timeout), not a whole batch.
+EMAIL_STALE_SECONDS = int(os.getenv("EMAIL_STALE_SECONDS", "120"))
+
+EMAIL_SMTP_HOST = os.getenv("EMAIL_SMTP_HOST", "smtp.gmail.com")
+EMAIL_SMTP_PORT = int(os.getenv("EMAIL_SMTP_PORT", "465"))
+# Close the kept-alive SMTP session after this long without mail.
+EMAIL_SMTP_IDLE_SECONDS = float(os.getenv("EMAIL_SMTP_IDLE_SECONDS", "60"))
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+SENDGRID_FROM = "aspirematch2@gmail.com"
+
+EMAIL_OUTBOX_DDL = """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id BIGSERIAL PRIMARY KEY,
+        transport TEXT NOT NULL,
+        to_email TEXT NOT NULL,
+        from_email TEXT,
+        subject TEXT NOT NULL,
+        body TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        locked_at TIMESTAMP,
+        last_error TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        sent_at TIMESTAMP
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+        ON email_outbox (status, next_attempt_at);
+
+    CREATE TABLE IF NOT EXISTS email_dead_letter (
+        id BIGSERIAL PRIMARY KEY,
+        outbox_id BIGINT,
+        transport TEXT NOT NULL,
+        to_email TEXT NOT NULL,
+        from_email TEXT,
+        subject TEXT NOT NULL,
+        body TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        last_error TEXT,
+        created_at TIMESTAMP NOT NULL,
+        failed_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+"""
+
+_wakeup = threading.Event()
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"enqueued": 0, "sent": 0, "retried": 0, "dead": 0}
+_latencies = deque(maxlen=500)
+
+
+def ensure_email_outbox_tables():
+    ensure_schema("email_outbox", EMAIL_OUTBOX_DDL)
+
+
+def _count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+# =========================
+# ENQUEUE
+# =========================
+def enqueue_email(to_email, subject, body, transport="smtp", from_email=None):
+    """
+    Queue one plain-text email and return right away. transport is "smtp"
+    (EMAIL_USER/EMAIL_PASS account) or "sendgrid". Returns False only if
+    the message could not be stored.
+    """
+    ensure_email_outbox_tables()
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            INSERT INTO email_outbox (transport, to_email, from_email, subject, body)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (transport, to_email, from_email, subject, body))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Could not queue email to {to_email}: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+    _count("enqueued")
+    start_email_worker()
+    _wakeup.set()
+    return True
+
+
+# =========================
+# TRANSPORTS
+# =========================
+class SmtpSender:
+    """One authenticated SMTP_SSL session, reused across messages."""
+
+    def __init__(self):
+        self.server = None
+        self.last_used = 0.0
+
+    def _connect(self):
+        user = os.getenv("EMAIL_USER")
+        password = os.getenv("EMAIL_PASS")
+        if not user or not password:
+            raise RuntimeError("Email credentials not configured")
+
+        server = smtplib.SMTP_SSL(EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, timeout=10)
+        server.login(user, password)
+        self.server = server
+
+    def send(self, message):
+        user = os.getenv("EMAIL_USER")
+
+        msg = EmailMessage()
+        msg["Subject"] = message["subject"]
+        msg["From"] = message["from_email"] or user
+        msg["To"] = message["to_email"]
+        msg.set_content(message["body"])
+
+        if self.server is None:
+            self._connect()
+
+        try:
+            self.server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Gmail drops idle sessions; reconnect once and retry.
+            self.close()
+            self._connect()
+            self.server.send_message(msg)
+
+        self.last_used = time.monotonic()
+
+    def close_if_idle(self):
+        if self.server is not None and time.monotonic() - self.last_used > EMAIL_SMTP_IDLE_SECONDS:
+            self.close()
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            pass
+        self.server = None
+
+
+class SendGridSender:
+    """SendGrid over one keep-alive HTTP session."""
+
+    def __init__(self):
+        import requests
+
+        self.session = requests.Session()
+
+    def send(self, message):
+        api_key = os.getenv("SENDGRID_API_KEY")
+        if not api_key:
+            raise RuntimeError("SENDGRID_API_KEY not set")
+
+        response = self.session.post(
+            SENDGRID_URL,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "personalizations": [
+                    {"to": [{"email": message["to_email"]}], "subject": message["subject"]}
+                ],
+                "from": {"email": message["from_email"] or SENDGRID_FROM},
+                "content": [{"type": "text/plain", "value": message["body"]}]
+            },
+            timeout=15
+        )
+
+        if response.status_code != 202:
+            raise RuntimeError(f"SendGrid error {response.status_code}: {response.text[:200]}")
+
+    def close_if_idle(self):
+        pass
+
+    def close(self):
+        self.session.close()
+
+
+# =========================
+# WORKER
+# =========================
+def start_email_worker():
+    global _worker, _worker_pid
+
+    with _worker_lock:
+        # Threads don't survive a fork, so each gunicorn worker starts its own.
+        if _worker is not None and _worker.is_alive() and _worker_pid == os.getpid():
+            return
+        _worker = threading.Thread(target=_run_worker, name="email-outbox", daemon=True)
+        _worker_pid = os.getpid()
+        _worker.start()
+
+
+def _claim_batch(cur):
+    # SKIP LOCKED lets every gunicorn worker's sender share the table.
+    cur.execute("""
+        UPDATE email_outbox
+        SET status = 'sending', locked_at = NOW(), attempts = attempts + 1
+        WHERE id IN (
+            SELECT id
+            FROM email_outbox
+            WHERE (status = 'queued' AND next_attempt_at <= NOW())
+            OR (status = 'sending' AND locked_at < NOW() - make_interval(secs => %s))
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, transport, to_email, from_email, subject, body, attempts
+    """, (EMAIL_STALE_SECONDS, EMAIL_BATCH_SIZE))
+
+    columns = ["id", "transport", "to_email", "from_email", "subject", "body", "attempts"]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def _refresh_claim(cur, ids):
+    # Heartbeat for messages still waiting in this worker's batch, so a slow
+    # batch isn't mistaken for a dead worker and sent twice.
+    cur.execute("""
+        UPDATE email_outbox
+        SET locked_at = NOW()
+        WHERE id = ANY(%s)
+        AND status = 'sending'
+    """, (ids,))
+
+
+def _mark_sent(cur, message):
+    cur.execute("""
+        UPDATE email_outbox
+        SET status = 'sent', sent_at = NOW(), locked_at = NULL, last_error = NULL
+        WHERE id = %s
+    """, (message["id"],))
+
+
+def _mark_failed(cur, message, error):
+    error = str(error)[:500]
+
+    if message["attempts"] >= EMAIL_MAX_ATTEMPTS:
+        cur.execute("""
+            INSERT INTO email_dead_letter
+                (outbox_id, transport, to_email, from_email, subject, body, attempts, last_error, created_at)
+            SELECT id, transport, to_email, from_email, subject, body, attempts, %s, created_at
+            FROM email_outbox
+            WHERE id = %s
+        """, (error, message["id"]))
+        cur.execute("""
+            UPDATE email_outbox
+            SET status = 'dead', locked_at = NULL, last_error = %s
+            WHERE id = %s
+        """, (error, message["id"]))
+        _count("dead")
+        logger.error(f"❌ Email {message['id']} to {message['to_email']} dead-lettered: {error}")
+        return
+
+    delay = min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * 2 ** (message["attempts"] - 1))
+    cur.execute("""
+        UPDATE email_outbox
+        SET status = 'queued', locked_at = NULL, last_error = %s,
+            next_attempt_at = NOW() + make_interval(secs => %s)
+        WHERE id = %s
+    """, (error, delay, message["id"]))
+    _count("retried")
+    logger.warning(f"Email {message['id']} failed (attempt {message['attempts']}), retrying in {delay:.0f}s: {error}")
+
+
+def _run_worker():
+    ensure_email_outbox_tables()
+    senders = {"smtp": SmtpSender(), "sendgrid": SendGridSender()}
+
+    while True:
+        sent_any = False
+
+        try:
+            conn = get_db_connection()
+            cur = conn.cursor()
+            try:
+                batch = _claim_batch(cur)
+                conn.commit()
+
+                for i, message in enumerate(batch):
+                    if i:
+                        _refresh_claim(cur, [m["id"] for m in batch[i:]])
+                        conn.commit()
+
+                    sender = senders.get(message["transport"])
+                    started = time.perf_counter()
+                    try:
+                        if sender is None:
+                            raise RuntimeError(f"Unknown transport {message['transport']}")
+                        sender.send(message)
+                    except Exception as e:
+                        _mark_failed(cur, message, e)
+                    else:
+                        _mark_sent(cur, message)
+                        _count("sent")
+                        with _stats_lock:
+                            _latencies.append(time.perf_counter() - started)
+                    conn.commit()
+
+                sent_any = bool(batch)
+            finally:
+                cur.close()
+                conn.close()
+
+        except Exception as e:
+            logger.error(f"❌ Email outbox worker error: {e}")
+
+        for sender in senders.values():
+            sender.close_if_idle()
+
+        # A full batch probably means more is waiting; otherwise sleep until
+        # the next enqueue or poll (retries become due on their own).
+        if not sent_any:
+            _wakeup.wait(EMAIL_POLL_SECONDS)
+            _wakeup.clear()
+
+
+# =========================
+# METRICS
+# =========================
+def get_email_outbox_stats():
+    # Also drains anything a previous process left queued.
+    start_email_worker()
+
+    with _stats_lock:
+        stats = dict(_stats)
+        latencies = sorted(_latencies)
+
+    if latencies:
+        stats["send_latency_ms"] = {
+            "avg": round(1000 * sum(latencies) / len(latencies)),
+            "p50": round(1000 * latencies[len(latencies) // 2]),
+            "p95": round(1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]),
+            "max": round(1000 * latencies[-1]),
+        }
+    else:
+        stats["send_latency_ms"] = None
+
+    ensure_email_outbox_tables()
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT status, COUNT(*), EXTRACT(EPOCH FROM NOW() - MIN(created_at))
+        FROM email_outbox
+        WHERE status IN ('queued', 'sending', 'dead')
+        GROUP BY status
+    """)
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    depth = {status: count for status, count, _ in rows}
+    stats["queue_depth"] = depth.get("queued", 0) + depth.get("sending", 0)
+    stats["in_flight"] = depth.get("sending", 0)
+    stats["dead_letters"] = depth.get("dead", 0)
+    oldest = [age for status, _, age in rows if status == "queued"]
+    stats["oldest_queued_seconds"] = round(float(oldest[0])) if oldest and oldest[0] is not None else None
+    return stats
@@ -1,25 +1,32 @@
+import logging
+import os
 import random
-import smtplib
-from email.message import EmailMessage
+
+from .email_outbox import enqueue_email
+
+logger = logging.getLogger(__name__)
 
 def generate_code():
     return str(random.randint(100000, 999999))
 
 def send_verification_code(email, code):
-    msg = EmailMessage()
-    msg['Subject'] = 'Your AspireMatch Verification Code'
-    msg['From'] = 'AspireMatch <hertzkin@gmail.com>'
-    msg['To'] = email
-    msg.set_content(f'''
+    user = os.getenv("EMAIL_USER")
+    if not user or not os.getenv("EMAIL_PASS"):
+        logger.error("Email credentials not configured")
+        return False
+
+    # Queued; the outbox worker sends it over its kept-alive SMTP session.
+    return enqueue_email(
+        email,
+        'Your AspireMatch Verification Code',
+        f'''
 Your verification code is:
 
 {code}
 
 This code will expire in 5 minutes.
 If you did not request this, ignore this email.
-''')
-
-    with smtplib.SMTP('smtp.gmail.com', 587) as server:
-        server.starttls()
-        server.login('hertzkin@gmail.com', 'jvyc dzlf ihvf moqo')
-        server.send_message(msg)
+''',
+        transport="smtp",
+        from_email=f'AspireMatch <{user}>'
+    )
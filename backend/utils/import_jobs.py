@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+
+from psycopg2.extras import Json
+
+from ..db import get_db_connection
+from .roster_import import SKIP_DUPLICATE, drop_duplicates, insert_roster, normalize_rows
+from .roster_reader import RosterFormatError, estimate_roster_rows, iter_roster_batches
+from .schema import ensure_schema
+
+logger = logging.getLogger(__name__)
+
+IMPORT_UPLOAD_DIR = os.getenv(
+    "IMPORT_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "aspirematch_imports")
+)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+# A running job whose worker has not checked in for this long is resumed.
+IMPORT_STALE_SECONDS = int(os.getenv("IMPORT_STALE_SECONDS", "120"))
+MAX_STORED_ERRORS = 200
+
+IMPORT_JOBS_DDL = """
+    CREATE TABLE IF NOT EXISTS import_jobs (
+        id TEXT PRIMARY KEY,
+        admin_username TEXT NOT NULL,
+        campus TEXT,
+        added_by INTEGER,
+        added_by_type TEXT,
+        file_path TEXT NOT NULL,
+        original_filename TEXT,
+        status TEXT NOT NULL DEFAULT 'queued',
+        total_rows INTEGER NOT NULL DEFAULT 0,
+        processed_rows INTEGER NOT NULL DEFAULT 0,
+        inserted INTEGER NOT NULL DEFAULT 0,
+        skipped INTEGER NOT NULL DEFAULT 0,
+        errors JSONB NOT NULL DEFAULT '[]',
+        error TEXT,
+        heartbeat_at TIMESTAMP,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        finished_at TIMESTAMP
+    );
+"""
+
+_running = set()
+_running_lock = threading.Lock()
+
+
+def ensure_import_jobs_table():
+    ensure_schema("import_jobs", IMPORT_JOBS_DDL)
+
+
+def create_import_job(cur, file, admin_username, campus, added_by_id, added_by_type):
+    """
+    Save the uploaded file and record a queued job in the caller's
+    transaction. Start it with start_import_job() after committing.
+    """
+    ensure_import_jobs_table()
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+
+    job_id = uuid.uuid4().hex
+    ext = os.path.splitext(file.filename)[1].lower()
+    path = os.path.join(IMPORT_UPLOAD_DIR, f"{job_id}{ext}")
+    file.save(path)
+
+    cur.execute("""
+        INSERT INTO import_jobs
+            (id, admin_username, campus, added_by, added_by_type, file_path, original_filename)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (job_id, admin_username, campus, added_by_id, added_by_type, path, file.filename))
+
+    return job_id
+
+
+def start_import_job(job_id):
+    with _running_lock:
+        if job_id in _running:
+            return False
+        _running.add(job_id)
+
+    thread = threading.Thread(target=_run_import, args=(job_id,), daemon=True)
+    thread.start()
+    return True
+
+
+def _claim(cur, job_id):
+    # Only one worker may own a job: queued jobs, or running ones whose
+    # worker stopped sending heartbeats.
+    cur.execute("""
+        UPDATE import_jobs
+        SET status = 'running', heartbeat_at = NOW()
+        WHERE id = %s
+        AND (
+            status = 'queued'
+            OR (status = 'running'
+                AND (heartbeat_at IS NULL
+                     OR heartbeat_at < NOW() - make_interval(secs => %s)))
+        )
+        RETURNING file_path, campus, added_by, added_by_type, processed_rows, admin_username
+    """, (job_id, IMPORT_STALE_SECONDS))
+    return cur.fetchone()
+
+
+def _fail(cur, job_id, message):
+    cur.execute("""
+        UPDATE import_jobs
+        SET status = 'error', error = %s, finished_at = NOW()
+        WHERE id = %s
+    """, (message, job_id))
+
+
+def _run_import(job_id):
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    try:
+        claimed = _claim(cur, job_id)
+        conn.commit()
+        if not claimed:
+            return
+
+        path, campus, added_by_id, added_by_type, checkpoint, admin_username = claimed
+
+        cur.execute(
+            "UPDATE import_jobs SET total_rows = %s WHERE id = %s",
+            (estimate_roster_rows(path) or 0, job_id)
+        )
+        conn.commit()
+
+        last_row = 0
+
+        try:
+            # Rows are streamed from the file one batch at a time; everything
+            # up to processed_rows was committed by an earlier run and is
+            # read past without touching the database.
+            for batch in iter_roster_batches(path, IMPORT_CHUNK_SIZE):
+                last_row = batch[-1][0]
+                if last_row <= checkpoint:
+                    continue
+
+                batch = [r for r in batch if r[0] > checkpoint]
+                chunk, skips = normalize_rows(batch)
+
+                # Earlier chunks are already committed, so the duplicate
+                # query sees them just like the single-transaction import did.
+                chunk, duplicate_skips = drop_duplicates(cur, chunk)
+                skips.extend(duplicate_skips)
+
+                inserted_exam_ids = insert_roster(cur, chunk, campus, added_by_id, added_by_type)
+                skips.extend((r[0], SKIP_DUPLICATE) for r in chunk if r[1] not in inserted_exam_ids)
+                skips.sort()
+
+                cur.execute("""
+                    UPDATE import_jobs
+                    SET processed_rows = %s,
+                        total_rows = GREATEST(total_rows, %s),
+                        inserted = inserted + %s,
+                        skipped = skipped + %s,
+                        errors = CASE
+                            WHEN jsonb_array_length(errors) >= %s THEN errors
+                            ELSE errors || %s
+                        END,
+                        heartbeat_at = NOW()
+                    WHERE id = %s
+                """, (
+                    last_row,
+                    last_row,
+                    len(inserted_exam_ids),
+                    len(skips),
+                    MAX_STORED_ERRORS,
+                    Json([{"row": n, "reason": reason} for n, reason in skips[:MAX_STORED_ERRORS]]),
+                    job_id
+                ))
+                conn.commit()
+
+        except RosterFormatError as e:
+            conn.rollback()
+            _fail(cur, job_id, str(e))
+            conn.commit()
+            return
+
+        cur.execute("UPDATE import_jobs SET total_rows = %s WHERE id = %s", (last_row, job_id))
+
+        cur.execute("""
+            UPDATE import_jobs
+            SET status = 'done', finished_at = NOW()
+            WHERE id = %s
+            RETURNING inserted
+        """, (job_id,))
+        inserted = cur.fetchone()[0]
+
+        if inserted > 0:
+            cur.execute("""
+                INSERT INTO admin_logs (admin_username, campus, action)
+                VALUES (%s, %s, %s)
+            """, (admin_username, campus, f"Added {inserted} new student(s) through Excel upload"))
+
+        conn.commit()
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    except Exception as e:
+        logger.error(f"Import job {job_id} failed: {e}")
+        conn.rollback()
+        try:
+            _fail(cur, job_id, str(e))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+
+    finally:
+        cur.close()
+        conn.close()
+        with _running_lock:
+            _running.discard(job_id)
+
+
+def resume_stale_imports():
+    """
+    Restart queued jobs and running jobs whose worker died (deploy, crash,
+    OOM). They pick up from their last committed chunk.
+    """
+    ensure_import_jobs_table()
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id
+        FROM import_jobs
+        WHERE status = 'queued'
+        OR (status = 'running'
+            AND (heartbeat_at IS NULL
+                 OR heartbeat_at < NOW() - make_interval(secs => %s)))
+    """, (IMPORT_STALE_SECONDS,))
+    job_ids = [r[0] for r in cur.fetchall()]
+    cur.close()
+    conn.close()
+
+    return [job_id for job_id in job_ids if start_import_job(job_id)]
+
+
+def get_import_job(cur, job_id, admin_username):
+    ensure_import_jobs_table()
+
+    cur.execute("""
+        SELECT id, status, original_filename, total_rows, processed_rows,
+               inserted, skipped, errors, error, created_at, finished_at,
+               heartbeat_at < NOW() - make_interval(secs => %s) AS stale
+        FROM import_jobs
+        WHERE id = %s AND admin_username = %s
+    """, (IMPORT_STALE_SECONDS, job_id, admin_username))
+    row = cur.fetchone()
+    if not row:
+        return None
+
+    (job_id, status, filename, total_rows, processed_rows, inserted,
+     skipped, errors, error, created_at, finished_at, stale) = row
+
+    if isinstance(errors, str):
+        errors = json.loads(errors)
+
+    return {
+        "job_id": job_id,
+        "status": status,
+        "filename": filename,
+        "total_rows": total_rows,
+        "processed_rows": processed_rows,
+        "inserted": inserted,
+        "skipped": skipped,
+        "errors": errors,
+        "error": error,
+        "stale": bool(stale) and status == "running",
+        "created_at": created_at.isoformat() if created_at else None,
+        "finished_at": finished_at.isoformat() if finished_at else None,
+    }
@@ -0,0 +1,412 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ..ai_clients import groq_chat
+from ..db import get_db_connection
+from ..description import short_letter_descriptions
+from .catalog import get_catalog
+from .letter_scores import get_letter_scores
+from .rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Groq calls in flight per batch, and how many may start per minute across
+# all batches in this process (Groq's free tier allows 30 requests/minute).
+INTERVIEW_AI_CONCURRENCY = int(os.getenv("INTERVIEW_AI_CONCURRENCY", "4"))
+INTERVIEW_AI_RATE_PER_MIN = float(os.getenv("INTERVIEW_AI_RATE_PER_MIN", "25"))
+INTERVIEW_AI_KEEP_SECONDS = 60 * 60
+INTERVIEW_AI_STATE_DIR = os.getenv(
+    "INTERVIEW_AI_STATE_DIR", os.path.join(tempfile.gettempdir(), "aspirematch_interview_jobs")
+)
+
+_rate_limiter = RateLimiter(INTERVIEW_AI_RATE_PER_MIN)
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def load_interview_inputs(cur, student_id):
+    """
+    Everything the interview prompt needs for one student, or None if the
+    student does not exist. "answered" is False when there are no survey
+    answers to work from.
+    """
+    cur.execute("""
+        SELECT 
+            s.fullname,
+            sa.preferred_program
+        FROM student s
+        LEFT JOIN student_survey_answer sa ON s.id = sa.student_id
+        WHERE s.id = %s
+    """, (student_id,))
+
+    row = cur.fetchone()
+
+    if not row:
+        return None
+
+    fullname = row[0]
+    preferred_program = row[1]
+    scores = get_letter_scores(cur, student_id)
+
+    if not scores or not scores["answered_count"]:
+        return {"answered": False}
+
+    program_letters = []
+    if preferred_program:
+        program_letters = get_catalog().program_letters_by_name(preferred_program)
+
+    return {
+        "answered": True,
+        "fullname": fullname,
+        "preferred_program": preferred_program,
+        "program_letters": program_letters,
+        "top_three": scores["top_letters"]
+    }
+
+
+def build_interview_prompt(fullname, preferred_program, program_letters, top_three):
+    top_three_descriptions = [
+        short_letter_descriptions.get(l, "Unknown")
+        for l in top_three
+    ]
+
+    program_descriptions = [
+        short_letter_descriptions.get(l, "Unknown")
+        for l in program_letters
+    ]
+
+    return f"""
+You are an expert educational guidance counselor AI.
+
+Your job is to analyze if a student's chosen program aligns with their interests,
+and generate SMART, NATURAL, and VARIED interview questions.
+
+---
+
+🎯 GOALS:
+
+1. Detect alignment level:
+   - STRONG MATCH → interests align well
+   - PARTIAL MATCH → some overlap
+   - MISMATCH → little to no overlap
+
+2. Adjust explanation tone:
+   - If mismatch is strong → clearly explain concern
+   - If partial → suggest exploration
+   - If strong match → reinforce decision
+
+---
+
+🧠 QUESTION GENERATION RULES:
+
+Generate EXACTLY 6 questions that are:
+
+✔ Natural and conversational (like a real counselor)
+✔ NOT repetitive in structure
+✔ RANDOMIZED phrasing each time
+✔ Personalized using:
+   - Preferred program
+   - Student top interests
+
+✔ Mix of:
+   - 2 program-focused questions
+   - 2 interest-based questions
+   - 2 hybrid (program + interest)
+
+✔ Use varied sentence starters such as:
+   - "What draws you to..."
+   - "How do you see yourself..."
+   - "Have you considered..."
+   - "In what ways do you think..."
+   - "Would you be interested in..."
+   - "Can you imagine..."
+
+❌ DO NOT repeat patterns
+❌ DO NOT make generic questions
+❌ DO NOT use identical structure
+
+---
+
+📊 STUDENT DATA:
+
+Student Name: {fullname}
+Preferred Program: {preferred_program}
+
+Program Category Letters: {program_letters}
+Program Descriptions: {program_descriptions}
+
+Top 3 Interest Letters: {top_three}
+Top 3 Interest Descriptions: {top_three_descriptions}
+
+---
+
+🧩 ANALYSIS TASK:
+
+Compare:
+- Program descriptions vs student interest descriptions
+
+Determine:
+- Alignment level (strong / partial / mismatch)
+
+---
+
+📌 OUTPUT REQUIREMENTS:
+
+Return STRICT JSON ONLY:
+
+{{
+  "questions": [
+    "6 unique, varied, natural questions here"
+  ],
+  "mismatch_reason": "Clear explanation of alignment level and reasoning",
+  "talking_points": [
+    "3 smart counseling suggestions based on alignment level"
+  ]
+}}
+
+---
+
+💡 TALKING POINTS GUIDE:
+
+If STRONG MATCH:
+- Reinforce choice
+- Suggest growth paths
+- Encourage specialization
+
+If PARTIAL:
+- Suggest combining interests
+- Recommend electives or minors
+- Encourage exploration
+
+If MISMATCH:
+- Suggest alternative programs
+- Suggest hybrid careers
+- Encourage reconsideration or deeper reflection
+
+---
+
+⚠️ IMPORTANT:
+- Use ONLY given descriptions
+- Do NOT invent traits
+- Do NOT mention Holland or theory names
+- Keep tone supportive, not judgmental
+"""
+
+
+def parse_interview_json(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        match = re.search(r"\{.*\}", raw, re.S)
+        if not match:
+            raise ValueError("Invalid JSON from AI")
+        return json.loads(match.group())
+
+
+def generate_interview_questions(inputs):
+    prompt = build_interview_prompt(
+        inputs["fullname"],
+        inputs["preferred_program"],
+        inputs["program_letters"],
+        inputs["top_three"]
+    )
+
+    _rate_limiter.acquire()
+    raw = groq_chat(
+        [
+            {"role": "system", "content": "Return ONLY valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=1000
+    ).strip()
+
+    return parse_interview_json(raw)
+
+
+def save_interview_questions(cur, student_id, data):
+    cur.execute(
+        "DELETE FROM interview_questions WHERE student_id = %s",
+        (student_id,)
+    )
+
+    cur.execute(
+        "INSERT INTO interview_questions (student_id, questions) VALUES (%s, %s)",
+        (student_id, json.dumps(data))
+    )
+
+
+# ===== BATCH GENERATION =====
+
+def _state_path(job_id):
+    return os.path.join(INTERVIEW_AI_STATE_DIR, f"{job_id}.json")
+
+
+def _save_job(job):
+    # Progress polls may land on another gunicorn worker (same as bulk PDF
+    # exports), so the state is mirrored to a file every worker can read.
+    # Several threads report on one job, so writes are serialized.
+    with _jobs_lock:
+        tmp_path = _state_path(job["id"]) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, _state_path(job["id"]))
+
+
+def _prune_jobs():
+    cutoff = time.time() - INTERVIEW_AI_KEEP_SECONDS
+    with _jobs_lock:
+        for job_id, job in list(_jobs.items()):
+            if job["finished_at"] and job["finished_at"] < cutoff:
+                del _jobs[job_id]
+
+    if not os.path.isdir(INTERVIEW_AI_STATE_DIR):
+        return
+
+    for entry in os.scandir(INTERVIEW_AI_STATE_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def start_interview_batch(student_ids, owner):
+    """
+    Generate and store interview questions for every student in the list
+    that doesn't have them yet, INTERVIEW_AI_CONCURRENCY at a time.
+    Progress is available from get_interview_batch(job_id).
+    """
+    _prune_jobs()
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "owner": owner,
+        "status": "queued",
+        "total": len(student_ids),
+        "done": 0,
+        "skipped": 0,
+        "failed": 0,
+        "errors": [],
+        "created_at": time.time(),
+        "finished_at": None,
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+
+    os.makedirs(INTERVIEW_AI_STATE_DIR, exist_ok=True)
+    _save_job(job)
+
+    thread = threading.Thread(
+        target=_run_batch, args=(job, list(student_ids)), daemon=True
+    )
+    thread.start()
+    return job_id
+
+
+def _generate_for_student(student_id):
+    # The connection is only held for the reads and the write, not while
+    # waiting on Groq, so a batch can't drain the pool.
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT 1 FROM interview_questions WHERE student_id = %s", (student_id,))
+        if cur.fetchone():
+            return "skipped"
+
+        inputs = load_interview_inputs(cur, student_id)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+    if not inputs or not inputs["answered"]:
+        return "skipped"
+
+    data = generate_interview_questions(inputs)
+    if "questions" not in data:
+        raise ValueError("AI response has no questions")
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        save_interview_questions(cur, student_id, data)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    return "done"
+
+
+def _run_batch(job, student_ids):
+    job["status"] = "running"
+    _save_job(job)
+
+    def work(student_id):
+        try:
+            result = _generate_for_student(student_id)
+        except Exception as e:
+            logger.error(f"Interview batch {job['id']}: student {student_id} failed: {e}")
+            with _jobs_lock:
+                job["failed"] += 1
+                job["errors"].append({"student_id": student_id, "error": str(e)})
+            _save_job(job)
+            return
+
+        with _jobs_lock:
+            job[result] += 1
+        _save_job(job)
+
+    try:
+        with ThreadPoolExecutor(max_workers=INTERVIEW_AI_CONCURRENCY) as pool:
+            list(pool.map(work, student_ids))
+        job["status"] = "done"
+    except Exception as e:
+        logger.error(f"Interview batch {job['id']} failed: {e}")
+        job["status"] = "error"
+    finally:
+        job["finished_at"] = time.time()
+        _save_job(job)
+
+
+def get_interview_batch(job_id, owner=None):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+
+    if job is None and job_id.isalnum():
+        try:
+            with open(_state_path(job_id)) as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            job = None
+
+    if not job or (owner is not None and job["owner"] != owner):
+        return None
+    return job
+
+
+def interview_batch_progress(job):
+    processed = job["done"] + job["skipped"] + job["failed"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "total": job["total"],
+        "done": job["done"],
+        "skipped": job["skipped"],
+        "failed": job["failed"],
+        "errors": job["errors"][:20],
+        "percent": round(100 * processed / job["total"]) if job["total"] else 100,
+    }
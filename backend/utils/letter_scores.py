@@ -0,0 +1,166 @@
+import logging
+
+import psycopg2
+
+from ..db import get_db_connection
+from .schema import ensure_schema
+
+logger = logging.getLogger(__name__)
+
+LETTERS = "ABCDEFGHIJKLMNOPQR"
+TOTAL_PAIRS = 86
+PAIR_COLUMNS = [f"pair{i}" for i in range(1, TOTAL_PAIRS + 1)]
+
+LETTER_SCORES_DDL = """
+    CREATE TABLE IF NOT EXISTS student_letter_scores (
+        student_id INTEGER PRIMARY KEY REFERENCES student(id) ON DELETE CASCADE,
+        exam_id TEXT,
+        letter_counts SMALLINT[] NOT NULL,
+        ranked_letters VARCHAR(18) NOT NULL DEFAULT '',
+        top_letters VARCHAR(3) NOT NULL DEFAULT '',
+        answered_count SMALLINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+"""
+
+UPSERT_SQL = """
+    INSERT INTO student_letter_scores
+        (student_id, exam_id, letter_counts, ranked_letters, top_letters, answered_count, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, NOW())
+    ON CONFLICT (student_id) DO UPDATE SET
+        exam_id = EXCLUDED.exam_id,
+        letter_counts = EXCLUDED.letter_counts,
+        ranked_letters = EXCLUDED.ranked_letters,
+        top_letters = EXCLUDED.top_letters,
+        answered_count = EXCLUDED.answered_count,
+        updated_at = NOW()
+"""
+
+
+def ensure_letter_scores_table():
+    ensure_schema("student_letter_scores", LETTER_SCORES_DDL)
+
+
+def compute_letter_scores(answers):
+    """
+    Build the 18-slot A-R count vector for a list of pair answers.
+
+    ranked_letters keeps the same order Counter(...).most_common() produced:
+    highest count first, ties broken by which letter was picked first.
+    """
+    counts = [0] * len(LETTERS)
+    first_seen = {}
+
+    for position, answer in enumerate(answers):
+        if not answer:
+            continue
+
+        letter = str(answer).strip().upper()
+        if len(letter) != 1 or letter not in LETTERS:
+            continue
+
+        counts[LETTERS.index(letter)] += 1
+        first_seen.setdefault(letter, position)
+
+    ranked = sorted(
+        first_seen,
+        key=lambda l: (-counts[LETTERS.index(l)], first_seen[l])
+    )
+
+    return {
+        "letter_counts": counts,
+        "ranked_letters": "".join(ranked),
+        "top_letters": ranked[:3],
+        "top_mask": _top_mask(ranked[:3]),
+        "answered_count": sum(counts)
+    }
+
+
+def scores_row_params(student_id, exam_id, scores):
+    return (
+        student_id,
+        exam_id,
+        scores["letter_counts"],
+        scores["ranked_letters"],
+        "".join(scores["top_letters"]),
+        scores["answered_count"]
+    )
+
+
+def save_letter_scores(cur, student_id, exam_id, answers):
+    ensure_letter_scores_table()
+
+    scores = compute_letter_scores(answers)
+    cur.execute(UPSERT_SQL, scores_row_params(student_id, exam_id, scores))
+    return scores
+
+
+def get_letter_scores(cur, student_id):
+    """
+    Read the stored score vector for one student. Rows submitted before the
+    side table existed are computed from the raw pairs and stored on the fly,
+    committed on a separate connection so read-only callers that never
+    commit still keep it. Returns None when the student has no survey answers.
+    """
+    ensure_letter_scores_table()
+
+    cur.execute("""
+        SELECT letter_counts, ranked_letters, answered_count
+        FROM student_letter_scores
+        WHERE student_id = %s
+    """, (student_id,))
+    row = cur.fetchone()
+
+    if row:
+        letter_counts, ranked_letters, answered_count = _row_values(row)
+        return {
+            "letter_counts": list(letter_counts),
+            "ranked_letters": ranked_letters,
+            "top_letters": list(ranked_letters[:3]),
+            "top_mask": _top_mask(ranked_letters[:3]),
+            "answered_count": answered_count
+        }
+
+    cur.execute(f"""
+        SELECT exam_id, {", ".join(PAIR_COLUMNS)}
+        FROM student_survey_answer
+        WHERE student_id = %s
+        ORDER BY id DESC
+        LIMIT 1
+    """, (student_id,))
+    row = cur.fetchone()
+
+    if not row:
+        return None
+
+    values = _row_values(row)
+    scores = compute_letter_scores(values[1:])
+    _store_letter_scores(student_id, values[0], scores)
+    return scores
+
+
+def _store_letter_scores(student_id, exam_id, scores):
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(UPSERT_SQL, scores_row_params(student_id, exam_id, scores))
+        conn.commit()
+        cur.close()
+    except psycopg2.Error as e:
+        conn.rollback()
+        logger.warning(f"Could not store letter scores for student {student_id}: {e}")
+    finally:
+        conn.close()
+
+
+def _top_mask(top_letters):
+    # utils/matching.py imports LETTERS from here.
+    from .matching import letters_mask
+    return letters_mask(top_letters)
+
+
+def _row_values(row):
+    # Works for tuple, DictCursor and RealDictCursor rows alike.
+    if isinstance(row, dict):
+        return list(row.values())
+    return list(row)
@@ -0,0 +1,96 @@
+"""
+Program matching on 18-bit letter masks: bit i is LETTERS[i] (A-R).
+Programs carry the mask of their category letters (built with the
+catalog), students the mask of their top letters, so "do they share a
+letter" is a single AND and the overlap score is a popcount.
+"""
+from functools import lru_cache
+
+from .letter_scores import LETTERS
+
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(LETTERS)}
+
+MATCH = "Match"
+NOT_MATCH = "Not Match"
+NOT_ANSWERED = "Not Yet Answer"
+
+try:
+    popcount = int.bit_count
+except AttributeError:      # Python < 3.10
+    def popcount(mask):
+        return bin(mask).count("1")
+
+
+def letters_mask(letters):
+    """
+    Mask for a list of letters or a string of them ("AGL", "A, G, L").
+    Anything that isn't a letter A-R is ignored.
+    """
+    if not letters:
+        return 0
+    if not isinstance(letters, str):
+        letters = "".join(str(letter) for letter in letters)
+    return _string_mask(letters)
+
+
+# Top-letter and category strings repeat across a cohort, so each distinct
+# one is parsed once.
+@lru_cache(maxsize=8192)
+def _string_mask(letters):
+    mask = 0
+    for letter in letters.upper():
+        mask |= LETTER_BITS.get(letter, 0)
+    return mask
+
+
+def mask_letters(mask):
+    return [letter for letter, bit in LETTER_BITS.items() if mask & bit]
+
+
+def overlap(student_mask, program_mask):
+    """How many of the student's top letters the program has."""
+    return popcount(student_mask & program_mask)
+
+
+def match_status(preferred, student_mask, program_mask, answers_clean):
+    """
+    The one Match / Not Match / Not Yet Answer rule: the preferred program
+    shares at least one letter with the student's top letters.
+    """
+    if not preferred and not answers_clean:
+        return NOT_ANSWERED
+    return MATCH if student_mask & program_mask else NOT_MATCH
+
+
+def rank_programs(student_mask, programs, limit=None):
+    """
+    (program, score) pairs for catalog program dicts sharing at least one
+    letter with the student, highest overlap first; ties keep catalog order.
+    """
+    scored = []
+    for p in programs:
+        common = student_mask & p["mask"]
+        if common:
+            scored.append((p, popcount(common)))
+    scored.sort(key=lambda item: -item[1])
+    return scored[:limit] if limit is not None else scored
+
+
+def cohort_match_statuses(students, program_mask_for):
+    """
+    Match status for a whole cohort. `students` yields
+    (campus, preferred_program, top_letters, answered_count) tuples and
+    `program_mask_for(campus, preferred_program)` resolves the program mask
+    (e.g. Catalog.program_mask); each distinct pair is resolved once.
+    """
+    masks = {}
+    statuses = []
+    for campus, preferred, top_letters, answered_count in students:
+        key = (campus, preferred)
+        if key not in masks:
+            masks[key] = program_mask_for(campus, preferred) if preferred else 0
+        statuses.append(match_status(
+            preferred, letters_mask(top_letters), masks[key], bool(answered_count)
+        ))
+    return statuses
+
@@ -0,0 +1,96 @@
+import base64
+import logging
+import os
+import threading
+import time
+from io import BytesIO
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Logos are printed at most ~100px (about 1 inch) tall, so 320px keeps them
+# at print resolution instead of shipping the 1.25 MB original every time.
+PDF_LOGO_MAX_PX = int(os.getenv("PDF_LOGO_MAX_PX", "320"))
+
+PDF_LOGOS = {
+    "cpsu_logo_base64": "cpsulogo.png",
+    "bagong_logo_base64": "bagong-pilipinas-logo.png",
+    "safe_logo_base64": "logo.png",
+}
+
+_cache = {}     # path -> (mtime, max_px, base64 string)
+_lock = threading.Lock()
+
+
+def _downsample_png(data, max_px):
+    from PIL import Image
+
+    image = Image.open(BytesIO(data))
+    width, height = image.size
+
+    if height <= max_px:
+        return data
+
+    new_width = max(1, round(width * max_px / height))
+    image = image.resize((new_width, max_px), Image.LANCZOS)
+
+    out = BytesIO()
+    image.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def static_image_base64(filename, max_px=PDF_LOGO_MAX_PX):
+    """
+    Base64 of static/images/<filename>, downsampled to max_px tall. Encoded
+    once per process and re-read only when the file's mtime changes.
+    """
+    path = os.path.join(current_app.static_folder, "images", filename)
+    mtime = os.path.getmtime(path)
+
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime and cached[1] == max_px:
+        return cached[2]
+
+    with _lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime and cached[1] == max_px:
+            return cached[2]
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        try:
+            data = _downsample_png(data, max_px)
+        except Exception as e:
+            logger.warning(f"Could not downsample {filename}, using original: {e}")
+
+        encoded = base64.b64encode(data).decode()
+        _cache[path] = (mtime, max_px, encoded)
+        return encoded
+
+
+def pdf_logos(*names):
+    """
+    Template kwargs for the PDF header logos, e.g.
+    render_template(..., **pdf_logos()) or pdf_logos("cpsu_logo_base64").
+    """
+    names = names or tuple(PDF_LOGOS)
+    return {name: static_image_base64(PDF_LOGOS[name]) for name in names}
+
+
+def render_pdf(html, label="pdf"):
+    from weasyprint import HTML
+
+    started = time.perf_counter()
+
+    pdf_io = BytesIO()
+    HTML(string=html, base_url=current_app.root_path).write_pdf(pdf_io)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    current_app.logger.info(
+        f"📄 Rendered {label}: {pdf_io.tell() / 1024:.1f} KB in {elapsed_ms:.0f} ms"
+    )
+
+    pdf_io.seek(0)
+    return pdf_io
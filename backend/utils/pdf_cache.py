@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from flask import make_response, request, send_file
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = os.getenv(
+    "PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "aspirematch_pdf_cache")
+)
+PDF_CACHE_MAX_MB = float(os.getenv("PDF_CACHE_MAX_MB", "256"))
+
+# Bump when something that affects the PDF but not its HTML changes
+# (WeasyPrint upgrade, fonts, render options).
+PDF_RENDER_VERSION = "1"
+
+_evict_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "not_modified": 0, "evicted": 0}
+
+
+def pdf_cache_key(template_name, html):
+    """
+    Content address for a rendered PDF. The HTML already carries every input
+    (answers, preferred program, ai_explanation, photo, campus info and the
+    template itself), so two identical pages always share one cached file.
+    """
+    digest = hashlib.sha256()
+    digest.update(PDF_RENDER_VERSION.encode())
+    digest.update(b"\0")
+    digest.update(template_name.encode())
+    digest.update(b"\0")
+    digest.update(html.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _path_for(key):
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+
+
+def get_cached_pdf(key):
+    path = _path_for(key)
+    try:
+        # mtime doubles as the LRU clock
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def store_pdf(key, pdf_bytes):
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+    path = _path_for(key)
+    fd, tmp_path = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+
+    _evict()
+    return path
+
+
+def _evict():
+    max_bytes = PDF_CACHE_MAX_MB * 1024 * 1024
+
+    with _evict_lock:
+        entries = []
+        total = 0
+        for entry in os.scandir(PDF_CACHE_DIR):
+            if not entry.name.endswith(".pdf"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+        if total <= max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            _stats["evicted"] += 1
+            if total <= max_bytes:
+                break
+
+
+def send_cached_pdf(key, render, download_name):
+    """
+    Answer a PDF download from the cache. render() is only called on a miss
+    and must return a file-like object with the PDF bytes.
+    """
+    if key in request.if_none_match:
+        _stats["not_modified"] += 1
+        response = make_response("", 304)
+        response.set_etag(key)
+        return response
+
+    path = get_cached_pdf(key)
+
+    if path:
+        try:
+            response = send_file(
+                path,
+                mimetype="application/pdf",
+                download_name=download_name,
+                as_attachment=True,
+                etag=key,
+                conditional=True
+            )
+        except FileNotFoundError:
+            # Another worker's eviction removed it after the lookup; render again.
+            pass
+        else:
+            _stats["hits"] += 1
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+    _stats["misses"] += 1
+    pdf_io = render()
+    try:
+        store_pdf(key, pdf_io.getvalue())
+    except OSError as e:
+        logger.error(f"Could not write PDF cache entry {key}: {e}")
+
+    # Served from memory, so an eviction racing the write can't lose it.
+    pdf_io.seek(0)
+    response = send_file(
+        pdf_io,
+        mimetype="application/pdf",
+        download_name=download_name,
+        as_attachment=True
+    )
+    response.set_etag(key)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def get_pdf_cache_stats():
+    return dict(_stats)
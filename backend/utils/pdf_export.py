@@ -0,0 +1,225 @@
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Keep at most this many WeasyPrint processes busy per web worker, and only
+# one bulk export running at a time, so exports can't starve page requests.
+PDF_EXPORT_MAX_WORKERS = int(os.getenv(
+    "PDF_EXPORT_MAX_WORKERS", str(max(1, min(2, (os.cpu_count() or 2) - 1)))
+))
+PDF_EXPORT_MAX_JOBS = int(os.getenv("PDF_EXPORT_MAX_JOBS", "1"))
+PDF_EXPORT_DIR = os.getenv(
+    "PDF_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "aspirematch_exports")
+)
+PDF_EXPORT_KEEP_SECONDS = 60 * 60
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_job_slots = threading.BoundedSemaphore(PDF_EXPORT_MAX_JOBS)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _render_pdf_bytes(html, base_url):
+    # Runs in a worker process; only WeasyPrint is imported there.
+    from io import BytesIO
+    from weasyprint import HTML
+
+    out = BytesIO()
+    HTML(string=html, base_url=base_url).write_pdf(out)
+    return out.getvalue()
+
+
+def _get_executor():
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # spawn, not fork: the children must not inherit the pool's
+            # database sockets or Flask's threads.
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_EXPORT_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _state_path(job_id):
+    return os.path.join(PDF_EXPORT_DIR, f"{job_id}.json")
+
+
+def _save_job(job):
+    # Status polls may land on another gunicorn worker, so progress is also
+    # written next to the ZIP where every worker on the host can read it.
+    tmp_path = _state_path(job["id"]) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(job, f)
+    os.replace(tmp_path, _state_path(job["id"]))
+
+
+def _prune_jobs():
+    cutoff = time.time() - PDF_EXPORT_KEEP_SECONDS
+
+    with _jobs_lock:
+        for job_id, job in list(_jobs.items()):
+            if job["finished_at"] and job["finished_at"] < cutoff:
+                del _jobs[job_id]
+
+    if not os.path.isdir(PDF_EXPORT_DIR):
+        return
+
+    for entry in os.scandir(PDF_EXPORT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def start_export(app, producer, total, owner, zip_name):
+    """
+    Render a batch of PDFs into one ZIP in the background.
+
+    producer() runs inside an app context on the export thread and yields
+    (filename, html) pairs, or None for a student it decided to skip.
+    Progress is available from get_export(job_id).
+    """
+    _prune_jobs()
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "owner": owner,
+        "status": "queued",
+        "total": total,
+        "done": 0,
+        "skipped": 0,
+        "failed": 0,
+        "zip_name": zip_name,
+        "path": None,
+        "error": None,
+        "created_at": time.time(),
+        "finished_at": None,
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+
+    os.makedirs(PDF_EXPORT_DIR, exist_ok=True)
+    _save_job(job)
+
+    thread = threading.Thread(
+        target=_run_export, args=(app, job, producer), daemon=True
+    )
+    thread.start()
+    return job_id
+
+
+def _run_export(app, job, producer):
+    with _job_slots:
+        job["status"] = "running"
+        _save_job(job)
+        path = os.path.join(PDF_EXPORT_DIR, f"{job['id']}.zip")
+
+        try:
+            executor = _get_executor()
+            window = PDF_EXPORT_MAX_WORKERS * 2
+            pending = {}
+            used_names = set()
+
+            with app.app_context(), zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+                def collect(futures):
+                    for future in futures:
+                        filename = pending.pop(future)
+                        try:
+                            zf.writestr(filename, future.result())
+                            job["done"] += 1
+                        except Exception as e:
+                            job["failed"] += 1
+                            logger.error(f"Bulk export: could not render {filename}: {e}")
+                    _save_job(job)
+
+                for item in producer():
+                    if item is None:
+                        job["skipped"] += 1
+                        continue
+
+                    filename, html = item
+                    filename = _unique_name(filename, used_names)
+                    future = executor.submit(_render_pdf_bytes, html, app.root_path)
+                    pending[future] = filename
+
+                    # Only a few pages in flight, so memory stays flat for
+                    # a whole school year.
+                    if len(pending) >= window:
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(finished)
+
+                collect(wait(pending)[0])
+
+            job["path"] = path
+            job["status"] = "done"
+
+        except Exception as e:
+            logger.error(f"Bulk export {job['id']} failed: {e}")
+            job["status"] = "error"
+            job["error"] = str(e)
+            if os.path.exists(path):
+                os.remove(path)
+
+        finally:
+            job["finished_at"] = time.time()
+            _save_job(job)
+
+
+def _unique_name(filename, used_names):
+    # Two students with the same full name must not overwrite each other.
+    base, ext = os.path.splitext(filename)
+    candidate = filename
+    n = 2
+    while candidate in used_names:
+        candidate = f"{base}_{n}{ext}"
+        n += 1
+    used_names.add(candidate)
+    return candidate
+
+
+def get_export(job_id, owner=None):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+
+    if job is None and job_id.isalnum():
+        try:
+            with open(_state_path(job_id)) as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            job = None
+
+    if not job or (owner is not None and job["owner"] != owner):
+        return None
+    return job
+
+
+def export_progress(job):
+    processed = job["done"] + job["skipped"] + job["failed"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "total": job["total"],
+        "done": job["done"],
+        "skipped": job["skipped"],
+        "failed": job["failed"],
+        "percent": round(100 * processed / job["total"]) if job["total"] else 100,
+        "error": job["error"],
+    }
@@ -0,0 +1,27 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly so at most `per_minute` start in any minute, across
+    all threads sharing the limiter. acquire() blocks until the caller's slot.
+    """
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,148 @@
+from psycopg2.extras import execute_values
+
+ROSTER_COLUMNS = ["exam_id", "fullname", "email", "gender", "school_year"]
+
+SKIP_INVALID = "missing field or bad school_year"
+SKIP_DUPLICATE = "exam_id or email already exists"
+
+STAGING_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS student_import_staging (
+        row_no INTEGER,
+        exam_id TEXT,
+        fullname TEXT,
+        email TEXT,
+        gender TEXT,
+        school_year TEXT
+    ) ON COMMIT DROP;
+"""
+
+
+def normalize_roster(df):
+    """
+    Clean an uploaded roster the same way the row-by-row loop did: trim every
+    field, upper-case fullname, and drop rows with an empty field or a
+    school_year without "-". Returns (valid_rows, skips) where skips is a
+    list of (row_no, reason) with 1-based data row numbers.
+    """
+    df = df[ROSTER_COLUMNS].fillna("").astype(str)
+
+    for col in ROSTER_COLUMNS:
+        df[col] = df[col].str.strip()
+    df["fullname"] = df["fullname"].str.upper()
+
+    valid = (df != "").all(axis=1) & df["school_year"].str.contains("-", regex=False)
+
+    row_numbers = range(1, len(df) + 1)
+    skips = [(n, SKIP_INVALID) for n, ok in zip(row_numbers, valid) if not ok]
+
+    good = df[valid]
+    rows = list(zip(
+        [n for n, ok in zip(row_numbers, valid) if ok],
+        good["exam_id"], good["fullname"], good["email"],
+        good["gender"], good["school_year"]
+    ))
+    return rows, skips
+
+
+def normalize_rows(batch):
+    """
+    Row-at-a-time twin of normalize_roster for streamed batches of
+    (row_no, exam_id, fullname, email, gender, school_year) raw strings.
+    """
+    rows = []
+    skips = []
+    for row_no, *values in batch:
+        exam_id, fullname, email, gender, school_year = (v.strip() for v in values)
+        fullname = fullname.upper()
+
+        if not all([exam_id, fullname, email, gender, school_year]) or "-" not in school_year:
+            skips.append((row_no, SKIP_INVALID))
+            continue
+
+        rows.append((row_no, exam_id, fullname, email, gender, school_year))
+
+    return rows, skips
+
+
+def drop_duplicates(cur, rows):
+    """
+    One query for every exam_id/email already in the database, then a pass
+    over the file in order. A row is skipped if its exam_id or email is in
+    the database or belongs to an earlier row that will be inserted, which
+    is exactly what the old per-row SELECT saw inside its transaction.
+    """
+    if not rows:
+        return [], []
+
+    cur.execute("""
+        SELECT exam_id, email
+        FROM student
+        WHERE exam_id = ANY(%s) OR email = ANY(%s)
+    """, ([r[1] for r in rows], [r[3] for r in rows]))
+
+    seen_exam_ids = set()
+    seen_emails = set()
+    for exam_id, email in cur.fetchall():
+        seen_exam_ids.add(exam_id)
+        seen_emails.add(email)
+
+    keep = []
+    skips = []
+    for row in rows:
+        row_no, exam_id, _, email, _, _ = row
+        if exam_id in seen_exam_ids or email in seen_emails:
+            skips.append((row_no, SKIP_DUPLICATE))
+            continue
+        seen_exam_ids.add(exam_id)
+        seen_emails.add(email)
+        keep.append(row)
+
+    return keep, skips
+
+
+def insert_roster(cur, rows, campus, added_by_id, added_by_type):
+    """
+    Load rows into a temp staging table with one execute_values call and
+    move them into student with a single INSERT ... SELECT. Returns the
+    set of exam_ids actually inserted.
+    """
+    if not rows:
+        return set()
+
+    cur.execute(STAGING_DDL)
+    cur.execute("TRUNCATE student_import_staging")
+    execute_values(cur, """
+        INSERT INTO student_import_staging
+            (row_no, exam_id, fullname, email, gender, school_year)
+        VALUES %s
+    """, rows, page_size=1000)
+
+    cur.execute("""
+        INSERT INTO student
+            (exam_id, fullname, email, gender, campus, added_by, added_by_type, school_year)
+        SELECT exam_id, fullname, email, gender, %s, %s, %s, school_year
+        FROM student_import_staging
+        ORDER BY row_no
+        ON CONFLICT DO NOTHING
+        RETURNING exam_id
+    """, (campus, added_by_id, added_by_type))
+    return {r[0] for r in cur.fetchall()}
+
+
+def import_roster(cur, df, campus, added_by_id, added_by_type):
+    """
+    Validate, de-duplicate and insert a roster DataFrame inside the caller's
+    transaction. Returns (inserted, skipped, skips).
+    """
+    rows, skips = normalize_roster(df)
+    rows, duplicate_skips = drop_duplicates(cur, rows)
+    skips.extend(duplicate_skips)
+
+    inserted_exam_ids = insert_roster(cur, rows, campus, added_by_id, added_by_type)
+
+    # Rows lost to a concurrent insert between the check and ON CONFLICT
+    # still count as duplicates.
+    skips.extend((row[0], SKIP_DUPLICATE) for row in rows if row[1] not in inserted_exam_ids)
+
+    skips.sort()
+    return len(inserted_exam_ids), len(skips), skips
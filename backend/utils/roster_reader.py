@@ -0,0 +1,156 @@
+import csv
+import os
+
+from .roster_import import ROSTER_COLUMNS
+
+ROSTER_BATCH_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+
+
+class RosterFormatError(ValueError):
+    pass
+
+
+def _cell_to_str(value):
+    # Same strings pd.read_excel(..., dtype=str) produced for these cells:
+    # whole-number floats lose their ".0", dates use str(datetime).
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _check_header(header):
+    header = [_cell_to_str(h).strip().lower() for h in header]
+    while header and header[-1] == "":
+        header.pop()
+
+    if header != ROSTER_COLUMNS:
+        raise RosterFormatError(
+            f"Excel must contain exactly these columns in this order: {', '.join(ROSTER_COLUMNS)}"
+        )
+
+
+def _skip_trailing_blanks(rows):
+    # Formatted-but-empty rows at the bottom of a sheet are not data. Blank
+    # rows between data rows still come through (and are skipped as invalid),
+    # as they did with pandas. Only a count is held, so memory stays flat.
+    blanks = 0
+    for row in rows:
+        if all(v == "" for v in row):
+            blanks += 1
+            continue
+        for _ in range(blanks):
+            yield [""] * len(ROSTER_COLUMNS)
+        blanks = 0
+        yield row
+
+
+def _xlsx_rows(path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            raise RosterFormatError("The uploaded sheet is empty")
+        _check_header(header)
+
+        width = len(ROSTER_COLUMNS)
+        for row in rows:
+            values = [_cell_to_str(v) for v in row[:width]]
+            values += [""] * (width - len(values))
+            yield values
+    finally:
+        wb.close()
+
+
+def _csv_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+
+        header = next(reader, None)
+        if header is None:
+            raise RosterFormatError("The uploaded file is empty")
+        _check_header(header)
+
+        width = len(ROSTER_COLUMNS)
+        for row in reader:
+            values = row[:width] + [""] * (width - len(row))
+            yield values
+
+
+def _xls_rows(path):
+    # openpyxl cannot read the legacy .xls format, so these still go
+    # through pandas (and are loaded whole).
+    import pandas as pd
+
+    df = pd.read_excel(path, dtype=str)
+    _check_header(list(df.columns))
+
+    for row in df.itertuples(index=False):
+        yield [_cell_to_str(v) if isinstance(v, str) else "" for v in row]
+
+
+def iter_roster_rows(path):
+    """
+    Yield each data row of an uploaded roster as a list of raw strings,
+    after checking the header. Supports .xlsx (streamed with openpyxl in
+    read-only mode), .csv and legacy .xls.
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".csv":
+        rows = _csv_rows(path)
+    elif ext == ".xls":
+        rows = _xls_rows(path)
+    else:
+        rows = _xlsx_rows(path)
+
+    return _skip_trailing_blanks(rows)
+
+
+def iter_roster_batches(path, batch_size=ROSTER_BATCH_SIZE):
+    """
+    Group roster rows into lists of (row_no, exam_id, fullname, email,
+    gender, school_year), row_no being the 1-based data row number.
+    """
+    batch = []
+    for row_no, values in enumerate(iter_roster_rows(path), start=1):
+        batch.append((row_no, *values))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def estimate_roster_rows(path):
+    """
+    Data row count for progress reporting, without loading the rows.
+    Returns None if it cannot be told cheaply.
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    try:
+        if ext == ".csv":
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+        if ext == ".xlsx":
+            from openpyxl import load_workbook
+
+            wb = load_workbook(path, read_only=True)
+            try:
+                max_row = wb.worksheets[0].max_row
+            finally:
+                wb.close()
+            return max(0, max_row - 1) if max_row else None
+    except Exception:
+        return None
+
+    return None
@@ -0,0 +1,37 @@
+import logging
+import threading
+
+import psycopg2
+
+from ..db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+_ensured = set()
+_lock = threading.Lock()
+
+
+def ensure_schema(name, ddl):
+    """
+    Run CREATE ... IF NOT EXISTS statements for a side table once per process,
+    on a separate connection so a failure never aborts the caller's transaction.
+    """
+    if name in _ensured:
+        return
+
+    with _lock:
+        if name in _ensured:
+            return
+
+        conn = get_db_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(ddl)
+            conn.commit()
+            cur.close()
+            _ensured.add(name)
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"Could not ensure schema '{name}': {e}")
+        finally:
+            conn.close()
@@ -0,0 +1,99 @@
+import hashlib
+import logging
+import os
+import time
+
+from psycopg2.extras import Json
+
+logger = logging.getLogger(__name__)
+
+# Stored as {"hash": <explanation hash>, "sections": {section_name: text}}.
+# A regenerated explanation has a different hash, so old rewrites are
+# ignored and replaced on the next write without an explicit reset.
+#
+# ALTER TABLE takes an ACCESS EXCLUSIVE lock on student_survey_answer, so
+# the column is only added by `python -m backend.admin.migrate_section_rewrites`.
+# Until then the chatbot works without the rewrite cache.
+SECTION_REWRITES_DDL = """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+            AND table_name = 'student_survey_answer'
+            AND column_name = 'section_rewrites'
+        ) THEN
+            ALTER TABLE student_survey_answer ADD COLUMN section_rewrites JSONB;
+        END IF;
+    END $$;
+"""
+
+# While the column is missing, look again at most this often.
+SECTION_REWRITES_RECHECK = float(os.getenv("SECTION_REWRITES_RECHECK", "60"))
+
+_available = False
+_checked_at = None
+
+
+def section_rewrites_available(cur):
+    """
+    Whether student_survey_answer.section_rewrites exists. Once found it is
+    remembered for the life of the process.
+    """
+    global _available, _checked_at
+
+    if _available:
+        return True
+
+    now = time.monotonic()
+    if _checked_at is not None and now - _checked_at < SECTION_REWRITES_RECHECK:
+        return False
+
+    cur.execute("""
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+        AND table_name = 'student_survey_answer'
+        AND column_name = 'section_rewrites'
+    """)
+    _available = cur.fetchone() is not None
+    _checked_at = now
+
+    if not _available:
+        logger.warning(
+            "student_survey_answer.section_rewrites is missing; chatbot rewrites are not cached. "
+            "Run python -m backend.admin.migrate_section_rewrites"
+        )
+    return _available
+
+
+def explanation_hash(ai_text):
+    return hashlib.sha256((ai_text or "").encode("utf-8")).hexdigest()[:16]
+
+
+def get_cached_rewrite(section_rewrites, ai_text, section_name):
+    if not section_rewrites or section_rewrites.get("hash") != explanation_hash(ai_text):
+        return None
+    return (section_rewrites.get("sections") or {}).get(section_name)
+
+
+def store_rewrite(cur, answer_id, ai_text, section_name, text):
+    digest = explanation_hash(ai_text)
+
+    # Merged in SQL so two sections rewritten at once don't drop each other.
+    cur.execute("""
+        UPDATE student_survey_answer
+        SET section_rewrites = CASE
+            WHEN section_rewrites->>'hash' = %s
+                THEN jsonb_set(section_rewrites, ARRAY['sections', %s], to_jsonb(%s::text))
+            ELSE %s
+        END
+        WHERE id = %s
+    """, (
+        digest,
+        section_name,
+        text,
+        Json({"hash": digest, "sections": {section_name: text}}),
+        answer_id
+    ))
@@ -0,0 +1,77 @@
+"""
+Fill the per-process caches once in the gunicorn master (preload_app), so
+every forked worker starts with them already in memory and shares the
+pages copy-on-write instead of rebuilding them under the first requests.
+"""
+import importlib
+import logging
+import os
+import time
+
+from .db import close_pool
+
+logger = logging.getLogger(__name__)
+
+# Libraries that would otherwise be imported by the first PDF render/upload
+# in every worker. Comma-separated, empty to skip.
+WARMUP_PRELOAD_MODULES = [
+    m.strip() for m in os.getenv("WARMUP_PRELOAD_MODULES", "weasyprint").split(",") if m.strip()
+]
+
+
+def _preload_modules():
+    for name in WARMUP_PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+def _catalog():
+    from .utils.catalog import get_catalog
+    get_catalog()
+
+
+def _descriptions():
+    # Plain module-level dicts; importing is all the warming they need.
+    from . import description  # noqa: F401
+
+
+def _templates(app):
+    # Compiles every template into the environment's cache.
+    env = app.jinja_env
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+
+
+def _pdf_logos():
+    from .utils.pdf_assets import pdf_logos
+    pdf_logos()
+
+
+def warmup(app):
+    """
+    Load the program catalog, campus table, description dictionaries,
+    compiled templates and PDF logos. A failing step is logged and skipped;
+    the worker then just loads it lazily as before.
+    """
+    steps = [
+        ("preload modules", _preload_modules),
+        ("campus and program catalog", _catalog),
+        ("descriptions", _descriptions),
+        ("templates", lambda: _templates(app)),
+        ("pdf logos", _pdf_logos),
+    ]
+
+    started = time.perf_counter()
+    with app.app_context():
+        for label, step in steps:
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.warning(f"⚠️ Warmup step '{label}' failed: {e}")
+                continue
+            logger.info(f"🔥 Warmed {label} in {(time.perf_counter() - step_started) * 1000:.0f} ms")
+
+    # The master must not hand its database sockets to the workers.
+    close_pool()
+
+    logger.info(f"🔥 Warmup done in {(time.perf_counter() - started) * 1000:.0f} ms")
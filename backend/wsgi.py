@@ -1,3 +1,3 @@
 from .app import app
 
-application = app
\ No newline at end of file
+application = app
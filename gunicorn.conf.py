@@ -0,0 +1,30 @@
+# gunicorn backend.wsgi:application
+# (this file is picked up automatically from the working directory)
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# gunicorn's own default. Each worker has its own DB pool, preloaded
+# WeasyPrint and background threads, so raise it with WEB_CONCURRENCY.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Import the app once in the master; workers are forked from it.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker is
+    # forked, so whatever is cached here is shared copy-on-write.
+    if not preload_app:
+        return
+
+    from backend.warmup import warmup
+    from backend.wsgi import app
+
+    warmup(app)
+
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers don't touch (and un-share) those pages.
+    gc.freeze()